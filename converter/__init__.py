@@ -1 +1,3 @@
+"""ZMK to Kanata keymap converter."""
 
+__version__ = "0.1.0"
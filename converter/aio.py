@@ -0,0 +1,164 @@
+"""Asyncio Conversion Module
+
+This module converts keymaps without blocking an event loop. The
+preprocessor runs as an asyncio subprocess that reads the keymap on stdin
+and writes the preprocessed text to a pipe; the CPU-bound parse, extract
+and transform stages run in an executor (the loop's default thread pool
+unless one is given).
+
+A timeout or a cancellation kills a running preprocessor. Stages already
+running in the executor can't be interrupted: they finish in the
+background and their result is discarded.
+
+Example:
+    config = await aconvert("keymap.keymap", timeout=10)
+    configs = await aconvert_many(paths, limit=4, return_exceptions=True)
+"""
+
+import asyncio
+import logging
+import os
+import time
+from concurrent.futures import Executor
+from typing import Iterable, List, Optional, Union
+
+from converter.context import ConversionContext
+from converter.dts.preprocessor import DtsPreprocessor
+from converter.main import _shared_stages
+from converter.pipeline import Pipeline, StageTiming
+
+
+async def apreprocess(preprocessor: DtsPreprocessor, input_path: str) -> str:
+    """Preprocess a DTS file in an asyncio subprocess.
+
+    Args:
+        preprocessor: Supplies the command line and post-processing
+        input_path: Path to the input file
+
+    Returns:
+        The preprocessed content as a string
+
+    Raises:
+        PreprocessorError: If preprocessing fails
+    """
+    content = preprocessor.read_source(input_path)
+    cpp_cmd = preprocessor.build_command(input_path, "-")
+    logging.debug("[aio] cpp command: %s", cpp_cmd)
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *cpp_cmd,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except OSError as e:
+        raise preprocessor.failed(input_path, str(e))
+    try:
+        stdout, stderr = await process.communicate(content.encode("utf-8"))
+    except BaseException:
+        # Cancelled or timed out: don't leave cpp running
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+        raise
+    if process.returncode != 0:
+        raise preprocessor.failed(
+            input_path,
+            f"{cpp_cmd[0]} exited with status {process.returncode}: "
+            + stderr.decode("utf-8", "replace").strip(),
+        )
+    return preprocessor.postprocess(stdout.decode("utf-8"))
+
+
+async def _convert(
+    zmk_file: str,
+    pipeline: Pipeline,
+    context: ConversionContext,
+    executor: Optional[Executor],
+) -> str:
+    wall = time.perf_counter()
+    preprocessed = await apreprocess(pipeline.preprocessor, zmk_file)
+    run = pipeline.start(zmk_file, context, preprocessed=preprocessed)
+    # The work happens in cpp, so there's no CPU time of this thread to report
+    run.timings["preprocess"] = StageTiming(time.perf_counter() - wall, 0.0, 0)
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, pipeline.resume, run)
+    return run.config
+
+
+async def aconvert(
+    zmk_file: str,
+    include_paths: Optional[List[str]] = None,
+    context: Optional[ConversionContext] = None,
+    executor: Optional[Executor] = None,
+    timeout: Optional[float] = None,
+) -> str:
+    """Convert a ZMK keymap file to Kanata configuration.
+
+    Args:
+        zmk_file: Path to the ZMK keymap file
+        include_paths: Optional list of paths to search for included files
+        context: Optional per-conversion context receiving diagnostics
+        executor: Executor running the parse, extract and transform
+            stages; the event loop's default executor when None
+        timeout: Seconds after which the conversion is abandoned
+
+    Returns:
+        String containing the Kanata configuration
+
+    Raises:
+        FileNotFoundError: If the input file doesn't exist
+        ValueError: If the input file is invalid
+        asyncio.TimeoutError: If the conversion took longer than timeout
+    """
+    parser, extractor, transformer = _shared_stages()
+    pipeline = Pipeline(
+        include_paths=include_paths,
+        parser=parser,
+        extractor=extractor,
+        transformer=transformer,
+    )
+    try:
+        return await asyncio.wait_for(
+            _convert(zmk_file, pipeline, context or ConversionContext(), executor),
+            timeout,
+        )
+
+    except asyncio.TimeoutError:
+        raise
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Input file not found: {zmk_file}") from e
+    except Exception as e:
+        raise ValueError(f"Failed to convert keymap: {str(e)}") from e
+
+
+async def aconvert_many(
+    zmk_files: Iterable[str],
+    limit: Optional[int] = None,
+    return_exceptions: bool = False,
+    **kwargs,
+) -> List[Union[str, BaseException]]:
+    """Convert several keymap files, at most limit at a time.
+
+    Args:
+        zmk_files: Paths of the ZMK keymap files
+        limit: Maximum number of concurrent conversions; the CPU count by
+            default
+        return_exceptions: Return a failed conversion's exception in its
+            place instead of raising the first one, like asyncio.gather
+        **kwargs: Passed to aconvert() for every file (a context passed
+            here would be shared, so pass none)
+
+    Returns:
+        The Kanata configurations, in the order of zmk_files
+    """
+    semaphore = asyncio.Semaphore(limit or os.cpu_count() or 1)
+
+    async def convert_one(zmk_file: str) -> str:
+        async with semaphore:
+            return await aconvert(zmk_file, **kwargs)
+
+    return await asyncio.gather(
+        *(convert_one(zmk_file) for zmk_file in zmk_files),
+        return_exceptions=return_exceptions,
+    )
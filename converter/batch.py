@@ -0,0 +1,333 @@
+"""Batch Conversion Module
+
+This module converts many keymaps in one process launch. Inputs are
+directories (searched recursively), glob patterns or single files; each
+keymap is converted in a process pool and written to the same relative
+path under an output directory, with a ``.kbd`` suffix. Files that are
+only #included by other keymaps are not converted on their own, and a
+batch in which two inputs would share an output file is refused.
+
+A JSON report lists every file with its status, diagnostics and per-stage
+timings.
+
+Usage:
+    zmk-kanata batch config/ boards/**/*.keymap -o out/ --report report.json
+"""
+
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from converter.dts.extractor import KeymapExtractor
+from converter.dts.parser import DtsParser
+from converter.dts.preprocessor import (
+    DtsPreprocessor,
+    PreprocessorError,
+    default_include_paths,
+)
+from converter.output.file_writer import AtomicOutput
+from converter.pipeline import Pipeline
+from converter.transformer.kanata_transformer import KanataTransformer
+
+KEYMAP_SUFFIXES = (".keymap", ".dtsi")
+OUTPUT_SUFFIX = ".kbd"
+# Marks a .dtsi that is a keymap rather than a fragment meant to be included
+_KEYMAP_COMPATIBLE = "zmk,keymap"
+
+BatchJob = namedtuple(
+    "BatchJob",
+    ["input", "output", "include_paths", "options", "force_write"],
+    defaults=(False,),
+)
+"""One file to convert: paths, include paths, KanataTransformer options and
+whether to rewrite unchanged output."""
+
+FileResult = namedtuple(
+    "FileResult",
+    ["input", "output", "status", "error", "diagnostics", "timings", "written"],
+)
+"""Outcome of converting one file, as stored in the batch report."""
+
+# Stages shared by every job run in this process
+_PARSER = DtsParser()
+_EXTRACTOR = KeymapExtractor()
+
+
+def _glob_root(pattern: str) -> Path:
+    """Return the leading directory of pattern that contains no wildcards."""
+    parts = Path(pattern).parts
+    root = []
+    for part in parts:
+        if glob.has_magic(part):
+            break
+        root.append(part)
+    return Path(*root) if root else Path(".")
+
+
+def collect_inputs(
+    patterns: Iterable[str], include_paths: Optional[List[str]] = None
+) -> List[Tuple[Path, Path]]:
+    """Expand directories, globs and files into keymaps to convert.
+
+    Files that only exist to be included are skipped: those #included by
+    another input, and .dtsi files without a keymap node.
+
+    Args:
+        patterns: Directories, glob patterns (``**`` is recursive) or files
+        include_paths: Extra include paths used to resolve #include lines
+
+    Returns:
+        (input path, path relative to its directory or glob root) pairs,
+        sorted and without duplicates
+    """
+    found: Dict[Path, Path] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if glob.has_magic(pattern):
+            root = _glob_root(pattern)
+            matches = [Path(m) for m in glob.glob(pattern, recursive=True)]
+        elif path.is_dir():
+            root = path
+            matches = [p for p in path.rglob("*") if p.suffix in KEYMAP_SUFFIXES]
+        else:
+            root = path.parent
+            matches = [path]
+        for match in matches:
+            if match.is_file():
+                found.setdefault(match.resolve(), match.relative_to(root))
+
+    preprocessor = DtsPreprocessor(include_paths=default_include_paths(include_paths))
+    included = set()
+    for path in found:
+        included.update(p.resolve() for p in preprocessor.resolve_includes(path))
+    return sorted(
+        (path, relative)
+        for path, relative in found.items()
+        if path not in included and (path.suffix != ".dtsi" or _defines_keymap(path))
+    )
+
+
+def _defines_keymap(path: Path) -> bool:
+    """Check whether the file at path contains a keymap node."""
+    try:
+        return _KEYMAP_COMPATIBLE in path.read_text(errors="replace")
+    except OSError:
+        return False
+
+
+def _check_outputs(jobs: Sequence[BatchJob]) -> None:
+    """Raise ValueError if two jobs would write the same output file."""
+    inputs: Dict[str, List[str]] = {}
+    for job in jobs:
+        inputs.setdefault(os.path.normcase(job.output), []).append(job.input)
+    clashes = [
+        f"{output} <- {', '.join(sources)}"
+        for output, sources in inputs.items()
+        if len(sources) > 1
+    ]
+    if clashes:
+        raise ValueError(
+            "several inputs would be written to the same output file: "
+            + "; ".join(clashes)
+        )
+
+
+def convert_file(job: BatchJob) -> FileResult:
+    """Convert one keymap and write its Kanata config.
+
+    This is the worker entry point, so it must stay a module-level function.
+    Failures are reported in the result instead of raised.
+    """
+    pipeline = Pipeline(
+        preprocessor=DtsPreprocessor(include_paths=job.include_paths),
+        parser=_PARSER,
+        extractor=_EXTRACTOR,
+        transformer=KanataTransformer(**job.options),
+    )
+    run = pipeline.start(job.input)
+    output = AtomicOutput(job.output, force=job.force_write)
+    try:
+        pipeline.resume(run, until="extract")
+        with output as f:
+            pipeline.resume(run, output=f)
+    except Exception as e:
+        status, error = "error", f"{run.stage} failed: {e}"
+    else:
+        status, error = "ok", None
+    return FileResult(
+        job.input,
+        job.output,
+        status,
+        error,
+        [d.to_dict() for d in run.context.diagnostics],
+        {stage: timing.wall for stage, timing in run.timings.items()},
+        bool(output.changed),
+    )
+
+
+def run_batch(
+    inputs: Sequence[Tuple[Path, Path]],
+    output_dir: Path,
+    include_paths: Optional[List[str]] = None,
+    workers: Optional[int] = None,
+    options: Optional[Dict] = None,
+    force_write: bool = False,
+) -> Dict:
+    """Convert keymaps into a mirrored tree under output_dir.
+
+    Args:
+        inputs: (input path, relative path) pairs from collect_inputs()
+        output_dir: Root of the output tree
+        include_paths: Extra include paths for the preprocessor
+        workers: Number of worker processes; defaults to the CPU count, and
+            1 converts in this process
+        options: KanataTransformer keyword arguments
+        force_write: Rewrite output files whose content is unchanged
+
+    Returns:
+        The batch report: per-file results in input order and a summary
+
+    Raises:
+        ValueError: If two inputs map to the same output file, which
+            happens for x.keymap and x.dtsi side by side, or for the same
+            relative path under two input roots
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    all_include_paths = default_include_paths(include_paths)
+    jobs = [
+        BatchJob(
+            str(path),
+            str(Path(output_dir) / relative.with_suffix(OUTPUT_SUFFIX)),
+            all_include_paths,
+            dict(options or {}),
+            force_write,
+        )
+        for path, relative in inputs
+    ]
+    _check_outputs(jobs)
+
+    start = time.perf_counter()
+    if workers <= 1 or len(jobs) <= 1:
+        results = [convert_file(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            results = list(executor.map(convert_file, jobs))
+    elapsed = time.perf_counter() - start
+
+    failed = sum(result.status != "ok" for result in results)
+    return {
+        "files": [result._asdict() for result in results],
+        "summary": {
+            "total": len(results),
+            "ok": len(results) - failed,
+            "failed": failed,
+            "written": sum(result.written for result in results),
+            "workers": workers,
+            "seconds": elapsed,
+        },
+    }
+
+
+def main(args=None) -> int:
+    """Run the ``zmk-kanata batch`` command."""
+    parser = argparse.ArgumentParser(
+        prog="zmk-kanata batch",
+        description="Convert many ZMK keymaps to Kanata configurations",
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        help="Directories, glob patterns or .keymap/.dtsi files",
+    )
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        required=True,
+        help="Directory that receives the mirrored output tree",
+    )
+    parser.add_argument(
+        "-I",
+        "--include",
+        action="append",
+        help="Add an include path for preprocessing (can be used multiple times)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        metavar="N",
+        help="Number of worker processes (default: CPU count)",
+    )
+    parser.add_argument(
+        "--report",
+        metavar="FILE",
+        help="Write the JSON report to FILE ('-' for stdout)",
+    )
+    parser.add_argument(
+        "--force-write",
+        action="store_true",
+        help="Rewrite output files even if their content is unchanged",
+    )
+    parser.add_argument(
+        "--hoist-aliases",
+        action="store_true",
+        help="Move compound actions repeated across layers into defalias entries",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Emit identical layers and macros once and redirect references",
+    )
+    parsed_args = parser.parse_args(args)
+
+    try:
+        inputs = collect_inputs(parsed_args.inputs, parsed_args.include)
+    except PreprocessorError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    if not inputs:
+        print("Error: no keymap files found", file=sys.stderr)
+        return 1
+    try:
+        report = run_batch(
+            inputs,
+            Path(parsed_args.output_dir),
+            include_paths=parsed_args.include,
+            workers=parsed_args.jobs,
+            options={
+                "hoist_aliases": parsed_args.hoist_aliases,
+                "dedup": parsed_args.dedup,
+            },
+            force_write=parsed_args.force_write,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    for result in report["files"]:
+        if result["status"] != "ok":
+            print(f"{result['input']}: {result['error']}", file=sys.stderr)
+    summary = report["summary"]
+    logging.info(
+        "Converted %d of %d keymaps in %.2fs (%d files changed)",
+        summary["ok"],
+        summary["total"],
+        summary["seconds"],
+        summary["written"],
+    )
+    if parsed_args.report == "-":
+        print(json.dumps(report, indent=2))
+    elif parsed_args.report:
+        with open(parsed_args.report, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if summary["failed"] else 0
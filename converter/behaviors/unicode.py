@@ -1,26 +1,70 @@
 """Unicode Behavior Module.
 
 This module provides classes for representing ZMK Unicode behaviors and
-bindings.
+bindings, and a registry that resolves unicode behavior names to the
+characters they produce.
 """
 
-from typing import Optional
+from typing import Dict, Iterable, List, Mapping, Optional
 import sys
 
 from converter.model.keymap_model import Binding
+from converter.transformer.keycode_registry import USAGE_TO_ZMK
+
+# Behavior names that are treated as unicode when a keymap does not define
+# them itself.
+BUILTIN_UNICODE_CHARACTERS: Dict[str, str] = {
+    "pi": "π",
+    "n_tilde": "ñ",
+}
+
+# Undefined behaviors with this name prefix are unicode placeholders.
+UNICODE_NAME_PREFIX = "unicode_"
+UNKNOWN_UNICODE_CHARACTER = "?"
+
+# Keys used by the OS unicode entry sequences that ZMK_UNICODE_SINGLE style
+# macros wrap around the hex digits (macOS Option hold, Linux Ctrl+Shift+U,
+# WinCompose RAlt+U, and the Space/Enter terminators).
+_UNICODE_ENTRY_KEYS = frozenset(
+    {
+        "LALT",
+        "RALT",
+        "LEFT_ALT",
+        "RIGHT_ALT",
+        "LA(U)",
+        "RA(U)",
+        "LS(LC(U))",
+        "LC(LS(U))",
+        "U",
+        "SPACE",
+        "SPC",
+        "RET",
+        "RETURN",
+        "ENTER",
+    }
+)
+
+_HEX_DIGIT_KEYS: Dict[str, str] = {
+    **{f"N{d}": str(d) for d in range(10)},
+    **{f"NUMBER_{d}": str(d) for d in range(10)},
+    **{c: c for c in "ABCDEF"},
+}
 
 
 class UnicodeBinding(Binding):
     """Represents a Unicode binding in ZMK."""
 
-    def __init__(self, character: str):
+    def __init__(self, character: str, shifted: Optional[str] = None):
         """Initialize a Unicode binding.
 
         Args:
             character: The Unicode character to output
+            shifted: The character to output while shift is held, for
+                ZMK_UNICODE_PAIR style behaviors
         """
         super().__init__(behavior=None, params=[character])
         self.character = character
+        self.shifted = shifted
 
     def to_kanata(self) -> str:
         """Convert the binding to Kanata format.
@@ -30,32 +74,218 @@ class UnicodeBinding(Binding):
         """
         # Return a properly formatted unicode character reference
         if sys.platform == "darwin":
+            if self.shifted is not None:
+                # Kanata's fork picks the second action while a shift is held
+                return (
+                    f'(fork (unicode "{self.character}") '
+                    f'(unicode "{self.shifted}") (lsft rsft))'
+                )
             return f'(unicode "{self.character}")'
         else:
-            return f"; WARNING: Unicode output is only supported on macOS (darwin). Unicode '{self.character}' not emitted."
+            characters = self.character
+            if self.shifted is not None:
+                characters += f"' / shifted '{self.shifted}"
+            return f"; WARNING: Unicode output is only supported on macOS (darwin). Unicode '{characters}' not emitted."
 
     @classmethod
-    def from_zmk(cls, zmk_binding: str) -> Optional["UnicodeBinding"]:
+    def from_zmk(
+        cls, zmk_binding: str, registry: Optional["UnicodeRegistry"] = None
+    ) -> Optional["UnicodeBinding"]:
         """Create a UnicodeBinding from a ZMK binding string.
 
         Args:
             zmk_binding: The ZMK binding string
+            registry: Registry to resolve the behavior name with; defaults to
+                the built-in unicode behaviors
 
         Returns:
             A UnicodeBinding if the string is a valid Unicode binding,
             None otherwise
         """
-        # Normalize the binding string
         binding = zmk_binding.strip().rstrip(";")
-        # ZMK doesn't have native Unicode support yet, but we can handle
-        # the workaround using macros that output Unicode characters
-        if binding.startswith("&unicode_"):
-            return cls("?")
-        if binding == "&pi":
-            return cls("π")
-        if binding == "&n_tilde":
-            return cls("ñ")
+        if not binding.startswith("&"):
+            return None
+        registry = registry or _DEFAULT_REGISTRY
+        character = registry.resolve(binding[1:])
+        if character is None:
+            return None
+        return cls(character, registry.shifted.get(binding[1:]))
+
+
+class UnicodeRegistry:
+    """Maps unicode behavior names to the characters they produce.
+
+    The registry is built from a keymap's behaviors so that real code points
+    are used instead of placeholders. Lookups are a single dict access on the
+    behavior name, which keeps the common non-unicode case cheap.
+    """
+
+    def __init__(self, characters: Optional[Mapping[str, str]] = None):
+        """Initialize the registry.
+
+        Args:
+            characters: Behavior name to character mapping; defaults to the
+                built-in unicode behaviors
+        """
+        self.characters: Dict[str, str] = dict(
+            BUILTIN_UNICODE_CHARACTERS if characters is None else characters
+        )
+        # Shifted characters of ZMK_UNICODE_PAIR style behaviors.
+        self.shifted: Dict[str, str] = {}
+
+    @classmethod
+    def from_behaviors(cls, behaviors: Mapping[str, object]) -> "UnicodeRegistry":
+        """Build a registry from extracted behaviors.
+
+        Recognized definitions are ``zmk,behavior-unicode`` nodes with a
+        ``unicode`` property, macros that type a hex code point through an OS
+        unicode entry sequence (``ZMK_UNICODE_SINGLE``), and mod-morphs that
+        switch between two such macros (``ZMK_UNICODE_PAIR``). Built-in names
+        are dropped when the keymap defines a behavior of the same name.
+
+        Args:
+            behaviors: Behavior name to behavior object mapping
+
+        Returns:
+            The populated registry
+        """
+        registry = cls(
+            {
+                name: char
+                for name, char in BUILTIN_UNICODE_CHARACTERS.items()
+                if name not in behaviors
+            }
+        )
+        mod_morphs = []
+        for name, behavior in behaviors.items():
+            behavior_type = getattr(behavior, "type", None)
+            if behavior_type in ("unicode", "zmk,behavior-unicode"):
+                code_point = _property_code_point(behavior)
+            elif behavior_type == "macro":
+                code_point = _macro_code_point(getattr(behavior, "bindings", ()))
+            else:
+                if behavior_type == "zmk,behavior-mod-morph":
+                    mod_morphs.append((name, behavior))
+                continue
+            if code_point is not None:
+                registry.register(name, chr(code_point))
+
+        for name, behavior in mod_morphs:
+            refs = _property_values(behavior, "bindings")
+            if len(refs) != 2:
+                continue
+            lower, upper = (registry.get(str(ref).lstrip("&")) for ref in refs)
+            if lower is not None and upper is not None:
+                registry.register(name, lower, shifted=upper)
+        return registry
+
+    def register(self, name: str, character: str, shifted: Optional[str] = None):
+        """Register a unicode behavior.
+
+        Args:
+            name: Behavior name without the leading '&'
+            character: Character produced by the behavior
+            shifted: Character produced with shift held, if different
+        """
+        self.characters[name] = character
+        if shifted is not None:
+            self.shifted[name] = shifted
+
+    def get(self, name: str) -> Optional[str]:
+        """Return the character for a behavior name, or None."""
+        return self.characters.get(name)
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Return the character for a behavior name.
+
+        Unlike get(), names with the ``unicode_`` prefix that are not
+        registered resolve to a placeholder character.
+        """
+        character = self.characters.get(name)
+        if character is None and name.startswith(UNICODE_NAME_PREFIX):
+            return UNKNOWN_UNICODE_CHARACTER
+        return character
+
+    def __contains__(self, name: str) -> bool:
+        """Check whether a behavior name is registered."""
+        return name in self.characters
+
+    def __len__(self) -> int:
+        """Return the number of registered behaviors."""
+        return len(self.characters)
+
+
+def _property_values(behavior, prop: str) -> List:
+    """Return a DTS property of a behavior as a list."""
+    value = getattr(behavior, "extra_properties", {}).get(prop)
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _property_code_point(behavior) -> Optional[int]:
+    """Return the code point of a zmk,behavior-unicode node, if valid."""
+    values = _property_values(behavior, "unicode")
+    if len(values) != 1:
+        return None
+    try:
+        code_point = int(values[0], 0) if isinstance(values[0], str) else values[0]
+    except ValueError:
         return None
+    if isinstance(code_point, int) and 0 <= code_point <= sys.maxunicode:
+        return code_point
+    return None
+
+
+def _key_name(param) -> str:
+    """Normalize a key parameter, mapping HID usage ids back to names.
+
+    The preprocessor emits usage ids for plain keys (&kp A -> &kp 0x04).
+    """
+    key = str(param).strip()
+    try:
+        usage = int(key, 0)
+    except ValueError:
+        return key
+    return USAGE_TO_ZMK.get(usage, key)
+
+
+def _macro_code_point(bindings: Iterable) -> Optional[int]:
+    """Return the code point typed by a unicode entry macro, if it is one.
+
+    The macro must press 4 to 6 consecutive hex digit keys, every other key
+    must belong to an OS unicode entry sequence, and at least one such key
+    must be present so plain macros that happen to type hex letters are not
+    mistaken for unicode.
+    """
+    digits = []
+    entry_keys = 0
+    digits_done = False
+    for binding in bindings:
+        behavior = getattr(binding, "behavior", None)
+        if getattr(behavior, "name", None) != "kp":
+            continue
+        params = getattr(binding, "params", None) or []
+        if not params:
+            return None
+        key = _key_name(params[0])
+        digit = _HEX_DIGIT_KEYS.get(key)
+        if digit is not None:
+            if digits_done:
+                return None
+            digits.append(digit)
+        elif key in _UNICODE_ENTRY_KEYS:
+            entry_keys += 1
+            digits_done = bool(digits)
+        else:
+            return None
+    if not entry_keys or not 4 <= len(digits) <= 6:
+        return None
+    code_point = int("".join(digits), 16)
+    return code_point if code_point <= sys.maxunicode else None
+
+
+_DEFAULT_REGISTRY = UnicodeRegistry()
 
 
 def is_unicode_binding(binding_str: str) -> bool:
@@ -67,8 +297,6 @@ def is_unicode_binding(binding_str: str) -> bool:
     Returns:
         True if the binding string is a Unicode binding, False otherwise
     """
-    return (
-        binding_str.startswith("&unicode_")
-        or binding_str.startswith("&pi")
-        or binding_str.startswith("&n_tilde")
-    )
+    if not binding_str.startswith("&"):
+        return False
+    return _DEFAULT_REGISTRY.resolve(binding_str[1:]) is not None
@@ -0,0 +1,146 @@
+"""Result Cache Module
+
+This module stores finished conversions on disk, so converting the same
+keymap again returns the stored Kanata configuration and diagnostics
+without running cpp, the parser, the extractor or the transformer.
+
+The key is the sha256 of the converter version, the input file, every file
+it includes (found by scanning #include lines, not by running cpp), the
+include paths and the options that affect the output. Each entry is one
+JSON file written with write_atomic(), so concurrent writers and readers
+never see a partial entry. Once the directory grows past its size limit,
+the least recently used entries (by modification time, refreshed on every
+hit) are deleted.
+
+Usage:
+    zmk-kanata keymap.keymap -o kanata.kbd --cache-dir ~/.cache/zmk-kanata
+"""
+
+import hashlib
+import json
+import os
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from converter import __version__
+from converter.output.file_writer import write_atomic
+
+# Bumped when the entry layout or key derivation changes
+CACHE_FORMAT = 1
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+ENTRY_SUFFIX = ".json"
+
+CachedResult = namedtuple("CachedResult", ["config", "diagnostics"])
+"""A stored Kanata configuration and its diagnostics as to_dict() dicts."""
+
+
+class ResultCache:
+    """Directory of finished conversions with an LRU size limit."""
+
+    def __init__(
+        self, directory: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """Initialize the cache.
+
+        Args:
+            directory: Where entries are stored; created on first write
+            max_bytes: Total entry size above which the least recently used
+                entries are deleted
+        """
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(
+        input_path: str,
+        sources: List[Path],
+        include_paths: List[str],
+        options: Optional[Dict] = None,
+    ) -> str:
+        """Return the cache key of a conversion.
+
+        Args:
+            input_path: Path of the keymap file
+            sources: Files it includes, as returned by resolve_includes()
+            include_paths: Include paths of the preprocessor
+            options: Settings that affect the output
+
+        Raises:
+            OSError: If the keymap file can't be read
+        """
+        h = hashlib.sha256()
+        header = [CACHE_FORMAT, __version__, include_paths, options or {}]
+        h.update(json.dumps(header, sort_keys=True, default=str).encode("utf-8"))
+        input_path = Path(input_path)
+        h.update(str(input_path.resolve()).encode("utf-8", "surrogateescape"))
+        h.update(input_path.read_bytes())
+        for path in sources:
+            h.update(b"\0" + str(path).encode("utf-8", "surrogateescape") + b"\0")
+            try:
+                h.update(path.read_bytes())
+            except OSError:
+                # A missing include fails the conversion, which isn't cached
+                h.update(b"\0missing")
+        return h.hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / (key + ENTRY_SUFFIX)
+
+    def get(self, key: str) -> Optional[CachedResult]:
+        """Return the entry stored under key, or None, and count the lookup."""
+        path = self._path(key)
+        try:
+            with open(path) as f:
+                data = json.load(f)
+            result = CachedResult(data["config"], data["diagnostics"])
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, evicted by another process or unreadable
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def put(self, key: str, config: str, diagnostics: List[Dict]) -> None:
+        """Store a conversion under key and enforce the size limit."""
+        entry = json.dumps({"config": config, "diagnostics": diagnostics})
+        write_atomic(self._path(key), entry)
+        self.evict()
+
+    def evict(self) -> None:
+        """Delete least recently used entries until under the size limit."""
+        entries = []
+        total = 0
+        try:
+            with os.scandir(self.directory) as it:
+                for entry in it:
+                    if not entry.name.endswith(ENTRY_SUFFIX):
+                        continue
+                    try:
+                        st = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime_ns, st.st_size, entry.path))
+                    total += st.st_size
+        except FileNotFoundError:
+            return
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                # Already deleted by a concurrent writer
+                pass
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of lookups that hit, or 0.0 if there were none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
@@ -5,10 +5,9 @@ import sys
 from pathlib import Path
 from typing import List, Optional
 
+from . import __version__
 from .main import main as convert_main
 
-__version__ = "0.1.0"
-
 
 def create_parser() -> argparse.ArgumentParser:
     """Create the argument parser for the CLI."""
@@ -67,6 +66,13 @@ def create_parser() -> argparse.ArgumentParser:
         metavar="FILE",
         help="Dump extracted keymap model as JSON to FILE (or stdout if not specified)",
     )
+    parser.add_argument(
+        "--dump-diagnostics",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="Dump conversion diagnostics as JSON to FILE (or stderr if not specified)",
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -119,6 +125,10 @@ def main(argv: Optional[List[str]] = None) -> int:
         main_args.append(
             f"--dump-extracted{'' if args.dump_extracted == '-' else f'={args.dump_extracted}' }"
         )
+    if args.dump_diagnostics is not None:
+        main_args.append(
+            f"--dump-diagnostics{'' if args.dump_diagnostics == '-' else f'={args.dump_diagnostics}' }"
+        )
     if args.debug:
         main_args.append("--debug")
     if args.verbose:
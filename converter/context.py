@@ -0,0 +1,35 @@
+"""Conversion Context Module
+
+A ConversionContext carries the mutable state of one conversion: the
+diagnostics collector, the error manager and per-conversion transformer
+settings. Passing a context to a pipeline stage (DtsParser.parse,
+KeymapExtractor.extract, KanataTransformer.transform and friends) runs the
+call on a fresh stage object bound to that context, so the stage instance
+itself only holds settings and can be shared by concurrent conversions.
+"""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict
+
+from converter.error_handling.diagnostics import DiagnosticsCollector
+from converter.error_handling.error_manager import ErrorManager
+
+
+@dataclass
+class ConversionContext:
+    """Per-conversion state threaded through every pipeline stage.
+
+    Attributes:
+        diagnostics: Receives warnings and errors of every stage
+        errors: Error manager used by the behavior transformers
+        config: Transformer config overrides (e.g. ``tapping_term_ms``),
+            applied on top of the stage's own config
+        stats: Counters maintained by the stages (tokens, nodes, bindings,
+            aliases, cache hits, ...)
+    """
+
+    diagnostics: DiagnosticsCollector = field(default_factory=DiagnosticsCollector)
+    errors: ErrorManager = field(default_factory=ErrorManager)
+    config: Dict[str, Any] = field(default_factory=dict)
+    stats: Counter = field(default_factory=Counter)
@@ -0,0 +1,358 @@
+"""Daemon Module
+
+This module runs a local conversion server on a Unix domain socket, so
+editor integrations and hooks don't pay interpreter startup, imports and
+keycode table construction on every conversion.
+
+Each connection carries one request and one response, both a single line
+of JSON:
+
+    {"path": "keymap.keymap", "include": ["..."], "options": {"dedup": true}}
+    {"content": "/ { ... };", "include": ["..."]}
+    {"command": "ping"}
+
+    {"ok": true, "config": "(defcfg ...", "diagnostics": [...], "seconds": 0.01}
+    {"ok": false, "error": "...", "diagnostics": [...]}
+
+Requests are served on separate threads, each with its own
+ConversionContext. The socket is only accessible to the current user and
+lives in a directory only that user can write to; the client converts
+in-process rather than talk to a socket that doesn't meet both conditions.
+
+Usage:
+    zmk-kanata serve
+    zmk-kanata client keymap.keymap -o out.kbd
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, Optional
+
+from converter.error_handling.diagnostics import Diagnostic
+
+# Largest request accepted, in bytes
+MAX_REQUEST_SIZE = 16 * 1024 * 1024
+# KanataTransformer options a request may set
+_OPTIONS = ("hoist_aliases", "dedup")
+# File name of the default socket
+SOCKET_NAME = "zmk-kanata.sock"
+
+
+def default_socket_path() -> str:
+    """Return the socket path used when --socket isn't given.
+
+    That is $ZMK_KANATA_SOCKET, else a socket in $XDG_RUNTIME_DIR, else one
+    in a per-user directory under the temp directory that the server
+    creates with mode 0700.
+    """
+    if os.environ.get("ZMK_KANATA_SOCKET"):
+        return os.environ["ZMK_KANATA_SOCKET"]
+    directory = os.environ.get("XDG_RUNTIME_DIR") or os.path.join(
+        tempfile.gettempdir(), f"zmk-kanata-{os.getuid()}"
+    )
+    return os.path.join(directory, SOCKET_NAME)
+
+
+def _owned_and_private(st: os.stat_result) -> bool:
+    """Check that st is owned by this user and not writable by others."""
+    return st.st_uid == os.getuid() and not st.st_mode & 0o022
+
+
+def is_trusted_socket(socket_path: str) -> bool:
+    """Check whether socket_path can only have been created by this user.
+
+    The socket must be owned by this user, and so must its directory, which
+    must not be writable by group or others; otherwise another user could
+    have put a server there that answers with forged configurations.
+    """
+    try:
+        st = os.lstat(socket_path)
+        parent = os.stat(os.path.dirname(os.path.abspath(socket_path)))
+    except OSError:
+        return False
+    return stat.S_ISSOCK(st.st_mode) and st.st_uid == os.getuid() and (
+        _owned_and_private(parent)
+    )
+
+
+class _Converter:
+    """Converts requests with stages shared across threads."""
+
+    def __init__(self):
+        # Imported here so the client doesn't load the pipeline when a
+        # daemon is running
+        from converter.dts.extractor import KeymapExtractor
+        from converter.dts.parser import DtsParser
+        from converter.transformer.kanata_transformer import KanataTransformer
+
+        self.parser = DtsParser()
+        self.extractor = KeymapExtractor()
+        self._transformer_class = KanataTransformer
+        self._transformers: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _transformer(self, options: Dict):
+        """Return the shared transformer for a set of options."""
+        key = tuple(bool(options.get(name)) for name in _OPTIONS)
+        with self._lock:
+            transformer = self._transformers.get(key)
+            if transformer is None:
+                transformer = self._transformer_class(**dict(zip(_OPTIONS, key)))
+                self._transformers[key] = transformer
+        return transformer
+
+    def convert(self, request: Dict) -> Dict:
+        """Convert a keymap given by path or content.
+
+        Returns:
+            The response: the config and diagnostics, or the error
+        """
+        from converter.pipeline import Pipeline
+
+        start = time.perf_counter()
+        pipeline = Pipeline(
+            include_paths=request.get("include"),
+            parser=self.parser,
+            extractor=self.extractor,
+            transformer=self._transformer(request.get("options") or {}),
+        )
+        run = pipeline.start(request.get("path"))
+        tmp_path = None
+        try:
+            if run.source is None:
+                content = request.get("content")
+                if not isinstance(content, str):
+                    raise ValueError("request needs a 'path' or 'content'")
+                fd, tmp_path = tempfile.mkstemp(suffix=".keymap")
+                with os.fdopen(fd, "w") as f:
+                    f.write(content)
+                run.source = tmp_path
+            pipeline.resume(run)
+        except Exception as e:
+            return {
+                "ok": False,
+                "error": str(e),
+                "diagnostics": [d.to_dict() for d in run.context.diagnostics],
+            }
+        finally:
+            if tmp_path is not None:
+                os.unlink(tmp_path)
+        return {
+            "ok": True,
+            "config": run.config,
+            "diagnostics": [d.to_dict() for d in run.context.diagnostics],
+            "seconds": time.perf_counter() - start,
+        }
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Reads one JSON request line and writes one JSON response line."""
+
+    def handle(self):
+        line = self.rfile.readline(MAX_REQUEST_SIZE + 1)
+        try:
+            if len(line) > MAX_REQUEST_SIZE:
+                raise ValueError("request too large")
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError("request must be a JSON object")
+        except ValueError as e:
+            response = {"ok": False, "error": f"bad request: {e}"}
+        else:
+            command = request.get("command", "convert")
+            if command == "ping":
+                response = {"ok": True, "pid": os.getpid()}
+            elif command == "convert":
+                response = self.server.converter.convert(request)
+            else:
+                response = {"ok": False, "error": f"unknown command: {command}"}
+        self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+
+
+class ConversionServer(socketserver.ThreadingUnixStreamServer):
+    """Serves conversion requests on a Unix domain socket."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        """Bind the socket, replacing a stale one left by a dead server.
+
+        Raises:
+            OSError: If another server is already listening on socket_path,
+                or something other than a socket exists there
+        """
+        try:
+            mode = os.lstat(socket_path).st_mode
+        except FileNotFoundError:
+            pass
+        else:
+            if not stat.S_ISSOCK(mode):
+                raise OSError(f"{socket_path} exists and is not a socket")
+            try:
+                request(socket_path, {"command": "ping"}, timeout=1.0)
+            except ConnectionRefusedError:
+                # Nothing listening: left behind by a server that died
+                os.unlink(socket_path)
+            except OSError as e:
+                raise OSError(f"Can't tell whether {socket_path} is in use: {e}")
+            else:
+                raise OSError(f"A server is already listening on {socket_path}")
+        directory = os.path.dirname(os.path.abspath(socket_path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory, mode=0o700)
+        if not _owned_and_private(os.stat(directory)):
+            raise OSError(
+                f"{directory} is writable by other users; clients won't "
+                "trust a socket there"
+            )
+        self.socket_path = socket_path
+        self.converter = _Converter()
+        # Create the socket as 0600 so other users can't connect before a
+        # chmod; the umask is process-wide, but no other thread runs yet
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, _RequestHandler)
+        finally:
+            os.umask(umask)
+
+    def server_close(self):
+        """Close the socket and remove its file."""
+        super().server_close()
+        try:
+            os.unlink(self.socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def request(socket_path: str, payload: Dict, timeout: Optional[float] = 30.0) -> Dict:
+    """Send one request to a running server and return its response.
+
+    Raises:
+        OSError: If no server is listening on socket_path
+    """
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall(json.dumps(payload).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            line = f.readline()
+    if not line:
+        raise ConnectionError(f"No response from {socket_path}")
+    return json.loads(line)
+
+
+def convert(payload: Dict, socket_path: Optional[str] = None) -> Dict:
+    """Convert through the daemon, or in this process if none is running.
+
+    A socket that fails is_trusted_socket() isn't connected to. Only such a
+    socket, a missing one or a refused connection fall back; a daemon that
+    times out or fails mid-request raises, so the conversion isn't repeated.
+    """
+    socket_path = socket_path or default_socket_path()
+    if not is_trusted_socket(socket_path):
+        return _Converter().convert(payload)
+    try:
+        return request(socket_path, payload)
+    except (FileNotFoundError, ConnectionRefusedError):
+        return _Converter().convert(payload)
+
+
+def serve_main(args=None) -> int:
+    """Run the ``zmk-kanata serve`` command."""
+    parser = argparse.ArgumentParser(
+        prog="zmk-kanata serve",
+        description="Serve keymap conversions on a Unix domain socket",
+    )
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="Socket path (default: $ZMK_KANATA_SOCKET or a per-user socket)",
+    )
+    parsed_args = parser.parse_args(args)
+
+    try:
+        server = ConversionServer(parsed_args.socket)
+    except OSError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    print(f"listening on {parsed_args.socket}", file=sys.stderr)
+    with server:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def client_main(args=None) -> int:
+    """Run the ``zmk-kanata client`` command."""
+    parser = argparse.ArgumentParser(
+        prog="zmk-kanata client",
+        description=(
+            "Convert a keymap through a running 'zmk-kanata serve' daemon, "
+            "or in this process if none is running"
+        ),
+    )
+    parser.add_argument("input_file", help="Path to the ZMK keymap file")
+    parser.add_argument("-o", "--output", help="Path to the output file")
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="Socket path (default: $ZMK_KANATA_SOCKET or a per-user socket)",
+    )
+    parser.add_argument(
+        "-I",
+        "--include",
+        action="append",
+        help="Add an include path for preprocessing (can be used multiple times)",
+    )
+    parser.add_argument(
+        "--force-write",
+        action="store_true",
+        help="Rewrite the output file even if its content is unchanged",
+    )
+    parser.add_argument(
+        "--hoist-aliases",
+        action="store_true",
+        help="Move compound actions repeated across layers into defalias entries",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Emit identical layers and macros once and redirect references",
+    )
+    parsed_args = parser.parse_args(args)
+
+    response = convert(
+        {
+            "path": os.path.abspath(parsed_args.input_file),
+            "include": [os.path.abspath(p) for p in parsed_args.include or []],
+            "options": {
+                "hoist_aliases": parsed_args.hoist_aliases,
+                "dedup": parsed_args.dedup,
+            },
+        },
+        parsed_args.socket,
+    )
+    for data in response.get("diagnostics", []):
+        print(Diagnostic.from_dict(data).to_text(), file=sys.stderr)
+    if not response["ok"]:
+        print(f"Error: Failed to convert keymap: {response['error']}", file=sys.stderr)
+        return 1
+    if parsed_args.output:
+        from converter.output.file_writer import write_if_changed
+
+        write_if_changed(
+            parsed_args.output, response["config"], force=parsed_args.force_write
+        )
+    else:
+        print(response["config"])
+    return 0
@@ -44,6 +44,18 @@ class DtsNode:
     children: Dict[str, "DtsNode"] = field(default_factory=dict)
     properties: Dict[str, DtsProperty] = field(default_factory=dict)
     labels: Dict[str, str] = field(default_factory=dict)
+    line: Optional[int] = field(default=None, compare=False)
+    column: Optional[int] = field(default=None, compare=False)
+
+    @property
+    def path(self) -> str:
+        """Return the absolute path of this node (e.g. "/keymap/default_layer")."""
+        parts = []
+        node: Optional[DtsNode] = self
+        while node is not None and node.name != "/":
+            parts.append(node.name)
+            node = node.parent
+        return "/" + "/".join(reversed(parts))
 
     def add_child(self, child: "DtsNode") -> None:
         """Add a child node to this node."""
@@ -1,6 +1,7 @@
 """AST extractor for mapping DTS nodes to keymap model."""
 
-from typing import Dict, List, Optional, Any
+from collections import Counter
+from typing import Dict, Iterator, List, Optional, Any, Union
 from .ast import DtsNode, DtsRoot, DtsProperty
 from ..models import (
     KeymapConfig,
@@ -12,31 +13,118 @@ from ..models import (
     ConditionalLayer,
 )
 from converter.model.keymap_model import HoldTap
+from converter.model.frozen import FrozenKeymapConfig
+from converter.error_handling.diagnostics import DiagnosticsCollector
+from converter.context import ConversionContext
 import logging
-from converter.behaviors.unicode import is_unicode_binding, UnicodeBinding
+from converter.behaviors.unicode import (
+    UNICODE_NAME_PREFIX,
+    UNKNOWN_UNICODE_CHARACTER,
+    UnicodeBinding,
+    UnicodeRegistry,
+)
 
 
 class KeymapExtractor:
     """Extracts keymap information from DTS AST."""
 
-    def __init__(self):
-        """Initialize the extractor."""
+    def __init__(
+        self,
+        diagnostics: Optional[DiagnosticsCollector] = None,
+        stats: Optional[Counter] = None,
+    ):
+        """Initialize the extractor.
+
+        Args:
+            diagnostics: Collector for warnings found during extraction. A new
+                collector is created if none is given.
+            stats: Counter that receives layer and binding counts; a new one
+                is created if none is given.
+        """
+        self.diagnostics = (
+            diagnostics if diagnostics is not None else DiagnosticsCollector()
+        )
+        self.stats = stats if stats is not None else Counter()
         self.behaviors: Dict[str, Behavior] = {}
         self.layers: Dict[str, Layer] = {}
         self.combos: List[Combo] = []
         self.conditional_layers: List[ConditionalLayer] = []
+        self.unicode = UnicodeRegistry()
         # Store nodes for second pass behavior processing
         self._behavior_nodes_to_process: List[tuple[str, DtsNode]] = []
-
-    def extract(self, ast: DtsRoot) -> KeymapConfig:
+        # Keys of the distinct bindings seen in the current extraction
+        self._binding_keys: set = set()
+
+    def bind(self, context: ConversionContext) -> "KeymapExtractor":
+        """Return a new extractor that reports to the context's diagnostics."""
+        return KeymapExtractor(diagnostics=context.diagnostics, stats=context.stats)
+
+    def extract(
+        self,
+        ast: DtsRoot,
+        freeze: bool = False,
+        context: Optional[ConversionContext] = None,
+    ) -> Union[KeymapConfig, FrozenKeymapConfig]:
         """Extract keymap configuration from DTS AST.
 
         Args:
             ast: The DTS AST root node
+            freeze: Return an immutable FrozenKeymapConfig instead of the
+                mutable KeymapConfig
+            context: Run the extraction on bind(context), leaving this
+                extractor untouched
 
         Returns:
-            KeymapConfig instance with extracted information
+            KeymapConfig (or FrozenKeymapConfig) with extracted information
         """
+        if context is not None:
+            return self.bind(context).extract(ast, freeze=freeze)
+        items = self.iter_extract(ast)
+        header = next(items)
+        for layer in items:
+            if layer.name in self.layers:
+                self._warn(
+                    "duplicate-layer",
+                    f"Duplicate layer name {layer.name}. "
+                    "Keeping the first definition.",
+                )
+                continue
+            self.layers[layer.name] = layer
+
+        # Create and return keymap config
+        keymap = KeymapConfig(
+            layers=list(self.layers.values()),
+            behaviors=header.behaviors,  # Keep as dictionary
+            combos=header.combos,
+            conditional_layers=header.conditional_layers,
+        )
+        return keymap.freeze() if freeze else keymap
+
+    def iter_extract(
+        self, ast: DtsRoot, context: Optional[ConversionContext] = None
+    ) -> Iterator[Union[KeymapConfig, Layer]]:
+        """Extract keymap configuration from DTS AST incrementally.
+
+        The first item yielded is a KeymapConfig with no layers that carries
+        the resolved behaviors, combos and conditional layers. Each Layer is
+        then yielded as soon as it is built, so a consumer only has to hold
+        one layer plus the shared behavior table at a time.
+
+        The behaviors dict in the first item is shared with the extractor and
+        may still gain built-in behaviors (e.g. ``mt``) while later layers are
+        parsed.
+
+        Args:
+            ast: The DTS AST root node
+            context: Run the extraction on bind(context), leaving this
+                extractor untouched
+
+        Yields:
+            The shared KeymapConfig header, then each Layer in keymap order
+        """
+        if context is not None:
+            yield from self.bind(context).iter_extract(ast)
+            return
         logging.info(
             f"[extract] ast.children.keys() at start: {list(ast.children.keys())}"
         )
@@ -45,7 +133,9 @@ class KeymapExtractor:
         self.layers = {}
         self.combos = []
         self.conditional_layers = []
+        self.unicode = UnicodeRegistry()
         self._behavior_nodes_to_process = []
+        self._binding_keys = set()
 
         # The 'ast' (DtsRoot) object itself represents the root '/' node.
         # Its children are directly ast.children.
@@ -143,26 +233,29 @@ class KeymapExtractor:
         for node in conditional_layers_nodes:
             self._extract_conditional_layers(node)
 
-        # Pass 2: Process deferred behavior details (like macro bindings)
+        # Pass 2: Process deferred behavior details (like macro bindings).
+        # Unicode behaviors are resolved before and after it, since unicode
+        # entry macros are only recognizable once their bindings are parsed.
+        self.unicode = UnicodeRegistry.from_behaviors(self.behaviors)
         self._extract_behaviors_pass2()
-
-        # Pass 3: Extract layers (which can now reference fully defined behaviors)
-        if keymap_node:
-            self._extract_layers(keymap_node)
-        else:
-            print("Warning: No 'keymap' node found under root '/'.")
+        self.unicode = UnicodeRegistry.from_behaviors(self.behaviors)
 
         logging.info(
             f"[extract] ast.children.keys() before layers: {list(ast.children.keys())}"
         )
-        # Create and return keymap config
-        return KeymapConfig(
-            layers=list(self.layers.values()),
-            behaviors=self.behaviors,  # Keep as dictionary
+        yield KeymapConfig(
+            layers=[],
+            behaviors=self.behaviors,
             combos=self.combos,
             conditional_layers=self.conditional_layers,
         )
 
+        # Pass 3: Extract layers (which can now reference fully defined behaviors)
+        if keymap_node:
+            yield from self._iter_layers(keymap_node)
+        else:
+            self._warn("keymap-missing", "No 'keymap' node found under root '/'.")
+
     def _extract_behaviors_pass1(self, behaviors_node: DtsNode) -> None:
         """Pass 1: Create behavior objects, register labels, defer nested parsing."""
         for name, child_node in behaviors_node.children.items():
@@ -231,9 +324,10 @@ class KeymapExtractor:
                                 )
 
                     if behavior_key in self.behaviors:
-                        print(
-                            "Warning: Duplicate behavior key "
-                            f"{behavior_key}. Overwriting."
+                        self._warn(
+                            "duplicate-behavior",
+                            f"Duplicate behavior key {behavior_key}. Overwriting.",
+                            child_node,
                         )
                     self.behaviors[behavior_key] = behavior_object
 
@@ -247,9 +341,10 @@ class KeymapExtractor:
         for behavior_key, node in self._behavior_nodes_to_process:
             behavior = self.behaviors.get(behavior_key)
             if not behavior:
-                print(
-                    f"Warning: Behavior '{behavior_key}' not found "
-                    "during pass 2 processing."
+                self._warn(
+                    "behavior-missing",
+                    f"Behavior '{behavior_key}' not found during pass 2 processing.",
+                    node,
                 )
                 continue
 
@@ -259,9 +354,11 @@ class KeymapExtractor:
                     # For macro behaviors, parse as Bindings, not just strings
                     behavior.bindings = self._parse_bindings(bindings_prop.value)
                 else:
-                    print(
-                        f"Warning: Macro behavior '{behavior_key}' missing "
-                        "valid bindings property."
+                    self._warn(
+                        "macro-invalid-bindings",
+                        f"Macro behavior '{behavior_key}' missing valid "
+                        "bindings property.",
+                        node,
                     )
             # Add processing for other behaviors needing a second pass here...
 
@@ -285,17 +382,20 @@ class KeymapExtractor:
                 and bindings_prop
                 and bindings_prop.type == "array"
             ):
-                print(
-                    f"Warning: Skipping combo '{name}' due to "
-                    f"missing/invalid properties."
+                self._warn(
+                    "combo-invalid",
+                    f"Skipping combo '{name}' due to missing/invalid properties.",
+                    child,
                 )
                 continue
 
             # Parse timeout (handle single int or array)
             timeout_ms = self._parse_integer_prop(timeout_prop)
             if timeout_ms is None:
-                print(
-                    f"Warning: Skipping combo '{name}' due to " f"invalid timeout-ms."
+                self._warn(
+                    "combo-invalid",
+                    f"Skipping combo '{name}' due to invalid timeout-ms.",
+                    child,
                 )
                 continue
 
@@ -307,9 +407,10 @@ class KeymapExtractor:
                     if isinstance(positions_prop.value, list)
                 ]
             except (ValueError, TypeError):
-                print(
-                    f"Warning: Skipping combo '{name}' due to "
-                    f"invalid key-positions."
+                self._warn(
+                    "combo-invalid",
+                    f"Skipping combo '{name}' due to invalid key-positions.",
+                    child,
                 )
                 continue
 
@@ -319,13 +420,19 @@ class KeymapExtractor:
                 bindings_prop.value if isinstance(bindings_prop.value, list) else []
             )
             if not parsed_bindings:
-                print(f"Warning: Skipping combo '{name}' due to invalid bindings.")
+                self._warn(
+                    "combo-invalid",
+                    f"Skipping combo '{name}' due to invalid bindings.",
+                    child,
+                )
                 continue
             # Combos expect a single resulting binding
             if len(parsed_bindings) != 1:
-                print(
-                    f"Warning: Skipping combo '{name}' - expected 1 binding, "
-                    f"found {len(parsed_bindings)}."
+                self._warn(
+                    "combo-invalid",
+                    f"Skipping combo '{name}' - expected 1 binding, "
+                    f"found {len(parsed_bindings)}.",
+                    child,
                 )
                 continue
             binding = parsed_bindings[0]
@@ -337,7 +444,7 @@ class KeymapExtractor:
                 binding=binding,
             )
             self.combos.append(combo)
-            print(f"Added combo {name}: {combo}")
+            logging.debug(f"Added combo {name}: {combo}")
 
     def _extract_conditional_layers(self, cond_layers_node: DtsNode) -> None:
         """Extract conditional layers from 'conditional_layers' node."""
@@ -355,9 +462,11 @@ class KeymapExtractor:
                 and then_layer_prop
                 and then_layer_prop.type in ["integer", "array"]
             ):
-                print(
-                    f"Warning: Skipping conditional layer '{name}' due to "
-                    f"missing/invalid properties."
+                self._warn(
+                    "conditional-layer-invalid",
+                    f"Skipping conditional layer '{name}' due to "
+                    "missing/invalid properties.",
+                    child,
                 )
                 continue
 
@@ -369,18 +478,20 @@ class KeymapExtractor:
                     if isinstance(if_layers_prop.value, list)
                 ]
             except (ValueError, TypeError):
-                print(
-                    f"Warning: Skipping conditional layer '{name}' due to "
-                    f"invalid if-layers."
+                self._warn(
+                    "conditional-layer-invalid",
+                    f"Skipping conditional layer '{name}' due to invalid if-layers.",
+                    child,
                 )
                 continue
 
             # Parse then-layer (handle single int or array)
             then_layer_num = self._parse_integer_prop(then_layer_prop)
             if then_layer_num is None:
-                print(
-                    f"Warning: Skipping conditional layer '{name}' due to "
-                    f"invalid then-layer."
+                self._warn(
+                    "conditional-layer-invalid",
+                    f"Skipping conditional layer '{name}' due to invalid then-layer.",
+                    child,
                 )
                 continue
 
@@ -388,22 +499,25 @@ class KeymapExtractor:
                 name=name, if_layers=if_layer_nums, then_layer=then_layer_num
             )
             self.conditional_layers.append(cond_layer)
-            print(f"Added conditional layer {name}: {cond_layer}")
+            logging.debug(f"Added conditional layer {name}: {cond_layer}")
 
     def _create_hold_tap_behavior(self, node: DtsNode) -> Optional[HoldTap]:
         """Create a hold-tap behavior instance (called in Pass 1)."""
         tapping_term_prop = node.properties.get("tapping-term-ms")
         if not tapping_term_prop:
-            print(
-                f"Warning: Hold-tap behavior '{node.name}' missing " f"tapping-term-ms."
+            self._warn(
+                "hold-tap-invalid",
+                f"Hold-tap behavior '{node.name}' missing tapping-term-ms.",
+                node,
             )
             return None
 
         tapping_term_ms = self._parse_integer_prop(tapping_term_prop)
         if tapping_term_ms is None:
-            print(
-                f"Warning: Hold-tap behavior '{node.name}' has invalid "
-                f"tapping-term-ms."
+            self._warn(
+                "hold-tap-invalid",
+                f"Hold-tap behavior '{node.name}' has invalid tapping-term-ms.",
+                node,
             )
             return None
 
@@ -431,6 +545,18 @@ class KeymapExtractor:
 
     def _extract_layers(self, keymap_node: DtsNode) -> None:
         """Extract layer definitions from the 'keymap' node (Pass 3)."""
+        for layer in self._iter_layers(keymap_node):
+            if layer.name in self.layers:
+                self._warn(
+                    "duplicate-layer",
+                    f"Duplicate layer name {layer.name}. "
+                    "Keeping the first definition.",
+                )
+                continue
+            self.layers[layer.name] = layer
+
+    def _iter_layers(self, keymap_node: DtsNode) -> Iterator[Layer]:
+        """Yield layer definitions from the 'keymap' node one at a time."""
         # Skip compatible property if present
         for idx, (name, child) in enumerate(keymap_node.children.items()):
             if name == "compatible" and "compatible" in child.properties:
@@ -439,20 +565,43 @@ class KeymapExtractor:
             # Assume direct children of keymap are layers
             layer = self._create_layer(child, idx)
             if layer:
-                if layer.name in self.layers:
-                    print(
-                        f"Warning: Duplicate layer name {layer.name}. " f"Overwriting."
-                    )
-                self.layers[layer.name] = layer
-                print(f"Added layer {layer.name}: {layer}")
+                logging.debug(f"Added layer {layer.name}: {layer}")
+                self._count_bindings(layer)
+                yield layer
             else:
-                print(f"Warning: Could not create layer from node '{name}'.")
+                self._warn(
+                    "layer-invalid",
+                    f"Could not create layer from node '{name}'.",
+                    child,
+                )
+
+    def _count_bindings(self, layer: Layer) -> None:
+        """Add a layer's bindings to the layer, binding and distinct counts."""
+        keys = self._binding_keys
+        before = len(keys)
+        for binding in layer.bindings:
+            behavior = getattr(binding, "behavior", None)
+            params = getattr(binding, "params", None) or ()
+            keys.add(
+                (
+                    type(binding),
+                    getattr(behavior, "name", None),
+                    tuple(str(p) for p in params),
+                )
+            )
+        self.stats["layers"] += 1
+        self.stats["bindings"] += len(layer.bindings)
+        self.stats["distinct_bindings"] += len(keys) - before
 
     def _create_layer(self, node: DtsNode, index: int) -> Optional[Layer]:
         """Create a layer instance from a node (called in Pass 3)."""
         bindings_prop = node.properties.get("bindings")
         if not bindings_prop or bindings_prop.type != "array":
-            print(f"Warning: Layer '{node.name}' missing valid bindings property.")
+            self._warn(
+                "layer-invalid",
+                f"Layer '{node.name}' missing valid bindings property.",
+                node,
+            )
             return None
 
         # Parse bindings now, all behaviors should be available
@@ -496,19 +645,25 @@ class KeymapExtractor:
         }
 
         bindings: list[Binding] = []  # Initialize with correct type
+        unicode_characters = self.unicode.characters
         i = 0
         while i < len(value):
             token = value[i]
-            binding_str = str(token)
-            # Always check for Unicode macro first
-            if is_unicode_binding(binding_str):
-                unicode_binding = UnicodeBinding.from_zmk(binding_str)
-                if unicode_binding is not None:
-                    bindings.append(unicode_binding)
-                i += 1
-                continue
             if isinstance(token, str) and token.startswith("&"):
                 behavior_name = token[1:]
+                character = unicode_characters.get(behavior_name)
+                if character is None and behavior_name not in self.behaviors:
+                    # Undefined unicode_* behaviors are placeholders
+                    if behavior_name.startswith(UNICODE_NAME_PREFIX):
+                        character = UNKNOWN_UNICODE_CHARACTER
+                if character is not None:
+                    bindings.append(
+                        UnicodeBinding(
+                            character, self.unicode.shifted.get(behavior_name)
+                        )
+                    )
+                    i += 1
+                    continue
                 # Special handling for reset and bootloader
                 if behavior_name in ("reset", "bootloader"):
                     behavior = self.behaviors.get(behavior_name)
@@ -645,11 +800,6 @@ class KeymapExtractor:
                 bindings.append(Binding(behavior=behavior, params=params))
                 i += 1 + actual_params_consumed
             else:
-                # Unicode macro detection
-                if is_unicode_binding(str(token)):
-                    unicode_binding = UnicodeBinding.from_zmk(str(token))
-                    bindings.append(unicode_binding)
-                    continue
                 bindings.append(self._create_binding(str(token)))
                 i += 1
 
@@ -788,6 +938,17 @@ class KeymapExtractor:
             logging.error(msg)
             return Binding(behavior=None, params=[f"ERROR: {msg}"])
 
+    def _warn(
+        self, code: str, message: str, node: Optional[DtsNode] = None
+    ) -> None:
+        """Record a warning diagnostic, located at node if one is given."""
+        if node is None:
+            self.diagnostics.warning(code, message)
+        else:
+            self.diagnostics.warning(
+                code, message, path=node.path, line=node.line, column=node.column
+            )
+
     def _parse_integer_prop(self, prop: DtsProperty) -> Optional[int]:
         """Safely parse an integer value from a property."""
         # Handle direct integer/scalar types from parser simplification
@@ -1,8 +1,10 @@
 """DTS parser for converting DTS to keymap configuration."""
 
+from collections import Counter
 from typing import List, Any, Tuple, Optional
 from .ast import DtsNode, DtsProperty, DtsRoot
 from .error_handler import DtsParseError, format_error_context
+from converter.context import ConversionContext
 import logging
 
 
@@ -13,19 +15,32 @@ class DtsParser:
     Use the CLI's --debug, --verbose, or --log-level flags to control visibility.
     """
 
-    def __init__(self):
-        """Initialize parser."""
+    def __init__(self, stats: Optional[Counter] = None):
+        """Initialize parser.
+
+        Args:
+            stats: Counter that receives token and node counts; a new one is
+                created if none is given.
+        """
+        self.stats = stats if stats is not None else Counter()
         self.tokens: List[str] = []
         self.pos = 0
         self.content: str = ""
         self.line_map: List[Tuple[int, int]] = []  # (line, column) for each token
 
-    def parse(self, content: str, file: Optional[str] = None) -> DtsRoot:
+    def parse(
+        self,
+        content: str,
+        file: Optional[str] = None,
+        context: Optional[ConversionContext] = None,
+    ) -> DtsRoot:
         """Parse DTS content into an AST.
 
         Args:
             content: DTS content string
             file: Optional file path for error reporting
+            context: Parse with a fresh parser, leaving this one untouched so
+                it can be shared between concurrent conversions
 
         Returns:
             DtsRoot object representing the parsed AST
@@ -33,6 +48,8 @@ class DtsParser:
         Raises:
             DtsParseError: If the content is not valid DTS
         """
+        if context is not None:
+            return DtsParser(stats=context.stats).parse(content, file)
         logging.info("Starting tokenization of DTS content")
         logging.debug(f"First 100 chars of content: {repr(content[:100])}")
         logging.debug(
@@ -193,6 +210,8 @@ class DtsParser:
                 "AST root children at return: %s",
                 list(ast_root.children.keys()),
             )
+            self.stats["tokens"] += len(self.tokens)
+            self.stats["nodes"] += _count_nodes(ast_root)
             return ast_root
         except DtsParseError as e:
             logging.error("Parse error: %s", str(e))
@@ -739,9 +758,10 @@ class DtsParser:
 
             # After the loop, current_token is the actual node name
             actual_node_name = current_token
+            name_line, name_col = self._get_pos_info(self.pos)
             self.pos += 1  # Consume the actual_node_name token
 
-            child = DtsNode(name=actual_node_name)
+            child = DtsNode(name=actual_node_name, line=name_line, column=name_col)
             for lbl in current_labels_for_node:
                 child.add_label(lbl)
                 logging.debug(
@@ -795,3 +815,14 @@ class DtsParser:
             self.pos,
         )
         return
+
+
+def _count_nodes(root: DtsNode) -> int:
+    """Return the number of nodes in the tree under root, including root."""
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children.values())
+    return count
@@ -3,14 +3,37 @@
 This module provides functionality for preprocessing DTS files before parsing.
 """
 
+import logging
 import os
 import subprocess
 import re
 import tempfile
 import shlex
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 
+from converter.transformer.keycode_registry import usage_hex
+
+# Single-character key names rewritten to HID usage codes after cpp runs.
+# Digits are the bare number row names ("1" -> N1).
+_POSTPROCESS_CODES = {
+    **{c: usage_hex(c) for c in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"},
+    **{d: usage_hex(f"N{d}") for d in "1234567890"},
+}
+# Headers shipped with the converter (dt-bindings, ZMK behaviors)
+DEFAULT_INCLUDE_PATH = str(Path(__file__).resolve().parent / "include")
+# #include directives: opening delimiter and file name
+_INCLUDE_RE = re.compile(
+    r'^[ \t]*#[ \t]*include[ \t]*([<"])([^>"\n]+)[>"]', re.MULTILINE
+)
+_KP_KEY_RE = re.compile(r"(&kp\s+)([A-Z0-9])\b")
+_ARRAY_KEY_RE = re.compile(r"(<|\s)([A-Z0-9])(?=\s|>)")
+
+
+def default_include_paths(extra: Optional[List[str]] = None) -> List[str]:
+    """Return the bundled include path followed by any extra paths."""
+    return [DEFAULT_INCLUDE_PATH, *(extra or [])]
+
 
 class PreprocessorError(Exception):
     """Exception raised when preprocessing fails."""
@@ -119,22 +142,47 @@ class DtsPreprocessor:
 
         return None
 
-    def preprocess(
-        self,
-        input_path: str,
-        matrix_size: Optional[Tuple[int, int]] = None,
-    ) -> str:
-        """Preprocess a DTS file.
+    def resolve_includes(self, input_path: str) -> List[Path]:
+        """Find the files input_path includes, directly or indirectly.
+
+        Quoted includes are looked up next to the including file first and
+        then in the include paths, like cpp does; angle-bracket includes
+        only in the include paths. Includes that can't be found are skipped,
+        cpp reports them when preprocessing.
 
         Args:
             input_path: Path to the input file
-            matrix_size: Optional tuple of (rows, cols) for matrix transform
 
         Returns:
-            The preprocessed content as a string
+            The included files in the order they were first found
+        """
+        found: Dict[Path, None] = {}
+        pending = [Path(input_path)]
+        while pending:
+            current = pending.pop(0)
+            try:
+                content = current.read_text()
+            except (OSError, UnicodeDecodeError):
+                continue
+            for match in _INCLUDE_RE.finditer(content):
+                delimiter, name = match.groups()
+                search = [Path(p) for p in self.include_paths]
+                if delimiter == '"':
+                    search.insert(0, current.parent)
+                for directory in search:
+                    candidate = directory / name
+                    if candidate.is_file():
+                        if candidate not in found:
+                            found[candidate] = None
+                            pending.append(candidate)
+                        break
+        return list(found)
+
+    def read_source(self, input_path: str) -> str:
+        """Return the content of the file to preprocess.
 
         Raises:
-            PreprocessorError: If preprocessing fails
+            PreprocessorError: If the file doesn't exist or can't be read
         """
         input_path = Path(input_path)
         if not input_path.exists():
@@ -147,7 +195,7 @@ class DtsPreprocessor:
 
         try:
             with open(input_path, "r") as f:
-                content_for_cpp = f.read()
+                return f.read()
         except Exception as e:
             raise PreprocessorError(
                 f"Failed to read input file: {str(e)}",
@@ -155,6 +203,97 @@ class DtsPreprocessor:
                 help_text=("Ensure the file exists and has proper " "read permissions"),
             )
 
+    def build_command(self, input_path: str, source: str) -> List[str]:
+        """Return the preprocessor command line.
+
+        Args:
+            input_path: Path of the original file; quoted includes are
+                looked up next to it
+            source: File the preprocessor reads, or "-" for stdin
+
+        Returns:
+            The command as a list of arguments, for use with shell=False
+        """
+        input_path = Path(input_path)
+        if os.uname().sysname == "Darwin":
+            # Use clang with assembler-with-cpp for .dts files on macOS
+            clang_path = "/usr/bin/clang"
+            cpp_cmd = [
+                clang_path,
+                "-E",
+                "-nostdinc",
+                "-undef",
+                "-x",
+                "assembler-with-cpp",
+            ]
+            # cpp runs on a temp copy or stdin; quoted includes are relative
+            # to the original file
+            cpp_cmd.extend(["-iquote", str(input_path.parent)])
+            for path in self.include_paths:
+                cpp_cmd.extend(["-I", str(path)])
+            cpp_cmd.append(str(source))
+        else:
+            cpp_cmd = [
+                str(self.cpp_path),
+                "-E",
+                "-iquote",
+                str(input_path.parent),
+            ]
+            for path in self.include_paths:
+                cpp_cmd.extend(["-I", str(path)])
+            cpp_cmd.extend(["-x", "c", str(source)])
+        return cpp_cmd
+
+    @staticmethod
+    def failed(input_path: str, detail: str) -> PreprocessorError:
+        """Return the error raised when the preprocessor exits with an error."""
+        return PreprocessorError(
+            "Failed to process DTS directives",
+            file=str(input_path),
+            context=detail,
+            help_text=("Check for malformed DTS directives in " "input file"),
+        )
+
+    @staticmethod
+    def postprocess(output: str) -> str:
+        """Replace symbolic key names in the preprocessor output.
+
+        Args:
+            output: What the preprocessor wrote to stdout
+
+        Returns:
+            The output with &kp <key> and bare <key> array entries (e.g.,
+            <A B C>) rewritten to numeric codes
+        """
+
+        def repl(match):
+            code = _POSTPROCESS_CODES.get(match.group(2))
+            if code is None:
+                return match.group(0)
+            return f"{match.group(1)}{code}"
+
+        processed = _KP_KEY_RE.sub(repl, output)
+        return _ARRAY_KEY_RE.sub(repl, processed)
+
+    def preprocess(
+        self,
+        input_path: str,
+        matrix_size: Optional[Tuple[int, int]] = None,
+    ) -> str:
+        """Preprocess a DTS file.
+
+        Args:
+            input_path: Path to the input file
+            matrix_size: Optional tuple of (rows, cols) for matrix transform
+
+        Returns:
+            The preprocessed content as a string
+
+        Raises:
+            PreprocessorError: If preprocessing fails
+        """
+        content_for_cpp = self.read_source(input_path)
+
         # Create a temporary file for the preprocessor input
         tmp_input = tempfile.NamedTemporaryFile(
             mode="w",
@@ -166,48 +305,12 @@ class DtsPreprocessor:
         tmp_input.close()
         tmp_input_file = Path(tmp_input.name)
 
-        # Debug: print environment and temp file contents
-        print("[DtsPreprocessor] ENVIRONMENT:")
-        for k, v in os.environ.items():
-            if len(v) > 40:
-                print(f"  {k}={v[:20]}...{v[-20:]}")
-            else:
-                print(f"  {k}={v}")
-        if len(str(tmp_input_file)) > 70:
-            print(f"[DtsPreprocessor] Temp file: " f"{str(tmp_input_file)[:70]}...")
-        else:
-            print(f"[DtsPreprocessor] Temp file: {tmp_input_file}")
-        with open(tmp_input_file, "r") as f:
-            print("[DtsPreprocessor] Temp file contents:")
-            print(f.read())
+        logging.debug("[DtsPreprocessor] Temp file: %s", tmp_input_file)
+        logging.debug("[DtsPreprocessor] Temp file contents:\n%s", content_for_cpp)
 
         try:
-            # Build preprocessor command as a list for shell=False
-            if os.uname().sysname == "Darwin":
-                # Use clang with assembler-with-cpp for .dts files on macOS
-                clang_path = "/usr/bin/clang"
-                cpp_cmd = [
-                    clang_path,
-                    "-E",
-                    "-nostdinc",
-                    "-undef",
-                    "-x",
-                    "assembler-with-cpp",
-                ]
-                for path in self.include_paths:
-                    cpp_cmd.extend(["-I", str(path)])
-                cpp_cmd.append(str(tmp_input_file))
-            else:
-                cpp_cmd = [
-                    str(self.cpp_path),
-                    "-E",
-                ]
-                for path in self.include_paths:
-                    cpp_cmd.extend(["-I", str(path)])
-                cpp_cmd.extend(["-x", "c", str(tmp_input_file)])
-
-            # Debug: print the constructed command list
-            print("[DtsPreprocessor] cpp command:", cpp_cmd)
+            cpp_cmd = self.build_command(input_path, str(tmp_input_file))
+            logging.debug("[DtsPreprocessor] cpp command: %s", cpp_cmd)
 
             # Run preprocessor with shell=False
             try:
@@ -219,81 +322,9 @@ class DtsPreprocessor:
                     shell=False,
                 )
             except subprocess.CalledProcessError as e:
-                raise PreprocessorError(
-                    "Failed to process DTS directives",
-                    file=str(input_path),
-                    context=str(e),
-                    help_text=("Check for malformed DTS directives in " "input file"),
-                )
-
-            # Post-process: replace symbolic key names with numeric values and add comments
-            keycode_map = {
-                "A": "0x04",
-                "B": "0x05",
-                "C": "0x06",
-                "D": "0x07",
-                "E": "0x08",
-                "F": "0x09",
-                "G": "0x0A",
-                "H": "0x0B",
-                "I": "0x0C",
-                "J": "0x0D",
-                "K": "0x0E",
-                "L": "0x0F",
-                "M": "0x10",
-                "N": "0x11",
-                "O": "0x12",
-                "P": "0x13",
-                "Q": "0x14",
-                "R": "0x15",
-                "S": "0x16",
-                "T": "0x17",
-                "U": "0x18",
-                "V": "0x19",
-                "W": "0x1A",
-                "X": "0x1B",
-                "Y": "0x1C",
-                "Z": "0x1D",
-                "1": "0x1E",
-                "2": "0x1F",
-                "3": "0x20",
-                "4": "0x21",
-                "5": "0x22",
-                "6": "0x23",
-                "7": "0x24",
-                "8": "0x25",
-                "9": "0x26",
-                "0": "0x27",
-            }
-
-            def repl(match):
-                key = match.group(2)
-                if key in keycode_map:
-                    code = keycode_map[key]
-                    # Only replace with numeric code, do not add comment
-                    return f"{match.group(1)}{code}"
-                return match.group(0)
+                raise self.failed(input_path, str(e))
 
-            # Replace &kp <key> with &kp 0xXX (no comment)
-            processed = re.sub(
-                r"(&kp\s+)([A-Z0-9])\b",
-                repl,
-                result.stdout,
-            )
-
-            # Replace bare <key> in arrays (e.g., <A B C>)
-            def array_repl(m):
-                key = m.group(2)
-                if key in keycode_map:
-                    return f"{m.group(1)}{keycode_map[key]}"
-                return m.group(0)
-
-            processed = re.sub(
-                r"(<|\s)([A-Z0-9])(?=\s|>)",
-                array_repl,
-                processed,
-            )
-            return processed
+            return self.postprocess(result.stdout)
 
         finally:
             # Clean up temporary file
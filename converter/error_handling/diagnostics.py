@@ -0,0 +1,173 @@
+"""Structured diagnostics collection for the ZMK to Kanata converter.
+
+Pipeline stages record warnings and errors into a DiagnosticsCollector
+instead of printing them, so converter output on stdout stays clean and the
+caller decides how (and whether) to render them at the end.
+"""
+
+import json
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from converter.error_handling.error_manager import ErrorSeverity
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Diagnostic:
+    """A single diagnostic produced while converting a keymap."""
+
+    code: str
+    severity: ErrorSeverity
+    message: str
+    path: Optional[str] = None
+    line: Optional[int] = None
+    column: Optional[int] = None
+
+    @property
+    def location(self) -> str:
+        """Return 'path:line:column', omitting the parts that are unknown."""
+        parts = [self.path or ""]
+        if self.line is not None:
+            parts.append(str(self.line))
+            if self.column is not None:
+                parts.append(str(self.column))
+        return ":".join(parts)
+
+    def to_dict(self) -> dict:
+        """Return a serializable dictionary representation of this diagnostic."""
+        return {
+            "code": self.code,
+            "severity": self.severity.value,
+            "message": self.message,
+            "path": self.path,
+            "line": self.line,
+            "column": self.column,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Diagnostic":
+        """Rebuild a diagnostic from the output of to_dict()."""
+        return cls(
+            data["code"],
+            ErrorSeverity(data["severity"]),
+            data["message"],
+            data.get("path"),
+            data.get("line"),
+            data.get("column"),
+        )
+
+    def to_text(self) -> str:
+        """Return a one-line human readable rendering of this diagnostic."""
+        location = self.location
+        prefix = f"{self.severity.value}[{self.code}]"
+        if location:
+            return f"{prefix} {location}: {self.message}"
+        return f"{prefix} {self.message}"
+
+
+class DiagnosticsCollector:
+    """Collects diagnostics for one conversion.
+
+    Identical diagnostics are recorded once (O(1) dedup via a dict keyed on
+    the full diagnostic), insertion order is preserved, and a lock guards
+    mutation so stages running on different threads can share a collector.
+    Each conversion should use its own collector; there is no global state.
+    """
+
+    def __init__(self):
+        """Initialize an empty collector."""
+        self._seen: Dict[Diagnostic, None] = {}
+        self._counts: Dict[Tuple[str, ErrorSeverity], int] = {}
+        self._lock = threading.Lock()
+
+    def add(
+        self,
+        code: str,
+        message: str,
+        severity: ErrorSeverity = ErrorSeverity.WARNING,
+        path: Optional[str] = None,
+        line: Optional[int] = None,
+        column: Optional[int] = None,
+    ) -> bool:
+        """Record a diagnostic.
+
+        Args:
+            code: Short machine-readable identifier (e.g. 'combo-invalid')
+            message: Human readable description
+            severity: Severity of the diagnostic
+            path: DTS node path the diagnostic refers to, if any
+            line: Source line, if known
+            column: Source column, if known
+
+        Returns:
+            True if the diagnostic was new, False if it was a duplicate
+        """
+        diagnostic = Diagnostic(code, severity, message, path, line, column)
+        with self._lock:
+            if diagnostic in self._seen:
+                return False
+            self._seen[diagnostic] = None
+            key = (code, severity)
+            self._counts[key] = self._counts.get(key, 0) + 1
+        logger.debug(diagnostic.to_text())
+        return True
+
+    def warning(self, code: str, message: str, **location) -> bool:
+        """Record a warning diagnostic."""
+        return self.add(code, message, ErrorSeverity.WARNING, **location)
+
+    def error(self, code: str, message: str, **location) -> bool:
+        """Record an error diagnostic."""
+        return self.add(code, message, ErrorSeverity.ERROR, **location)
+
+    def extend(self, diagnostics) -> None:
+        """Record every diagnostic from an iterable of Diagnostic objects."""
+        for d in diagnostics:
+            self.add(d.code, d.message, d.severity, d.path, d.line, d.column)
+
+    @property
+    def diagnostics(self) -> List[Diagnostic]:
+        """Return the recorded diagnostics in insertion order."""
+        with self._lock:
+            return list(self._seen)
+
+    def count(self, code: Optional[str] = None) -> int:
+        """Return the number of distinct diagnostics, optionally for one code."""
+        with self._lock:
+            if code is None:
+                return len(self._seen)
+            return sum(n for (c, _), n in self._counts.items() if c == code)
+
+    def has_errors(self) -> bool:
+        """Check whether any error or fatal diagnostics were recorded."""
+        with self._lock:
+            return any(
+                severity is not ErrorSeverity.WARNING and n
+                for (_, severity), n in self._counts.items()
+            )
+
+    def clear(self) -> None:
+        """Remove all recorded diagnostics."""
+        with self._lock:
+            self._seen.clear()
+            self._counts.clear()
+
+    def __len__(self) -> int:
+        """Return the number of distinct diagnostics."""
+        return len(self._seen)
+
+    def __iter__(self) -> Iterator[Diagnostic]:
+        """Iterate over a snapshot of the recorded diagnostics."""
+        return iter(self.diagnostics)
+
+    def render_text(self) -> str:
+        """Render all diagnostics as text, one per line."""
+        return "\n".join(d.to_text() for d in self.diagnostics)
+
+    def render_json(self, indent: Optional[int] = 2) -> str:
+        """Render all diagnostics as a JSON array."""
+        return json.dumps([d.to_dict() for d in self.diagnostics], indent=indent)
@@ -3,6 +3,7 @@
 from enum import Enum
 from typing import List, Optional
 import logging
+import threading
 
 logger = logging.getLogger(__name__)
 
@@ -16,15 +17,18 @@ class ErrorSeverity(Enum):
 
 
 class ErrorManager:
-    """Manages error handling and reporting."""
+    """Manages error handling and reporting.
 
-    _instance: Optional["ErrorManager"] = None
+    Each conversion should use its own instance (see ConversionContext);
+    get_error_manager() returns a process-wide default for code that has
+    none. A lock guards mutation so stages on different threads can share
+    an instance.
+    """
 
-    def __new__(cls):
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-            cls._instance._errors: List[dict] = []
-        return cls._instance
+    def __init__(self):
+        """Initialize an empty error manager."""
+        self._errors: List[dict] = []
+        self._lock = threading.Lock()
 
     def add_error(
         self,
@@ -44,7 +48,8 @@ class ErrorManager:
             "severity": severity,
             "context": context or {},
         }
-        self._errors.append(error)
+        with self._lock:
+            self._errors.append(error)
 
         # Log the error
         if severity == ErrorSeverity.WARNING:
@@ -60,11 +65,13 @@ class ErrorManager:
         Returns:
             List of error dictionaries
         """
-        return self._errors
+        with self._lock:
+            return list(self._errors)
 
     def clear(self) -> None:
         """Clear all errors."""
-        self._errors = []
+        with self._lock:
+            self._errors = []
 
     def has_errors(self) -> bool:
         """Check if there are any errors.
@@ -80,11 +87,12 @@ class ErrorManager:
         Returns:
             A string containing all error messages
         """
-        if not self._errors:
+        errors = self.get_errors()
+        if not errors:
             return "No errors"
 
         summary = []
-        for error in self._errors:
+        for error in errors:
             severity = error["severity"].value.upper()
             message = error["message"]
             summary.append(f"{severity}: {message}")
@@ -92,10 +100,13 @@ class ErrorManager:
         return "\n".join(summary)
 
 
+_default_manager = ErrorManager()
+
+
 def get_error_manager() -> ErrorManager:
-    """Get the singleton error manager instance.
+    """Get the process-wide default error manager instance.
 
     Returns:
         The ErrorManager instance
     """
-    return ErrorManager()
+    return _default_manager
@@ -8,53 +8,11 @@ class KanataConverter:
     """A class to convert parsed DTS data to Kanata configuration."""
 
     def __init__(self):
-        """Initialize the Kanata converter."""
-        # Basic key mapping from ZMK to Kanata
-        self._key_mapping = {
-            "&kp": {
-                "A": "a",
-                "B": "b",
-                "C": "c",
-                "D": "d",
-                "E": "e",
-                "F": "f",
-                "G": "g",
-                "H": "h",
-                "I": "i",
-                "J": "j",
-                "K": "k",
-                "L": "l",
-                "M": "m",
-                "N": "n",
-                "O": "o",
-                "P": "p",
-                "Q": "q",
-                "R": "r",
-                "S": "s",
-                "T": "t",
-                "U": "u",
-                "V": "v",
-                "W": "w",
-                "X": "x",
-                "Y": "y",
-                "Z": "z",
-                "SPACE": "space",
-                "ENTER": "enter",
-                "ESC": "esc",
-                "TAB": "tab",
-                "BACKSPACE": "backspace",
-                "DELETE": "delete",
-                "INSERT": "insert",
-                "HOME": "home",
-                "END": "end",
-                "PAGE_UP": "pageup",
-                "PAGE_DOWN": "pagedown",
-                "UP": "up",
-                "DOWN": "down",
-                "LEFT": "left",
-                "RIGHT": "right",
-            }
-        }
+        """Initialize the Kanata converter.
+
+        Key names are resolved through the shared keycode registry by
+        zmk_binding_to_kanata, so the converter keeps no table of its own.
+        """
 
     def _convert_key_code(self, key_code: str) -> str:
         """Convert a ZMK key code to a Kanata key code using the centralized mapping utility."""
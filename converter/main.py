@@ -1,28 +1,60 @@
-"""Main module for the ZMK to Kanata converter."""
+"""Main module for the ZMK to Kanata converter.
+
+Only the standard library modules needed to parse arguments are imported
+at load time; the pipeline, its key tables and optional dependencies such
+as yaml are imported on first use, so ``--help``, ``--version`` and the
+subcommand dispatch start quickly.
+"""
 
 import argparse
+import functools
 import os
 import sys
-from typing import List, Optional
+from typing import TYPE_CHECKING, List, Optional
 import logging
-import json
-import yaml
 
-from converter.transformer.kanata_transformer import KanataTransformer
-from converter.dts.preprocessor import DtsPreprocessor
-from converter.dts.parser import DtsParser
-from converter.dts.extractor import KeymapExtractor
-from converter.models import KeymapConfig
+from converter import __version__
+
+if TYPE_CHECKING:
+    from converter.context import ConversionContext
+    from converter.error_handling.diagnostics import DiagnosticsCollector
+
+# Default --cache-size in MB; matches converter.cache.DEFAULT_MAX_BYTES
+_DEFAULT_CACHE_MB = 64
+
+
+@functools.lru_cache(maxsize=None)
+def _shared_stages():
+    """Return the (parser, extractor, transformer) shared by every conversion.
+
+    The stages are stateless; per-conversion state lives in the
+    ConversionContext passed to them. They are created on first use.
+    """
+    from converter.dts.extractor import KeymapExtractor
+    from converter.dts.parser import DtsParser
+    from converter.transformer.kanata_transformer import KanataTransformer
+
+    return DtsParser(), KeymapExtractor(), KanataTransformer()
 
 
 def convert_zmk_to_kanata(
-    zmk_file: str, include_paths: Optional[List[str]] = None
+    zmk_file: str,
+    include_paths: Optional[List[str]] = None,
+    diagnostics: Optional["DiagnosticsCollector"] = None,
+    context: Optional["ConversionContext"] = None,
+    cache_dir: Optional[str] = None,
 ) -> str:
     """Convert a ZMK keymap file to Kanata configuration.
 
     Args:
         zmk_file: Path to the ZMK keymap file
         include_paths: Optional list of paths to search for included files
+        diagnostics: Optional collector that receives warnings and errors
+            found during extraction and transformation
+        context: Optional per-conversion context; overrides diagnostics.
+            Separate contexts let conversions run concurrently.
+        cache_dir: Optional result cache directory; an identical earlier
+            conversion stored there is returned without converting again
 
     Returns:
         String containing the Kanata configuration
@@ -31,56 +63,77 @@ def convert_zmk_to_kanata(
         FileNotFoundError: If the input file doesn't exist
         ValueError: If the input file is invalid
     """
-    # Get the default include path from the package
-    default_include_path = os.path.join(
-        os.path.dirname(os.path.abspath(__file__)),
-        "dts",
-        "include",
+    from converter.cache import ResultCache
+    from converter.context import ConversionContext
+    from converter.pipeline import Pipeline
+
+    parser, extractor, transformer = _shared_stages()
+    pipeline = Pipeline(
+        include_paths=include_paths,
+        parser=parser,
+        extractor=extractor,
+        transformer=transformer,
+        cache=ResultCache(cache_dir) if cache_dir else None,
     )
+    if context is None:
+        context = ConversionContext()
+        if diagnostics is not None:
+            context.diagnostics = diagnostics
+
+    try:
+        return pipeline.run(zmk_file, context=context).config
+
+    except FileNotFoundError as e:
+        raise FileNotFoundError(f"Input file not found: {zmk_file}") from e
+    except Exception as e:
+        raise ValueError(f"Failed to convert keymap: {str(e)}") from e
 
-    # Combine user-provided include paths with the default one
-    all_include_paths = [default_include_path]
-    if include_paths:
-        all_include_paths.extend(include_paths)
 
-    # Initialize components
-    preprocessor = DtsPreprocessor(include_paths=all_include_paths)
-    parser = DtsParser()
-    extractor = KeymapExtractor()
-    transformer = KanataTransformer()
+def _run_batch(args):
+    from converter.batch import main as batch_main
 
-    try:
-        # Preprocess the input file
-        preprocessed_content = preprocessor.preprocess(zmk_file)
+    return batch_main(args)
 
-        # Parse the preprocessed content
-        ast = parser.parse(preprocessed_content)
 
-        # Extract keymap configuration
-        keymap_config = extractor.extract(ast)
+def _run_watch(args):
+    from converter.watch import main as watch_main
 
-        # Debug: Assert type
-        if not isinstance(keymap_config, KeymapConfig):
-            print(
-                f"[ERROR] Extractor returned type: {type(keymap_config)} value: {repr(keymap_config)}",
-                file=sys.stderr,
-            )
-            raise TypeError("extractor.extract(ast) did not return KeymapConfig")
+    return watch_main(args)
 
-        # Transform to Kanata format
-        # Directly return the transformed output
-        return transformer.transform(keymap_config)
 
-    except FileNotFoundError as e:
-        raise FileNotFoundError(f"Input file not found: {zmk_file}") from e
-    except Exception as e:
-        raise ValueError(f"Failed to convert keymap: {str(e)}") from e
+def _run_serve(args):
+    from converter.daemon import serve_main
+
+    return serve_main(args)
+
+
+def _run_client(args):
+    from converter.daemon import client_main
+
+    return client_main(args)
+
+
+# Subcommands given as the first argument instead of an input file
+SUBCOMMANDS = {
+    "batch": _run_batch,
+    "watch": _run_watch,
+    "serve": _run_serve,
+    "client": _run_client,
+}
 
 
 def main(args=None):
     """Run the main entry point for the converter."""
+    argv = sys.argv[1:] if args is None else list(args)
+    if argv and argv[0] in SUBCOMMANDS:
+        return SUBCOMMANDS[argv[0]](argv[1:])
+
     parser = argparse.ArgumentParser(
-        description="Convert ZMK keymap files to Kanata configuration"
+        description="Convert ZMK keymap files to Kanata configuration",
+        epilog=(
+            "Other commands: batch, watch, serve, client "
+            "(run '%(prog)s COMMAND --help')"
+        ),
     )
     parser.add_argument(
         "input_file",
@@ -122,11 +175,89 @@ def main(args=None):
             "(or stdout if not specified)"
         ),
     )
+    parser.add_argument(
+        "--dump-diagnostics",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help="Dump conversion diagnostics as JSON to FILE (or stderr if not specified)",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Render layers in N worker processes (default: serial)",
+    )
+    parser.add_argument(
+        "--hoist-aliases",
+        action="store_true",
+        help="Move compound actions repeated across layers into defalias entries",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Emit identical layers and macros once and redirect references",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check the generated configuration and exit non-zero on errors",
+    )
+    parser.add_argument(
+        "--force-write",
+        action="store_true",
+        help="Rewrite the output file even if its content is unchanged",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help=(
+            "Reuse the result of an identical earlier conversion stored in DIR "
+            "and store new results there (ignored with --dump-* options)"
+        ),
+    )
+    parser.add_argument(
+        "--cache-size",
+        type=int,
+        default=_DEFAULT_CACHE_MB,
+        metavar="MB",
+        help=(
+            "Size above which least recently used cache entries are deleted "
+            "(default: %(default)s)"
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help=(
+            "Profile the conversion with cProfile and save pstats data to FILE "
+            "(or print the top functions to stderr if not specified)"
+        ),
+    )
+    parser.add_argument(
+        "--stats",
+        nargs="?",
+        const="-",
+        metavar="FILE",
+        help=(
+            "Write conversion metrics (sizes, counts, stage timings, peak "
+            "memory, cache hit rates) as JSON to FILE (or stderr if not specified)"
+        ),
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
         help="Enable debug logging output",
     )
+    parser.add_argument(
+        "--version",
+        action="version",
+        version=f"%(prog)s {__version__}",
+    )
     parser.add_argument(
         "-v",
         "--verbose",
@@ -140,7 +271,7 @@ def main(args=None):
         help="Set logging level (e.g., info, debug, warning)",
     )
 
-    parsed_args = parser.parse_args(args)
+    parsed_args = parser.parse_args(argv)
 
     # Set up logging configuration
     log_level = logging.WARNING
@@ -157,26 +288,56 @@ def main(args=None):
         format="[%(levelname)s] %(message)s",
     )
 
-    try:
-        # Get the default include path from the package
-        default_include_path = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)),
-            "dts",
-            "include",
-        )
-        all_include_paths = [default_include_path]
-        if parsed_args.include:
-            all_include_paths.extend(parsed_args.include)
+    # Imported here so --help, --version and usage errors don't load them
+    from converter.cache import ResultCache
+    from converter.context import ConversionContext
+    from converter.error_handling.error_manager import ErrorSeverity
+    from converter.output.file_writer import AtomicOutput
+    from converter.output.validator import validate_file, validate_kanata
+    from converter.pipeline import Pipeline
+    from converter.profiling import ConversionProfiler, build_stats
+    from converter.transformer.kanata_transformer import KanataTransformer
 
+    try:
         # Initialize components
-        preprocessor = DtsPreprocessor(include_paths=all_include_paths)
-        parser_ = DtsParser()
-        extractor = KeymapExtractor()
-        transformer = KanataTransformer()
+        context = ConversionContext()
+        diagnostics = context.diagnostics
+        cache = None
+        dumps = (
+            parsed_args.dump_preprocessed,
+            parsed_args.dump_ast,
+            parsed_args.dump_extracted,
+        )
+        if parsed_args.cache_dir and all(dump is None for dump in dumps):
+            cache = ResultCache(
+                parsed_args.cache_dir, max_bytes=parsed_args.cache_size * 1024 * 1024
+            )
+        shared_parser, shared_extractor, _ = _shared_stages()
+        pipeline = Pipeline(
+            include_paths=parsed_args.include,
+            parser=shared_parser,
+            extractor=shared_extractor,
+            transformer=KanataTransformer(
+                workers=parsed_args.jobs,
+                hoist_aliases=parsed_args.hoist_aliases,
+                dedup=parsed_args.dedup,
+            ),
+            cache=cache,
+            options={
+                "hoist_aliases": parsed_args.hoist_aliases,
+                "dedup": parsed_args.dedup,
+            },
+        )
+        run = pipeline.start(parsed_args.input_file, context)
+        profiler = ConversionProfiler(
+            profile=parsed_args.profile is not None,
+            trace_memory=parsed_args.stats is not None,
+        )
+        profiler.attach(pipeline)
 
         # Preprocess the input file
         logging.info("Preprocessing input file: %s", parsed_args.input_file)
-        preprocessed_content = preprocessor.preprocess(parsed_args.input_file)
+        preprocessed_content = pipeline.resume(run, until="preprocess").preprocessed
         if parsed_args.dump_preprocessed is not None:
             out = parsed_args.dump_preprocessed
             if out == "-":
@@ -188,8 +349,10 @@ def main(args=None):
 
         # Parse the preprocessed content
         logging.info("Parsing preprocessed DTS content")
-        ast = parser_.parse(preprocessed_content)
+        ast = pipeline.resume(run, until="parse").ast
         if parsed_args.dump_ast is not None:
+            import json
+
             out = parsed_args.dump_ast
             ast_dict = ast.to_dict() if hasattr(ast, "to_dict") else ast.__dict__
             ast_json = json.dumps(ast_dict, indent=2)
@@ -202,24 +365,19 @@ def main(args=None):
 
         # Extract keymap configuration
         logging.info("Extracting keymap configuration from AST")
-        keymap_config = extractor.extract(ast)
-        # Debug: Assert type
-        if not isinstance(keymap_config, KeymapConfig):
-            print(
-                f"[ERROR] Extractor returned type: {type(keymap_config)} value: {repr(keymap_config)}",
-                file=sys.stderr,
-            )
-            raise TypeError("extractor.extract(ast) did not return KeymapConfig")
+        keymap_config = pipeline.resume(run, until="extract").keymap
         if parsed_args.dump_extracted is not None:
             out = parsed_args.dump_extracted
             extracted_dict = None
-            # Try YAML, fallback to JSON
+            # Try YAML, fallback to JSON (also when yaml isn't installed)
             try:
                 extracted_dict = (
                     keymap_config.to_dict()
                     if hasattr(keymap_config, "to_dict")
                     else keymap_config.__dict__
                 )
+                import yaml
+
                 extracted_yaml = yaml.safe_dump(extracted_dict, sort_keys=False)
                 if out == "-":
                     print(extracted_yaml)
@@ -230,6 +388,8 @@ def main(args=None):
             except Exception as e:
                 logging.warning("Failed to dump extracted model as YAML: %s", e)
                 if extracted_dict is not None:
+                    import json
+
                     extracted_json = json.dumps(extracted_dict, indent=2)
                     if out == "-":
                         print(extracted_json)
@@ -242,33 +402,95 @@ def main(args=None):
                         f"Error: Could not dump extracted model: {e}", file=sys.stderr
                     )
 
-        # Transform to Kanata format
+        # Transform to Kanata format, streaming straight into the output file
         logging.info("Transforming keymap to Kanata format")
-        kanata_config = None
         transform_error = None
-        try:
-            kanata_config = transformer.transform(keymap_config)
-        except Exception as e:
-            logging.error(f"Transformation error: {e}")
-            transform_error = e
-            kanata_config = f"; <error: transformation failed: {e}>\n"
-
-        # Write output
         if parsed_args.output:
             logging.info(f"Writing Kanata output to: {parsed_args.output}")
-            logging.debug(f"First 100 chars of output: {kanata_config[:100]}")
-            with open(parsed_args.output, "w") as f:
-                f.write(kanata_config)
-            logging.info(
-                "Successfully converted %s to %s",
-                parsed_args.input_file,
-                parsed_args.output,
-            )
+            output = AtomicOutput(parsed_args.output, force=parsed_args.force_write)
+            try:
+                # An exception leaving the block discards the partial output
+                with output as f:
+                    pipeline.resume(run, output=f)
+            except Exception as e:
+                logging.error(
+                    "Transformation error: %s; %s left unchanged",
+                    e,
+                    parsed_args.output,
+                )
+                transform_error = e
+            else:
+                logging.info(
+                    "Successfully converted %s to %s%s",
+                    parsed_args.input_file,
+                    parsed_args.output,
+                    "" if output.changed else " (unchanged, not rewritten)",
+                )
         else:
+            try:
+                kanata_config = pipeline.resume(run).config
+            except Exception as e:
+                logging.error(f"Transformation error: {e}")
+                transform_error = e
+                kanata_config = f"; <error: transformation failed: {e}>\n"
             print(kanata_config)
 
+        # Read the generated configuration back and check it
+        validation_failed = False
+        if parsed_args.validate and transform_error is None:
+            if parsed_args.output:
+                problems = validate_file(parsed_args.output)
+            else:
+                problems = validate_kanata(kanata_config, path="<stdout>")
+            for problem in problems:
+                print(problem.to_text(), file=sys.stderr)
+            diagnostics.extend(problems)
+            validation_failed = any(p.severity == ErrorSeverity.ERROR for p in problems)
+
+        profiler.stop()
+        if parsed_args.profile is not None:
+            profiler.write_profile(parsed_args.profile)
+            logging.info("Profile written to %s", parsed_args.profile)
+        if parsed_args.stats is not None:
+            import json
+
+            if parsed_args.output:
+                bytes_out = (
+                    None
+                    if transform_error is not None
+                    else os.path.getsize(parsed_args.output)
+                )
+            else:
+                bytes_out = len(kanata_config.encode("utf-8"))
+            stats_json = json.dumps(
+                build_stats(run, bytes_out, profiler.peak_memory, cache), indent=2
+            )
+            if parsed_args.stats == "-":
+                print(stats_json, file=sys.stderr)
+            else:
+                with open(parsed_args.stats, "w") as f:
+                    f.write(stats_json)
+            logging.info("Conversion stats written to %s", parsed_args.stats)
+
+        # Report diagnostics collected during extraction and transformation
+        if parsed_args.dump_diagnostics is not None:
+            out = parsed_args.dump_diagnostics
+            diagnostics_json = diagnostics.render_json()
+            if out == "-":
+                print(diagnostics_json, file=sys.stderr)
+            else:
+                with open(out, "w") as f:
+                    f.write(diagnostics_json)
+            logging.info("Diagnostics dumped to %s", out)
+        elif diagnostics:
+            logging.info("Conversion diagnostics:\n%s", diagnostics.render_text())
+            logging.warning(
+                "%d diagnostic(s) recorded; use --dump-diagnostics to inspect them",
+                len(diagnostics),
+            )
+
         # If there was a transformation error, return error code
-        if transform_error:
+        if transform_error or validation_failed:
             return 1
         return 0  # Return success code
 
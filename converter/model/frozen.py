@@ -0,0 +1,248 @@
+"""Frozen Keymap Model Module.
+
+This module contains a compact, immutable tier of the keymap model. The
+mutable classes in converter.models and converter.model.keymap_model are
+convenient while a keymap is being extracted; once extraction is done,
+freeze_keymap() converts either flavor into slotted, hashable objects. The
+conversion Pipeline does so at the end of its extract stage.
+
+Behavior objects are shared by reference rather than copied, since a keymap
+only has a handful of them. Bindings are compared and hashed by their
+signature (behavior name, behavior type, params), and identical bindings are
+interned so a keymap stores each distinct binding once.
+"""
+
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from converter.behaviors.unicode import UnicodeBinding
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class FrozenBinding:
+    """An immutable key binding."""
+
+    behavior: Optional[Any] = None
+    params: Tuple[str, ...] = ()
+
+    @property
+    def signature(self) -> Tuple:
+        """Return the hashable identity of this binding."""
+        return (
+            getattr(self.behavior, "name", None),
+            getattr(self.behavior, "type", None),
+            self.params,
+        )
+
+    def __eq__(self, other: object) -> bool:
+        """Compare two bindings by class and signature."""
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.signature == other.signature
+
+    def __hash__(self) -> int:
+        """Hash the binding signature."""
+        return hash((type(self), self.signature))
+
+    def to_dict(self) -> dict:
+        """Return a serializable dictionary representation of this binding."""
+        behavior = self.behavior
+        return {
+            "behavior": (
+                behavior.to_dict()
+                if behavior is not None and hasattr(behavior, "to_dict")
+                else None
+            ),
+            "params": list(self.params),
+        }
+
+
+@dataclass(frozen=True, slots=True, eq=False)
+class FrozenUnicodeBinding(FrozenBinding):
+    """An immutable binding that outputs a unicode character."""
+
+    character: str = ""
+    shifted: Optional[str] = None
+
+    @property
+    def signature(self) -> Tuple:
+        """Return the hashable identity of this binding."""
+        return (None, "unicode", (self.character, self.shifted))
+
+    def to_kanata(self) -> str:
+        """Convert the binding to Kanata format."""
+        return UnicodeBinding(self.character, self.shifted).to_kanata()
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenLayer:
+    """An immutable keymap layer."""
+
+    name: str
+    index: int
+    bindings: Tuple[FrozenBinding, ...] = ()
+
+    def to_dict(self) -> dict:
+        """Return a serializable dictionary representation of this layer."""
+        return {
+            "name": self.name,
+            "bindings": [b.to_dict() for b in self.bindings],
+            "index": self.index,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenCombo:
+    """An immutable key combo."""
+
+    name: str
+    timeout_ms: int
+    key_positions: Tuple[int, ...]
+    binding: FrozenBinding
+
+    def to_dict(self) -> dict:
+        """Return a serializable dictionary representation of this combo."""
+        return {
+            "name": self.name,
+            "timeout_ms": self.timeout_ms,
+            "key_positions": list(self.key_positions),
+            "binding": self.binding.to_dict(),
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenConditionalLayer:
+    """An immutable conditional layer activation."""
+
+    name: str
+    if_layers: Tuple[int, ...]
+    then_layer: int
+
+    def to_dict(self) -> dict:
+        """Return a serializable dictionary representation of this conditional layer."""
+        return {
+            "name": self.name,
+            "if_layers": list(self.if_layers),
+            "then_layer": self.then_layer,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class FrozenKeymapConfig:
+    """An immutable top-level keymap configuration.
+
+    behaviors is a read-only view and is excluded from equality and hashing;
+    two configs are equal when their layers, combos and conditional layers
+    are.
+    """
+
+    layers: Tuple[FrozenLayer, ...]
+    behaviors: Mapping[str, Any] = field(
+        default_factory=lambda: MappingProxyType({}), compare=False
+    )
+    combos: Tuple[FrozenCombo, ...] = ()
+    conditional_layers: Tuple[FrozenConditionalLayer, ...] = ()
+
+    def freeze(self) -> "FrozenKeymapConfig":
+        """Return self; the config is already frozen."""
+        return self
+
+    def to_dict(self) -> dict:
+        """Return a serializable dictionary representation of the keymap config."""
+        return {
+            "layers": [layer.to_dict() for layer in self.layers],
+            "behaviors": {
+                k: v.to_dict()
+                for k, v in self.behaviors.items()
+                if hasattr(v, "to_dict")
+            },
+            "combos": [c.to_dict() for c in self.combos],
+            "conditional_layers": [cl.to_dict() for cl in self.conditional_layers],
+        }
+
+
+def freeze_binding(
+    binding, interned: Optional[Dict[FrozenBinding, FrozenBinding]] = None
+) -> FrozenBinding:
+    """Convert a mutable binding into a FrozenBinding.
+
+    Args:
+        binding: A Binding or UnicodeBinding from either model module
+        interned: Optional table used to share equal frozen bindings
+
+    Returns:
+        The frozen binding (the interned instance if one is equal)
+
+    Raises:
+        TypeError: If the binding carries state the frozen tier can't hold
+    """
+    if isinstance(binding, FrozenBinding):
+        frozen = binding
+    elif isinstance(binding, UnicodeBinding):
+        frozen = FrozenUnicodeBinding(
+            behavior=None,
+            params=(binding.character,),
+            character=binding.character,
+            shifted=binding.shifted,
+        )
+    elif hasattr(binding, "key") or hasattr(binding, "hold_tap"):
+        raise TypeError(
+            f"Cannot freeze {type(binding).__name__}; only plain and unicode "
+            "bindings are supported"
+        )
+    else:
+        frozen = FrozenBinding(
+            behavior=binding.behavior, params=tuple(binding.params or ())
+        )
+    if interned is None:
+        return frozen
+    return interned.setdefault(frozen, frozen)
+
+
+def freeze_keymap(keymap) -> FrozenKeymapConfig:
+    """Convert a mutable KeymapConfig into a FrozenKeymapConfig.
+
+    Accepts the KeymapConfig of either model module; missing combos or
+    conditional layers are treated as empty.
+
+    Args:
+        keymap: The keymap configuration to freeze
+
+    Returns:
+        The frozen keymap configuration
+    """
+    if isinstance(keymap, FrozenKeymapConfig):
+        return keymap
+    interned: Dict[FrozenBinding, FrozenBinding] = {}
+    layers = tuple(
+        FrozenLayer(
+            name=layer.name,
+            index=layer.index,
+            bindings=tuple(freeze_binding(b, interned) for b in layer.bindings),
+        )
+        for layer in keymap.layers
+    )
+    combos = tuple(
+        FrozenCombo(
+            name=combo.name,
+            timeout_ms=combo.timeout_ms,
+            key_positions=tuple(combo.key_positions),
+            binding=freeze_binding(combo.binding, interned),
+        )
+        for combo in getattr(keymap, "combos", ())
+    )
+    conditional_layers = tuple(
+        FrozenConditionalLayer(
+            name=cl.name,
+            if_layers=tuple(cl.if_layers),
+            then_layer=cl.then_layer,
+        )
+        for cl in getattr(keymap, "conditional_layers", ())
+    )
+    return FrozenKeymapConfig(
+        layers=layers,
+        behaviors=MappingProxyType(dict(keymap.behaviors)),
+        combos=combos,
+        conditional_layers=conditional_layers,
+    )
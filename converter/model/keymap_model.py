@@ -387,3 +387,9 @@ class KeymapConfig:
 
     layers: List[Layer]
     behaviors: Dict[str, Behavior] = field(default_factory=dict)
+
+    def freeze(self):
+        """Return an immutable, slotted copy (see converter.model.frozen)."""
+        from converter.model.frozen import freeze_keymap
+
+        return freeze_keymap(self)
@@ -248,6 +248,12 @@ class KeymapConfig:
     combos: List[Combo] = field(default_factory=list)
     conditional_layers: List[ConditionalLayer] = field(default_factory=list)
 
+    def freeze(self):
+        """Return an immutable, slotted copy (see converter.model.frozen)."""
+        from converter.model.frozen import freeze_keymap
+
+        return freeze_keymap(self)
+
     def to_dict(self) -> dict:
         """Return a serializable dictionary representation of the keymap config."""
         # Debug: Assert all layers are Layer, behaviors are Behavior, combos are Combo, conditional_layers are ConditionalLayer
@@ -0,0 +1,82 @@
+"""Emitter Module
+
+This module writes Kanata configuration sections to any text stream, so a
+configuration can be produced straight into a file instead of being built
+up as one string first.
+"""
+
+from typing import Iterable, Sequence, TextIO, Tuple
+
+# Buffer size used for file output; large enough that writing a layer is a
+# handful of system calls.
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class KanataEmitter:
+    """Writes Kanata configuration sections to a text stream.
+
+    Every write ends in a newline. The emitter keeps no copy of what it has
+    written, so memory use is bounded by the largest single section.
+    """
+
+    def __init__(self, stream: TextIO):
+        """Initialize the emitter.
+
+        Args:
+            stream: Text sink with a write() method (file, StringIO, ...)
+        """
+        self.stream = stream
+        # Number of aliases defined so far
+        self.alias_count = 0
+
+    def write_line(self, line: str = "") -> None:
+        """Write a single line (which may itself contain newlines)."""
+        self.stream.write(line + "\n")
+
+    def write_lines(self, lines: Iterable[str]) -> None:
+        """Write each of lines."""
+        write = self.stream.write
+        for line in lines:
+            write(line + "\n")
+
+    def write_defcfg(self, entries: Sequence[str]) -> None:
+        """Write a defcfg block followed by a blank line."""
+        self.write_lines(["(defcfg", *(f"  {entry}" for entry in entries), ")", ""])
+
+    def write_defvar(self, name: str, value) -> None:
+        """Write a defvar declaration."""
+        self.write_line(f"(defvar {name} {value})")
+
+    def write_alias(self, definition: str) -> None:
+        """Write a formatted defalias block defining one alias."""
+        self.alias_count += 1
+        self.write_line(definition)
+
+    def write_defalias(self, entries: Iterable[Tuple[str, str]]) -> None:
+        """Write one defalias block defining each (name, action) pair."""
+        entries = list(entries)
+        self.alias_count += len(entries)
+        self.write_lines(
+            ["(defalias", *(f"  {name} {action}" for name, action in entries), ")"]
+        )
+
+    def write_macro(self, definition: str) -> None:
+        """Write a formatted macro definition."""
+        self.write_line(definition)
+
+    def write_comment(self, comment: str) -> None:
+        """Write a comment line; comment must already start with ';'."""
+        self.write_line(comment)
+
+    def write_layer(self, name: str, rows: Iterable[str]) -> None:
+        """Write a deflayer block with one row per binding."""
+        self.write_line(f"(deflayer {name}")
+        self.write_lines(rows)
+        self.write_line(")")
+
+    def flush(self) -> None:
+        """Flush the underlying stream if it supports it."""
+        flush = getattr(self.stream, "flush", None)
+        if flush is not None:
+            flush()
+
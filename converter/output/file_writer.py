@@ -1,10 +1,24 @@
 """File Writer Module
 
 This module is responsible for writing the Kanata configuration to a file.
+
+Output files are replaced atomically (written to a temporary file in the
+same directory, then renamed over the target), and left untouched when the
+new content is byte-identical, so Kanata's live reload and file watchers
+only fire on real changes.
 """
 
+import filecmp
+import hashlib
 import os
+import tempfile
 from pathlib import Path
+from typing import Optional, TextIO, Tuple, Union
+
+from converter.output.emitter import DEFAULT_BUFFER_SIZE
+
+# Read size used when comparing an existing file with new content
+_HASH_CHUNK_SIZE = 1 << 16
 
 
 class KanataFileWriter:
@@ -14,12 +28,19 @@ class KanataFileWriter:
     to files, with proper error handling for common file operations.
     """
 
-    def write(self, content: str, output_path: Path) -> None:
+    def write(self, content: str, output_path: Path, force: bool = False) -> bool:
         """Write the Kanata configuration to the specified file.
 
+        The file is replaced atomically, and not at all if it already holds
+        the same content.
+
         Args:
             content: The Kanata configuration string to write.
             output_path: The path where to write the configuration file.
+            force: Rewrite the file even if its content is unchanged.
+
+        Returns:
+            Whether the file was written.
 
         Raises:
             OSError: If there are permission issues or directory doesn't exist.
@@ -30,8 +51,154 @@ class KanataFileWriter:
         if not isinstance(output_path, Path):
             raise TypeError("Output path must be a Path object")
 
-        # Ensure the parent directory exists
-        os.makedirs(output_path.parent, exist_ok=True)
+        return write_if_changed(output_path, content, force=force)
+
+
+def _temp_file(output_path: Path) -> Tuple[int, str]:
+    """Create a temporary file next to output_path and return (fd, path)."""
+    os.makedirs(output_path.parent, exist_ok=True)
+    return tempfile.mkstemp(
+        dir=output_path.parent, prefix=f".{output_path.name}.", suffix=".tmp"
+    )
+
+
+def _replace(tmp_path: str, output_path: Path) -> None:
+    """Rename tmp_path over output_path, keeping the target's permissions."""
+    # mkstemp creates the file private
+    try:
+        mode = os.stat(output_path).st_mode & 0o777
+    except FileNotFoundError:
+        mode = 0o644
+    os.chmod(tmp_path, mode)
+    os.replace(tmp_path, output_path)
+
 
-        with open(output_path, "w") as f:
+def _discard(tmp_path: str) -> None:
+    try:
+        os.unlink(tmp_path)
+    except OSError:
+        pass
+
+
+def write_atomic(output_path: Union[str, Path], content: str) -> None:
+    """Replace output_path with content in a single rename.
+
+    The content is written to a temporary file in the same directory and
+    renamed over the target, so readers see either the old or the new
+    configuration, never a partial one.
+
+    Args:
+        output_path: The path where to write the configuration file.
+        content: The Kanata configuration string to write.
+
+    Raises:
+        OSError: If there are permission issues.
+    """
+    output_path = Path(output_path)
+    fd, tmp_path = _temp_file(output_path)
+    try:
+        with os.fdopen(fd, "w") as f:
             f.write(content)
+        _replace(tmp_path, output_path)
+    except BaseException:
+        _discard(tmp_path)
+        raise
+
+
+def _has_content(path: Path, data: bytes) -> bool:
+    """Check whether the file at path holds exactly data."""
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    except OSError:
+        return False
+    return digest.digest() == hashlib.sha256(data).digest()
+
+
+def write_if_changed(
+    output_path: Union[str, Path], content: str, force: bool = False
+) -> bool:
+    """Atomically replace output_path with content unless it already holds it.
+
+    Args:
+        output_path: The path where to write the configuration file.
+        content: The Kanata configuration string to write.
+        force: Rewrite the file even if its content is unchanged.
+
+    Returns:
+        Whether the file was written.
+
+    Raises:
+        OSError: If there are permission issues.
+    """
+    # Text mode writes use the platform newline, so compare what would be
+    # written
+    data = content.replace("\n", os.linesep).encode()
+    if not force and _has_content(Path(output_path), data):
+        return False
+    write_atomic(output_path, content)
+    return True
+
+
+class AtomicOutput:
+    """Context manager that streams a file into place atomically.
+
+    The returned stream writes to a temporary file in the target's
+    directory. On a normal exit the temporary file replaces the target,
+    unless both are byte-identical (and force is off), in which case the
+    target is left untouched. On an exception the target is kept.
+
+    Example:
+        with AtomicOutput("kanata.kbd") as f:
+            transformer.transform_to(keymap, f)
+    """
+
+    def __init__(
+        self,
+        output_path: Union[str, Path],
+        force: bool = False,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+    ):
+        """Initialize the output.
+
+        Args:
+            output_path: The path where to write the configuration file.
+            force: Replace the file even if its content is unchanged.
+            buffer_size: Size of the write buffer in bytes.
+        """
+        self.output_path = Path(output_path)
+        self.force = force
+        self.buffer_size = buffer_size
+        # Whether the target was replaced; set on exit
+        self.changed: Optional[bool] = None
+        self._file: Optional[TextIO] = None
+        self._tmp_path: Optional[str] = None
+
+    def __enter__(self) -> TextIO:
+        fd, self._tmp_path = _temp_file(self.output_path)
+        self._file = os.fdopen(fd, "w", buffering=self.buffer_size)
+        return self._file
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        try:
+            self._file.close()
+            if exc_type is not None:
+                self.changed = False
+            elif not self.force and self._same_as_target():
+                self.changed = False
+            else:
+                _replace(self._tmp_path, self.output_path)
+                self.changed = True
+        finally:
+            if not self.changed:
+                _discard(self._tmp_path)
+
+    def _same_as_target(self) -> bool:
+        try:
+            return filecmp.cmp(self._tmp_path, self.output_path, shallow=False)
+        except OSError:
+            return False
@@ -0,0 +1,395 @@
+"""Validator Module
+
+This module reads generated Kanata configurations back as S-expressions and
+checks them without running Kanata. It covers the DSL subset the converter
+emits: defcfg, defsrc, defvar, deflayer, defalias, defmacro and the
+tap-hold, tap-dance, one-shot, multi, fork, macro and layer-* actions.
+
+Checks:
+    kbd-paren: unbalanced parentheses or an unterminated string
+    kbd-syntax: top-level atoms, empty forms, malformed definitions and
+        action arguments
+    kbd-missing-defsrc: no defsrc form (only with require_defsrc; the
+        converter leaves defsrc to the user, so it is off by default)
+    kbd-unknown-form: top-level forms outside the supported subset
+    kbd-undefined-alias: @name references without a defalias entry
+    kbd-undefined-layer: layer actions naming a layer that doesn't exist
+    kbd-undefined-macro: (macro name) references without a defmacro
+    kbd-layer-size: deflayers whose key count differs from defsrc (or from
+        the first deflayer when there is no defsrc)
+    kbd-unknown-key: key names outside the converter's Kanata key set
+    kbd-unknown-action: action lists with an unsupported head
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, List, Optional, Set, Tuple
+
+from converter.error_handling.diagnostics import Diagnostic
+from converter.error_handling.error_manager import ErrorSeverity
+from converter.transformer.keycode_registry import KANATA_TO_ZMK
+
+Atom = namedtuple("Atom", ["value", "offset"])
+"""A symbol, number or string and its character offset in the source."""
+
+SList = namedtuple("SList", ["items", "offset"])
+"""A parenthesized list of Atom/SList items and its opening offset."""
+
+# Comments (the only capturing group), parentheses, strings, a lone
+# unterminated quote and atoms. Whitespace is not matched, so finditer()
+# skips over it.
+_TOKEN_RE = re.compile(
+    r'(#\|.*?\|#|;[^\n]*)|[()]|"(?:[^"\\]|\\.)*"|"|[^\s()";]+', re.DOTALL
+)
+
+# Key names of the converter's output vocabulary plus Kanata's transparent
+# and no-op keys.
+KANATA_KEYS = frozenset({*KANATA_TO_ZMK, "_", "XX", "nop0"})
+
+_TOP_LEVEL_FORMS = frozenset(
+    {"defcfg", "defsrc", "defvar", "deflayer", "defalias", "defmacro"}
+)
+_LAYER_ACTIONS = frozenset({"layer-switch", "layer-while-held", "layer-toggle"})
+# Action head -> index of the first argument that is itself an action
+_ACTION_ARGS = {
+    "tap-hold": 3,
+    "tap-hold-press": 3,
+    "tap-hold-release": 3,
+    "one-shot": 2,
+    "multi": 1,
+}
+_PLAIN_ACTIONS = frozenset({"caps-word", "unicode", "combo"})
+_NUMBER_RE = re.compile(r"\d+$")
+
+
+def read_sexprs(text: str) -> Tuple[List, List[Tuple[str, str, int]]]:
+    """Read every top-level S-expression in text.
+
+    Args:
+        text: Kanata configuration source
+
+    Returns:
+        The top-level Atom/SList items and (code, message, offset) syntax
+        problems. Unclosed lists are closed at the end of the input.
+    """
+    problems: List[Tuple[str, str, int]] = []
+    stack: List[SList] = [SList([], 0)]
+    items = stack[0].items
+    for match in _TOKEN_RE.finditer(text):
+        if match.lastindex:
+            continue
+        token = match.group()
+        if token == "(":
+            node = SList([], match.start())
+            items.append(node)
+            stack.append(node)
+            items = node.items
+        elif token == ")":
+            if len(stack) == 1:
+                problems.append(("kbd-paren", "Unexpected ')'", match.start()))
+            else:
+                stack.pop()
+                items = stack[-1].items
+        elif token == '"':
+            problems.append(("kbd-paren", "Unterminated string", match.start()))
+            break
+        else:
+            items.append(Atom(token, match.start()))
+    for node in stack[1:]:
+        problems.append(("kbd-paren", "Unclosed '('", node.offset))
+    return stack[0].items, problems
+
+
+def _position(text: str, offset: int) -> Tuple[int, int]:
+    """Return the 1-based (line, column) of a character offset."""
+    line = text.count("\n", 0, offset) + 1
+    column = offset - text.rfind("\n", 0, offset)
+    return line, column
+
+
+class _Checker:
+    """Collects definitions and problems while walking a configuration."""
+
+    def __init__(self, require_defsrc: bool = False):
+        self.require_defsrc = require_defsrc
+        self.problems: List[Tuple[str, ErrorSeverity, str, int]] = []
+        self.aliases: Set[str] = set()
+        self.macros: Set[str] = set()
+        self.layers: Dict[str, SList] = {}
+        self.defsrc: Optional[SList] = None
+        # References resolved after every definition has been seen
+        self.alias_refs: List[Atom] = []
+        self.layer_refs: List[Atom] = []
+        self.macro_refs: List[Atom] = []
+
+    def report(self, code: str, severity: ErrorSeverity, message: str, offset: int):
+        self.problems.append((code, severity, message, offset))
+
+    def collect(self, forms: List) -> List[Tuple[str, SList]]:
+        """Record top-level definitions and return the forms to check."""
+        checked = []
+        for form in forms:
+            if isinstance(form, Atom):
+                self.report(
+                    "kbd-syntax",
+                    ErrorSeverity.ERROR,
+                    f"Unexpected top-level atom '{form.value}'",
+                    form.offset,
+                )
+                continue
+            if not form.items or not isinstance(form.items[0], Atom):
+                self.report(
+                    "kbd-syntax",
+                    ErrorSeverity.ERROR,
+                    "Top-level form must start with a name",
+                    form.offset,
+                )
+                continue
+            head = form.items[0].value
+            if head not in _TOP_LEVEL_FORMS:
+                self.report(
+                    "kbd-unknown-form",
+                    ErrorSeverity.WARNING,
+                    f"Unsupported top-level form '{head}'",
+                    form.offset,
+                )
+                continue
+            if head == "defalias":
+                self._collect_pairs(form, self.aliases)
+            elif head == "defvar":
+                self._collect_pairs(form, set())
+            elif head in ("deflayer", "defmacro"):
+                name = form.items[1] if len(form.items) > 1 else None
+                if not isinstance(name, Atom):
+                    self.report(
+                        "kbd-syntax",
+                        ErrorSeverity.ERROR,
+                        f"{head} needs a name",
+                        form.offset,
+                    )
+                    continue
+                if head == "deflayer":
+                    self.layers[name.value] = form
+                else:
+                    self.macros.add(name.value)
+            elif head == "defsrc":
+                self.defsrc = form
+            checked.append((head, form))
+        return checked
+
+    def _collect_pairs(self, form: SList, names: Set[str]):
+        """Record the names of a (defalias name action ...) style form."""
+        pairs = form.items[1:]
+        if len(pairs) % 2:
+            self.report(
+                "kbd-syntax",
+                ErrorSeverity.ERROR,
+                f"{form.items[0].value} needs name/value pairs",
+                form.offset,
+            )
+        for name in pairs[::2]:
+            if isinstance(name, Atom):
+                names.add(name.value)
+            else:
+                self.report(
+                    "kbd-syntax",
+                    ErrorSeverity.ERROR,
+                    f"{form.items[0].value} name must be an atom",
+                    name.offset,
+                )
+
+    def check(self, head: str, form: SList):
+        """Check the contents of one top-level form."""
+        if head == "defsrc":
+            for key in form.items[1:]:
+                self.check_action(key)
+        elif head == "deflayer":
+            for key in form.items[2:]:
+                self.check_action(key)
+        elif head == "defalias":
+            for action in form.items[2::2]:
+                self.check_action(action)
+
+    def check_action(self, item):
+        """Check a layer slot or alias value."""
+        if isinstance(item, Atom):
+            value = item.value
+            if value in KANATA_KEYS:
+                return
+            if value.startswith("@"):
+                self.alias_refs.append(item)
+            elif value.startswith("$") or value.startswith('"'):
+                return
+            else:
+                self.report(
+                    "kbd-unknown-key",
+                    ErrorSeverity.WARNING,
+                    f"Unknown key name '{value}'",
+                    item.offset,
+                )
+            return
+        if not item.items or not isinstance(item.items[0], Atom):
+            self.report(
+                "kbd-syntax", ErrorSeverity.ERROR, "Empty action list", item.offset
+            )
+            return
+        head = item.items[0].value
+        args = item.items[1:]
+        if head in _LAYER_ACTIONS:
+            if len(args) != 1 or not isinstance(args[0], Atom):
+                self.report(
+                    "kbd-syntax",
+                    ErrorSeverity.ERROR,
+                    f"{head} takes one layer name",
+                    item.offset,
+                )
+            else:
+                self.layer_refs.append(args[0])
+        elif head == "macro":
+            if len(args) == 1 and isinstance(args[0], Atom) and self.macros:
+                if not args[0].value.startswith("@"):
+                    self.macro_refs.append(args[0])
+                    return
+            for arg in args:
+                self.check_action(arg)
+        elif head == "tap-dance":
+            self._check_timeouts(head, args[:1], item)
+            if len(args) != 2 or not isinstance(args[1], SList):
+                self.report(
+                    "kbd-syntax",
+                    ErrorSeverity.ERROR,
+                    "tap-dance takes a timeout and one list of actions",
+                    item.offset,
+                )
+                return
+            for arg in args[1].items:
+                self.check_action(arg)
+        elif head == "fork":
+            if len(args) != 3 or not isinstance(args[2], SList):
+                self.report(
+                    "kbd-syntax",
+                    ErrorSeverity.ERROR,
+                    "fork takes two actions and a list of keys",
+                    item.offset,
+                )
+                return
+            for arg in args[:2] + args[2].items:
+                self.check_action(arg)
+        elif head in _ACTION_ARGS:
+            first_action = _ACTION_ARGS[head] - 1
+            self._check_timeouts(head, args[:first_action], item)
+            for arg in args[first_action:]:
+                self.check_action(arg)
+        elif head not in _PLAIN_ACTIONS:
+            self.report(
+                "kbd-unknown-action",
+                ErrorSeverity.WARNING,
+                f"Unsupported action '{head}'",
+                item.offset,
+            )
+
+    def _check_timeouts(self, head: str, args: List, item: SList):
+        """Report timeout arguments that aren't numbers or defvar references."""
+        for arg in args:
+            if not (isinstance(arg, Atom) and _is_number(arg.value)):
+                self.report(
+                    "kbd-syntax",
+                    ErrorSeverity.ERROR,
+                    f"{head} timeout must be a number",
+                    getattr(arg, "offset", item.offset),
+                )
+
+    def resolve(self):
+        """Check references and layer sizes once all definitions are known."""
+        for ref in self.alias_refs:
+            if ref.value[1:] not in self.aliases:
+                self.report(
+                    "kbd-undefined-alias",
+                    ErrorSeverity.ERROR,
+                    f"Undefined alias '{ref.value}'",
+                    ref.offset,
+                )
+        for ref in self.layer_refs:
+            if ref.value not in self.layers:
+                self.report(
+                    "kbd-undefined-layer",
+                    ErrorSeverity.ERROR,
+                    f"Undefined layer '{ref.value}'",
+                    ref.offset,
+                )
+        for ref in self.macro_refs:
+            if ref.value not in self.macros:
+                self.report(
+                    "kbd-undefined-macro",
+                    ErrorSeverity.ERROR,
+                    f"Undefined macro '{ref.value}'",
+                    ref.offset,
+                )
+
+        if self.defsrc is not None:
+            expected, source = len(self.defsrc.items) - 1, "defsrc"
+        elif self.layers:
+            if self.require_defsrc:
+                self.report(
+                    "kbd-missing-defsrc",
+                    ErrorSeverity.WARNING,
+                    "No defsrc form; layer sizes are compared with the first "
+                    "deflayer",
+                    0,
+                )
+            first_name, first = next(iter(self.layers.items()))
+            expected, source = len(first.items) - 2, f"deflayer {first_name}"
+        else:
+            return
+        for name, layer in self.layers.items():
+            size = len(layer.items) - 2
+            if size != expected:
+                self.report(
+                    "kbd-layer-size",
+                    ErrorSeverity.ERROR,
+                    f"deflayer {name} has {size} keys, {source} has {expected}",
+                    layer.offset,
+                )
+
+
+def _is_number(value: str) -> bool:
+    """Check whether an atom is a number or a defvar reference."""
+    return bool(_NUMBER_RE.match(value)) or value.startswith("$")
+
+
+def validate_kanata(
+    text: str, path: Optional[str] = None, require_defsrc: bool = False
+) -> List[Diagnostic]:
+    """Validate a Kanata configuration.
+
+    Args:
+        text: Kanata configuration source
+        path: File name used in the diagnostics, if any
+        require_defsrc: Warn when there is no defsrc form. Converter output
+            has none (the physical layout is the user's to add), so this is
+            for finished configurations.
+
+    Returns:
+        The problems found, in source order
+    """
+    forms, syntax = read_sexprs(text)
+    checker = _Checker(require_defsrc)
+    for code, message, offset in syntax:
+        checker.report(code, ErrorSeverity.ERROR, message, offset)
+    for head, form in checker.collect(forms):
+        checker.check(head, form)
+    checker.resolve()
+
+    diagnostics = []
+    for code, severity, message, offset in sorted(
+        checker.problems, key=lambda problem: problem[3]
+    ):
+        line, column = _position(text, offset)
+        diagnostics.append(Diagnostic(code, severity, message, path, line, column))
+    return diagnostics
+
+
+def validate_file(path: str, require_defsrc: bool = False) -> List[Diagnostic]:
+    """Validate the Kanata configuration stored at path."""
+    with open(path) as f:
+        return validate_kanata(f.read(), path=path, require_defsrc=require_defsrc)
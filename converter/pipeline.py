@@ -0,0 +1,278 @@
+"""Pipeline Module
+
+This module runs the conversion stages in order:
+
+    preprocess  keymap path          -> preprocessed DTS text (str)
+    parse       preprocessed text    -> AST (DtsRoot)
+    extract     AST                  -> KeymapConfig
+    transform   KeymapConfig         -> Kanata configuration (str), or
+                                        streamed into an output file
+
+A Pipeline holds the stage implementations and hooks and can be shared by
+concurrent conversions; a PipelineRun holds the outputs, timings and
+ConversionContext of one conversion. Every entry point (the CLI, batch,
+watch and serve commands and convert_zmk_to_kanata) converts through it.
+
+Example:
+    pipeline = Pipeline(include_paths=["zmk/app/include"])
+    run = pipeline.run("keymap.keymap")
+    print(run.config, run.timings["parse"].wall)
+"""
+
+import sys
+import time
+from collections import namedtuple
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, TextIO, Union
+
+from converter.cache import ResultCache
+from converter.context import ConversionContext
+from converter.dts.ast import DtsRoot
+from converter.dts.extractor import KeymapExtractor
+from converter.dts.parser import DtsParser
+from converter.dts.preprocessor import DtsPreprocessor, default_include_paths
+from converter.error_handling.diagnostics import Diagnostic
+from converter.model.frozen import FrozenKeymapConfig, freeze_keymap
+from converter.models import KeymapConfig
+from converter.transformer.kanata_transformer import KanataTransformer
+
+STAGES = ("preprocess", "parse", "extract", "transform")
+
+StageTiming = namedtuple("StageTiming", ["wall", "cpu", "allocations"])
+"""Seconds elapsed, seconds of CPU time used by the running thread, and the
+net number of memory blocks the stage left allocated (process-wide, so other
+threads add noise)."""
+
+
+@dataclass
+class PipelineRun:
+    """Outputs and measurements of one conversion.
+
+    Attributes:
+        source: Path of the keymap file
+        context: Per-conversion state passed to every stage
+        preprocessed: Output of the preprocess stage
+        ast: Output of the parse stage
+        keymap: Output of the extract stage, frozen unless the pipeline
+            was created with freeze=False
+        config: Output of the transform stage; None when it was streamed
+        timings: Stage name -> StageTiming of each stage that finished
+        stage: The stage that is running, or that ran last; after an
+            exception, the stage that failed
+        cached: Whether config and diagnostics came from the result cache,
+            in which case no stage ran
+        cache_key: Result cache key of this run, once computed
+    """
+
+    source: Optional[str]
+    context: ConversionContext = field(default_factory=ConversionContext)
+    preprocessed: Optional[str] = None
+    ast: Optional[DtsRoot] = None
+    keymap: Optional[Union[KeymapConfig, FrozenKeymapConfig]] = None
+    config: Optional[str] = None
+    timings: Dict[str, StageTiming] = field(default_factory=dict)
+    stage: Optional[str] = None
+    cached: bool = False
+    cache_key: Optional[str] = None
+
+    @property
+    def completed(self) -> List[str]:
+        """Return the stages that finished, in order."""
+        return [stage for stage in STAGES if stage in self.timings]
+
+
+Hook = Callable[[str, PipelineRun], None]
+
+
+class Pipeline:
+    """Runs the conversion stages with timing and hooks."""
+
+    def __init__(
+        self,
+        include_paths: Optional[List[str]] = None,
+        preprocessor=None,
+        parser=None,
+        extractor=None,
+        transformer=None,
+        cache: Optional[ResultCache] = None,
+        options: Optional[Dict] = None,
+        freeze: bool = True,
+    ):
+        """Initialize the pipeline.
+
+        Each stage implementation can be replaced by any object with the
+        same method (preprocess, parse, extract, transform/transform_to)
+        accepting the same arguments.
+
+        Args:
+            include_paths: Extra include paths for the default preprocessor
+            preprocessor: Preprocess stage; defaults to a DtsPreprocessor
+            parser: Parse stage; defaults to a DtsParser
+            extractor: Extract stage; defaults to a KeymapExtractor
+            transformer: Transform stage; defaults to a KanataTransformer
+            cache: Result cache consulted before a run's first stage and
+                filled after its transform stage
+            options: Transformer settings that affect the output, made part
+                of the cache key
+            freeze: Convert the extracted keymap into a FrozenKeymapConfig
+                before the transform stage. The extractor itself returns
+                a mutable KeymapConfig, which its callers may modify.
+        """
+        self.preprocessor = preprocessor or DtsPreprocessor(
+            include_paths=default_include_paths(include_paths)
+        )
+        self.parser = parser or DtsParser()
+        self.extractor = extractor or KeymapExtractor()
+        self.transformer = transformer or KanataTransformer()
+        self.cache = cache
+        self.options = options or {}
+        self.freeze = freeze
+        self._hooks: Dict[str, List[Hook]] = {"before": [], "after": []}
+
+    def add_hook(self, when: str, hook: Hook) -> None:
+        """Call hook(stage, run) before or after every stage.
+
+        Args:
+            when: "before" or "after"
+            hook: Callable; after hooks can read run.timings[stage]
+        """
+        if when not in self._hooks:
+            raise ValueError(f"when must be 'before' or 'after', not {when!r}")
+        self._hooks[when].append(hook)
+
+    def start(
+        self,
+        source: Optional[str],
+        context: Optional[ConversionContext] = None,
+        preprocessed: Optional[str] = None,
+    ) -> PipelineRun:
+        """Create a run without executing any stage.
+
+        Args:
+            source: Path of the keymap file
+            context: Per-conversion state; a fresh one by default
+            preprocessed: Already preprocessed text; the run then starts at
+                the parse stage
+        """
+        run = PipelineRun(source, context or ConversionContext())
+        if preprocessed is not None:
+            run.preprocessed = preprocessed
+            run.timings["preprocess"] = StageTiming(0.0, 0.0, 0)
+        return run
+
+    def run(
+        self,
+        source: str,
+        context: Optional[ConversionContext] = None,
+        output: Optional[TextIO] = None,
+        until: Optional[str] = None,
+    ) -> PipelineRun:
+        """Convert a keymap file.
+
+        Args:
+            source: Path of the keymap file
+            context: Per-conversion state; a fresh one by default
+            output: Stream the transform stage writes into instead of
+                returning run.config
+            until: Last stage to run; all of them by default
+
+        Returns:
+            The run, holding every stage output and timing
+        """
+        return self.resume(self.start(source, context), output=output, until=until)
+
+    def resume(
+        self,
+        run: PipelineRun,
+        output: Optional[TextIO] = None,
+        until: Optional[str] = None,
+    ) -> PipelineRun:
+        """Run the stages of run that haven't finished yet, up to until.
+
+        The first call on a run with a cache looks the conversion up; on a
+        hit, no stage runs and the cached config is written to output.
+        """
+        last = STAGES.index(until) if until else len(STAGES) - 1
+        if self.cache is not None and not run.timings and run.cache_key is None:
+            self._load_cached(run)
+        if run.cached:
+            if output is not None and STAGES[last] == "transform":
+                output.write(run.config)
+            return run
+        for stage in STAGES[: last + 1]:
+            if stage in run.timings:
+                continue
+            run.stage = stage
+            for hook in self._hooks["before"]:
+                hook(stage, run)
+            blocks = sys.getallocatedblocks()
+            cpu = time.thread_time()
+            wall = time.perf_counter()
+            getattr(self, f"_{stage}")(run, output)
+            run.timings[stage] = StageTiming(
+                time.perf_counter() - wall,
+                time.thread_time() - cpu,
+                sys.getallocatedblocks() - blocks,
+            )
+            for hook in self._hooks["after"]:
+                hook(stage, run)
+        if run.cache_key and STAGES[last] == "transform":
+            self.cache.put(
+                run.cache_key,
+                run.config,
+                [d.to_dict() for d in run.context.diagnostics],
+            )
+        return run
+
+    def _load_cached(self, run: PipelineRun) -> None:
+        """Fill run from the result cache if it holds this conversion."""
+        try:
+            sources = self.preprocessor.resolve_includes(run.source)
+            run.cache_key = self.cache.key(
+                run.source,
+                sources,
+                self.preprocessor.include_paths,
+                {**self.options, **run.context.config},
+            )
+        except (OSError, TypeError):
+            # Unreadable input: run the stages so they report the error
+            return
+        cached = self.cache.get(run.cache_key)
+        if cached is None:
+            return
+        run.config = cached.config
+        run.context.diagnostics.extend(
+            Diagnostic.from_dict(data) for data in cached.diagnostics
+        )
+        run.cached = True
+
+    def _preprocess(self, run: PipelineRun, output: Optional[TextIO]) -> None:
+        run.preprocessed = self.preprocessor.preprocess(run.source)
+
+    def _parse(self, run: PipelineRun, output: Optional[TextIO]) -> None:
+        run.ast = self.parser.parse(
+            run.preprocessed, file=run.source, context=run.context
+        )
+
+    def _extract(self, run: PipelineRun, output: Optional[TextIO]) -> None:
+        keymap = self.extractor.extract(run.ast, context=run.context)
+        if not isinstance(keymap, (KeymapConfig, FrozenKeymapConfig)):
+            raise TypeError(
+                f"extract stage returned {type(keymap).__name__}, not KeymapConfig"
+            )
+        if self.freeze:
+            try:
+                keymap = freeze_keymap(keymap)
+            except TypeError:
+                # Holds bindings the frozen tier can't represent; keep it
+                pass
+        run.keymap = keymap
+
+    def _transform(self, run: PipelineRun, output: Optional[TextIO]) -> None:
+        if output is None or run.cache_key:
+            # The text is kept in memory when it will be stored in the cache
+            run.config = self.transformer.transform(run.keymap, context=run.context)
+            if output is not None:
+                output.write(run.config)
+        else:
+            self.transformer.transform_to(run.keymap, output, context=run.context)
@@ -0,0 +1,151 @@
+"""Profiling Module
+
+This module backs the CLI's --profile and --stats options. A
+ConversionProfiler attaches to a Pipeline's hooks, so cProfile only sees
+the conversion stages (not argument parsing, dumps or validation) and
+tracemalloc only runs while converting. build_stats() turns a finished
+PipelineRun into the JSON metrics document:
+
+    {
+      "input": "keymap.keymap",
+      "bytes_in": 5120, "bytes_preprocessed": 8311, "bytes_out": 4096,
+      "tokens": 1520, "nodes": 41, "layers": 4,
+      "bindings": 168, "distinct_bindings": 73, "aliases": 12,
+      "diagnostics": 2, "cached": false,
+      "peak_memory_bytes": 1843200,
+      "stages": {"parse": {"wall_seconds": 0.004, "cpu_seconds": 0.004,
+                           "allocated_blocks": 2210}, ...},
+      "cache": {"binding": {"hits": 95, "misses": 73, "hit_rate": 0.57},
+                "result": {"hits": 1, "misses": 0, "hit_rate": 1.0}}
+    }
+"""
+
+import cProfile
+import os
+import pstats
+import sys
+import tracemalloc
+from typing import Dict, Optional
+
+from converter.cache import ResultCache
+from converter.pipeline import STAGES, Pipeline, PipelineRun
+
+# Counters copied from ConversionContext.stats into the metrics document
+STAT_COUNTERS = (
+    "tokens",
+    "nodes",
+    "layers",
+    "bindings",
+    "distinct_bindings",
+    "aliases",
+)
+# Functions listed when a profile is printed instead of saved
+PROFILE_LIMIT = 25
+
+
+class ConversionProfiler:
+    """Profiles and measures the memory of the stages of a pipeline."""
+
+    def __init__(self, profile: bool = False, trace_memory: bool = False):
+        """Initialize the profiler.
+
+        Args:
+            profile: Collect a cProfile profile of the stages
+            trace_memory: Track the peak memory use with tracemalloc
+        """
+        self.profiler = cProfile.Profile() if profile else None
+        self.trace_memory = trace_memory
+        self.peak_memory: Optional[int] = None
+        self._tracing = False
+
+    def attach(self, pipeline: Pipeline) -> None:
+        """Start measuring before each stage of pipeline and pause after it."""
+        pipeline.add_hook("before", self._before_stage)
+        pipeline.add_hook("after", self._after_stage)
+
+    def _before_stage(self, stage: str, run: PipelineRun) -> None:
+        if self.trace_memory and not self._tracing and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._tracing = True
+        if self.profiler is not None:
+            self.profiler.enable()
+
+    def _after_stage(self, stage: str, run: PipelineRun) -> None:
+        if self.profiler is not None:
+            self.profiler.disable()
+
+    def stop(self) -> None:
+        """Stop measuring and record the peak memory use."""
+        if self.profiler is not None:
+            self.profiler.disable()
+        if self._tracing:
+            self.peak_memory = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            self._tracing = False
+
+    def write_profile(self, path: str) -> None:
+        """Save the profile as pstats data, or print it to stderr if path is '-'."""
+        if path == "-":
+            stats = pstats.Stats(self.profiler, stream=sys.stderr)
+            stats.sort_stats("cumulative").print_stats(PROFILE_LIMIT)
+        else:
+            self.profiler.dump_stats(path)
+
+
+def build_stats(
+    run: PipelineRun,
+    bytes_out: Optional[int] = None,
+    peak_memory: Optional[int] = None,
+    result_cache: Optional[ResultCache] = None,
+) -> Dict:
+    """Return the metrics document of a finished run.
+
+    Args:
+        run: The run to report on
+        bytes_out: Size of the generated configuration in bytes
+        peak_memory: Peak traced memory in bytes, if it was measured
+        result_cache: The result cache the run used, if any
+    """
+    counters = run.context.stats
+    bytes_in = None
+    if run.source is not None and os.path.exists(run.source):
+        bytes_in = os.path.getsize(run.source)
+    hits = counters.get("binding_cache_hits", 0)
+    misses = counters.get("binding_cache_misses", 0)
+    cache = {
+        "binding": {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+        }
+    }
+    if result_cache is not None:
+        cache["result"] = {
+            "hits": result_cache.hits,
+            "misses": result_cache.misses,
+            "hit_rate": result_cache.hit_rate,
+        }
+    return {
+        "input": run.source,
+        "bytes_in": bytes_in,
+        "bytes_preprocessed": (
+            len(run.preprocessed.encode("utf-8"))
+            if run.preprocessed is not None
+            else None
+        ),
+        "bytes_out": bytes_out,
+        **{name: counters.get(name, 0) for name in STAT_COUNTERS},
+        "diagnostics": len(run.context.diagnostics),
+        "cached": run.cached,
+        "peak_memory_bytes": peak_memory,
+        "stages": {
+            stage: {
+                "wall_seconds": run.timings[stage].wall,
+                "cpu_seconds": run.timings[stage].cpu,
+                "allocated_blocks": run.timings[stage].allocations,
+            }
+            for stage in STAGES
+            if stage in run.timings
+        },
+        "cache": cache,
+    }
@@ -0,0 +1,98 @@
+"""Binding Cache Module.
+
+This module provides a bounded LRU cache for rendered bindings. Most keymaps
+only contain a few hundred distinct bindings repeated across layers, so the
+transformer renders each distinct binding once and reuses the fragment.
+
+Each entry also keeps the diagnostics recorded while rendering it, so a
+cache hit can replay them and the error summary is the same with or without
+the cache.
+"""
+
+from collections import OrderedDict, namedtuple
+from typing import Hashable, Optional, Sequence, Tuple
+
+CachedBinding = namedtuple("CachedBinding", ["fragment", "records"])
+"""A rendered binding and the (msg, code, severity) records it produced."""
+
+
+class CacheStats(namedtuple("CacheStats", ["hits", "misses", "size", "maxsize"])):
+    """Hit/miss counters and occupancy of a BindingCache."""
+
+    __slots__ = ()
+
+    @property
+    def hit_rate(self) -> float:
+        """Return the fraction of lookups that hit, or 0.0 if there were none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class BindingCache:
+    """Bounded LRU cache of rendered bindings keyed by binding signature."""
+
+    def __init__(self, maxsize: int = 4096):
+        """Initialize the cache.
+
+        Args:
+            maxsize: Maximum number of entries kept before the least recently
+                used one is evicted
+        """
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, CachedBinding]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(binding) -> Optional[Tuple]:
+        """Return the cache key of a binding, or None if it can't be cached.
+
+        The key is the binding class, the identity and type of its behavior,
+        and its params as a tuple. Behavior identity is only stable while the
+        behavior objects are alive, so the cache must be cleared between
+        keymaps.
+        """
+        behavior = getattr(binding, "behavior", None)
+        params = getattr(binding, "params", None) or ()
+        key = (
+            type(binding),
+            id(behavior),
+            getattr(behavior, "type", None),
+            tuple(params),
+        )
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def get(self, key: Hashable) -> Optional[CachedBinding]:
+        """Return the cached entry for key and count the lookup."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, fragment: str, records: Sequence[tuple] = ()):
+        """Store a rendered fragment and the records produced with it."""
+        self._entries[key] = CachedBinding(fragment, tuple(records))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> CacheStats:
+        """Return the current hit/miss counters and size."""
+        return CacheStats(self.hits, self.misses, len(self._entries), self.maxsize)
+
+    def __len__(self) -> int:
+        """Return the number of cached entries."""
+        return len(self._entries)
@@ -0,0 +1,150 @@
+"""Combo Index Module.
+
+This module indexes ZMK combos by key position so overlapping and
+conflicting combos can be found without comparing every pair, and so combo
+key positions can be resolved to key names once per layer.
+"""
+
+from collections import namedtuple
+from typing import Callable, Dict, List, Optional, Sequence
+
+ComboConflict = namedtuple("ComboConflict", ["kind", "combos"])
+"""A conflict between combos.
+
+kind is one of "duplicate" (same key positions), "overlap" (the first
+combo's positions are a proper subset of the second's) or "timeout"
+(duplicate or overlapping combos with different timeout-ms values).
+"""
+
+
+class ComboIndex:
+    """Index of combos by key position.
+
+    Each combo is stored as a bitset (an int with bit N set for key
+    position N), and every key position maps to the indices of the combos
+    that use it.
+    """
+
+    def __init__(
+        self,
+        combos: Sequence,
+        layers: Sequence = (),
+        resolver: Optional[Callable[[str], Optional[str]]] = None,
+    ):
+        """Build the index.
+
+        Args:
+            combos: Combo objects with key_positions and timeout_ms
+            layers: Layers whose bindings key positions resolve against
+            resolver: Optional function mapping a ZMK key name to its Kanata
+                name; resolved names fall back to the ZMK name
+        """
+        self.combos = list(combos)
+        self.layers = list(layers)
+        self.resolver = resolver
+        self.masks: List[int] = []
+        self.by_position: Dict[int, List[int]] = {}
+        for idx, combo in enumerate(self.combos):
+            mask = 0
+            for pos in combo.key_positions:
+                bit = 1 << pos
+                if not mask & bit:
+                    self.by_position.setdefault(pos, []).append(idx)
+                mask |= bit
+            self.masks.append(mask)
+        self._resolved: Dict[int, List[Optional[str]]] = {}
+
+    def combos_at(self, position: int) -> List:
+        """Return the combos that use the given key position."""
+        return [self.combos[i] for i in self.by_position.get(position, ())]
+
+    def find_duplicates(self) -> List[ComboConflict]:
+        """Return groups of combos that use exactly the same key positions."""
+        groups: Dict[int, List[int]] = {}
+        for idx, mask in enumerate(self.masks):
+            groups.setdefault(mask, []).append(idx)
+        return [
+            ComboConflict("duplicate", tuple(self.combos[i] for i in idxs))
+            for idxs in groups.values()
+            if len(idxs) > 1
+        ]
+
+    def find_overlaps(self) -> List[ComboConflict]:
+        """Return (subset, superset) pairs of combos.
+
+        A combo's supersets must all use its least shared key position, so
+        only that position's combos are checked instead of every combo.
+        """
+        overlaps = []
+        for idx, mask in enumerate(self.masks):
+            if not mask:
+                continue
+            positions = self.combos[idx].key_positions
+            rarest = min(positions, key=lambda p: len(self.by_position[p]))
+            for other in self.by_position[rarest]:
+                other_mask = self.masks[other]
+                if other_mask != mask and mask & other_mask == mask:
+                    overlaps.append(
+                        ComboConflict("overlap", (self.combos[idx], self.combos[other]))
+                    )
+        return overlaps
+
+    def find_timeout_conflicts(self) -> List[ComboConflict]:
+        """Return duplicate or overlapping combos whose timeouts differ."""
+        conflicts = []
+        for conflict in self.find_duplicates() + self.find_overlaps():
+            if len({c.timeout_ms for c in conflict.combos}) > 1:
+                conflicts.append(ComboConflict("timeout", conflict.combos))
+        return conflicts
+
+    def conflicts(self) -> List[ComboConflict]:
+        """Return all duplicate, overlap and timeout conflicts."""
+        return (
+            self.find_duplicates()
+            + self.find_overlaps()
+            + self.find_timeout_conflicts()
+        )
+
+    def resolve(self, position: int, layer_index: int = 0) -> Optional[str]:
+        """Resolve a key position to a key name on the given layer.
+
+        Returns:
+            The (resolved) key name, or None if the position is not on the layer
+        """
+        names = self._resolved.get(layer_index)
+        if names is None:
+            names = self._resolve_layer(layer_index)
+        if 0 <= position < len(names):
+            return names[position]
+        return None
+
+    def key_names(self, combo, layer_index: int = 0) -> Optional[List[str]]:
+        """Resolve all key positions of a combo on the given layer.
+
+        Returns:
+            The key names, or None if any position is not on the layer
+        """
+        names = [self.resolve(pos, layer_index) for pos in combo.key_positions]
+        if any(name is None for name in names):
+            return None
+        return names
+
+    def _resolve_layer(self, layer_index: int) -> List[Optional[str]]:
+        """Resolve every binding of a layer to a key name, once."""
+        if not 0 <= layer_index < len(self.layers):
+            names: List[Optional[str]] = []
+        else:
+            names = []
+            for pos, binding in enumerate(self.layers[layer_index].bindings):
+                if hasattr(binding, "key") and binding.key:
+                    key_name = binding.key
+                elif hasattr(binding, "params") and binding.params:
+                    key_name = binding.params[0]
+                else:
+                    key_name = str(pos)
+                if self.resolver is not None:
+                    mapped = self.resolver(key_name)
+                    key_name = mapped if mapped else key_name
+                names.append(key_name)
+        self._resolved[layer_index] = names
+        return names
@@ -4,19 +4,47 @@ This module provides functionality for transforming ZMK keymap
 configurations to Kanata format.
 """
 
-from converter.error_handling.error_manager import get_error_manager
+from converter.error_handling.error_manager import (
+    ErrorManager,
+    ErrorSeverity,
+    get_error_manager,
+)
+from converter.error_handling.diagnostics import DiagnosticsCollector
+from converter.context import ConversionContext
 from converter.models import Binding, Layer, KeymapConfig
-from converter.dts.parser import DtsParser
-from converter.dts.extractor import KeymapExtractor
+from converter.model.frozen import FrozenKeymapConfig, FrozenUnicodeBinding
+from converter.behaviors.unicode import UnicodeBinding
+from converter.output.emitter import KanataEmitter
 
 from .holdtap_transformer import HoldTapTransformer
 from .macro_transformer import MacroTransformer
 from .sticky_key_transformer import StickyKeyTransformer
-from converter.transformer.keycode_map import zmk_to_kanata, MODIFIER_MACROS
-
+from .combo_index import ComboIndex
+from .binding_cache import BindingCache, CacheStats
+from .optimize import (
+    find_duplicate_layers,
+    hoist_repeated_actions,
+    rewrite_layer_refs,
+)
+from converter.transformer.keycode_map import _MACRO_OPENERS, zmk_to_kanata
+
+import bisect
+import io
 import logging
 import re
-from typing import List, Dict, Optional
+from collections import Counter
+from typing import (
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    TextIO,
+    Tuple,
+    Union,
+)
 
 # --- Unsupported ZMK features and their Kanata equivalents/limitations ---
 UNSUPPORTED_ZMK_FEATURES = {
@@ -26,6 +54,22 @@ UNSUPPORTED_ZMK_FEATURES = {
     # Add more as needed
 }
 
+# Diagnostic codes summarized as one counted line instead of per message
+_GROUPED_SUMMARY_CODES = {
+    "hold-tap-missing-params": (
+        "Warning: Skipped hold-tap combo due to missing parameters"
+    ),
+}
+# Max length for summary lines
+_SUMMARY_LINE_LENGTH = 79
+
+
+def _truncate_summary_line(line: str) -> str:
+    """Shorten a summary comment line to _SUMMARY_LINE_LENGTH characters."""
+    if len(line) > _SUMMARY_LINE_LENGTH:
+        return line[: _SUMMARY_LINE_LENGTH - 3] + "..."
+    return line
+
 
 class KanataTransformer:
     """Transforms ZMK keymap configurations to Kanata format.
@@ -34,20 +78,59 @@ class KanataTransformer:
     See UNSUPPORTED_ZMK_FEATURES for details.
     """
 
-    def __init__(self):
-        """Initialize the kanata transformer."""
-        self.parser = DtsParser()
-        self.extractor = KeymapExtractor()
-        self.error_manager = get_error_manager()
+    def __init__(
+        self,
+        diagnostics: Optional[DiagnosticsCollector] = None,
+        workers: int = 0,
+        hoist_aliases: bool = False,
+        dedup: bool = False,
+        error_manager: Optional[ErrorManager] = None,
+        stats: Optional[Counter] = None,
+    ):
+        """Initialize the kanata transformer.
+
+        Args:
+            diagnostics: Collector for problems found while transforming. A new
+                collector is created if none is given.
+            workers: Number of processes used to render layers in transform()
+                and transform_to(); 0 or 1 renders them serially.
+            hoist_aliases: Move compound actions repeated across layer slots
+                into generated aliases. All layers are rendered before the
+                first one is written.
+            dedup: Emit layers and macros whose rendered bodies are identical
+                to an earlier one only once, and point references to them at
+                the first definition. iter_transform() only dedups macros.
+            error_manager: Error manager for the behavior transformers;
+                defaults to the process-wide one.
+            stats: Counter that receives alias and binding cache counts;
+                a new one is created if none is given.
+        """
+        self.workers = workers
+        self.hoist_aliases = hoist_aliases
+        self.dedup = dedup
+        self.diagnostics = (
+            diagnostics if diagnostics is not None else DiagnosticsCollector()
+        )
+        self.error_manager = (
+            error_manager if error_manager is not None else get_error_manager()
+        )
+        self.stats = stats if stats is not None else Counter()
         self.layer_count = 0
         self.current_layer_name: Optional[str] = None
-        self.output: List[str] = []
+        self.emitter: Optional[KanataEmitter] = None
         self.hold_tap_definitions: Dict[str, str] = {}
         self.holdtap_transformer = HoldTapTransformer()
-        self.macro_transformer = MacroTransformer()
+        self.macro_transformer = MacroTransformer(self.error_manager)
         self.macro_definitions: Dict[str, str] = {}
-        self.sticky_key_transformer = StickyKeyTransformer()
-        self.error_messages: List[str] = []
+        # Duplicate macro name -> name of the identical macro emitted first
+        self.macro_aliases: Dict[str, str] = {}
+        self._macro_bodies: Dict[str, str] = {}
+        self.sticky_key_transformer = StickyKeyTransformer(self.error_manager)
+        # Messages for the end-of-output summary of the current transform
+        self._summary = DiagnosticsCollector()
+        self.binding_cache = BindingCache()
+        # Records made while rendering a binding that is being cached
+        self._record_capture: Optional[List[tuple]] = None
         # Default configuration values
         self.config = {
             "tapping_term_ms": 200,
@@ -62,36 +145,193 @@ class KanataTransformer:
         # Sanitize details to prevent them from breaking Kanata comment lines
         sanitized_details = details.replace("\\n", " ").replace(";", ",")
         msg = f"; unsupported: {feature_type} - {sanitized_details}"
-        # Ensure error_messages list exists (already typed in __init__)
-        if msg not in self.error_messages:  # Avoid duplicates
-            self.error_messages.append(msg)
+        if self._record_error(msg, "unsupported-feature"):
             logging.warning(
                 f"Unsupported feature encountered: {feature_type} - {details}"
             )
 
-    def transform(self, keymap: KeymapConfig) -> str:
+    def _record_error(
+        self,
+        msg: str,
+        code: str,
+        severity: ErrorSeverity = ErrorSeverity.WARNING,
+    ) -> bool:
+        """Record a message for the end-of-output summary and the diagnostics.
+
+        Returns:
+            True if the message had not been recorded before
+        """
+        if self._record_capture is not None:
+            self._record_capture.append((msg, code, severity))
+        self.diagnostics.add(code, msg, severity)
+        return self._summary.add(code, msg, severity)
+
+    @property
+    def error_messages(self) -> List[str]:
+        """Distinct messages recorded by the current transform, in order."""
+        return [d.message for d in self._summary]
+
+    def bind(self, context: ConversionContext) -> "KanataTransformer":
+        """Return a new transformer with these settings that reports to context.
+
+        The new transformer starts from this one's config with the context's
+        overrides applied, so this instance is never modified by the
+        conversion and can be shared between threads.
+        """
+        transformer = KanataTransformer(
+            diagnostics=context.diagnostics,
+            workers=self.workers,
+            hoist_aliases=self.hoist_aliases,
+            dedup=self.dedup,
+            error_manager=context.errors,
+            stats=context.stats,
+        )
+        transformer.config.update(self.config)
+        transformer.config.update(context.config)
+        return transformer
+
+    def transform(
+        self, keymap: KeymapConfig, context: Optional[ConversionContext] = None
+    ) -> str:
         """
         Transform the intermediate KeymapConfig into Kanata DSL format.
 
         Appends a summary of all errors as a Kanata comment at the end.
         Unsupported ZMK features are mapped to Kanata comments inline.
+        With a context, the conversion runs on bind(context).
         """
+        if context is not None:
+            return self.bind(context).transform(keymap)
+        buffer = io.StringIO()
+        self.transform_to(keymap, buffer)
+        return buffer.getvalue()
+
+    def transform_to(
+        self,
+        keymap: KeymapConfig,
+        stream: TextIO,
+        context: Optional[ConversionContext] = None,
+    ) -> None:
+        """
+        Transform a KeymapConfig and write the Kanata DSL to stream.
 
-        def is_holdtap(obj):
-            return (
-                hasattr(obj, "type")
-                and getattr(obj, "type", None) == "hold-tap"
-                and hasattr(obj, "name")
-                and hasattr(obj, "tapping_term_ms")
-                and hasattr(obj, "hold_key")
-                and hasattr(obj, "tap_key")
+        Produces the same text as transform(), but each section is written
+        as soon as it is rendered, so only one layer is held in memory.
+        With a context, the conversion runs on bind(context).
+        """
+        if context is not None:
+            self.bind(context).transform_to(keymap, stream)
+            return
+        self._begin_transform(keymap, stream)
+        seen: Set[str] = set()
+        layers = [
+            layer
+            for layer in keymap.layers
+            if not self._is_duplicate_layer(layer, seen)
+        ]
+        self.layer_count = len(layers)
+
+        # --- Combo support: emit simple combos as Kanata aliases ---
+        if hasattr(keymap, "combos") and keymap.combos:
+            # Map key positions against the default layer (layers[0])
+            default_layer = layers[0] if layers else None
+            self._emit_combos(keymap.combos, default_layer)
+
+        if keymap.behaviors:
+            self._emit_behaviors(keymap.behaviors.values())
+
+        holdtap_uses = self._index_holdtaps(layers)
+        for (btype, bname, modifier, key), ht_behavior in holdtap_uses.items():
+            self._emit_holdtap_alias(ht_behavior, btype, bname, modifier, key)
+
+        self._emit_layers(keymap, layers)
+
+        self._emit_error_summary()
+        self._count_stats()
+        self.emitter.flush()
+
+    def iter_transform(
+        self,
+        items: Iterable[Union[KeymapConfig, Layer]],
+        context: Optional[ConversionContext] = None,
+    ) -> Iterator[str]:
+        """
+        Transform a stream produced by KeymapExtractor.iter_extract.
+
+        The first item must be the KeymapConfig header carrying behaviors and
+        combos; every following item is a Layer. Output is yielded in chunks
+        (each ending in a newline) as soon as it is rendered, so emission
+        overlaps extraction and only the current layer is held in memory.
+
+        Hold-tap aliases are emitted just before the first layer that uses
+        them and combos just before the first layer, so the section order
+        differs from transform(), but the set of definitions is the same.
+        A layer reusing an earlier layer's name is skipped, as in transform().
+        With a context, the conversion runs on bind(context).
+        """
+        if context is not None:
+            yield from self.bind(context).iter_transform(items)
+            return
+        items = iter(items)
+        header = next(items, None)
+        if not isinstance(header, (KeymapConfig, FrozenKeymapConfig)):
+            raise TypeError(
+                "iter_transform expects a KeymapConfig header as the first item"
             )
+        buffer = io.StringIO()
+        self._begin_transform(header, buffer)
+
+        emitted_behaviors = set()
 
-        self.output = []
+        def emit_new_behaviors():
+            # Built-in behaviors may be registered while later layers are parsed
+            new = [
+                b for name, b in list(header.behaviors.items())
+                if name not in emitted_behaviors
+            ]
+            emitted_behaviors.update(header.behaviors.keys())
+            if new:
+                self._emit_behaviors(new)
+
+        emit_new_behaviors()
+        yield from self._drain_output(buffer)
+
+        pending_combos = list(getattr(header, "combos", None) or [])
+        emitted_holdtaps = set()
+        seen: Set[str] = set()
+        for layer in items:
+            if self._is_duplicate_layer(layer, seen):
+                continue
+            self.layer_count += 1
+            if pending_combos:
+                self._emit_combos(pending_combos, layer)
+                pending_combos = []
+            emit_new_behaviors()
+            for use, ht_behavior in self._index_holdtaps([layer]).items():
+                if use in emitted_holdtaps:
+                    continue
+                emitted_holdtaps.add(use)
+                btype, bname, modifier, key = use
+                self._emit_holdtap_alias(ht_behavior, btype, bname, modifier, key)
+            self._emit_layer(layer)
+            yield from self._drain_output(buffer)
+
+        if pending_combos:
+            self._emit_combos(pending_combos, None)
+        self._emit_error_summary()
+        self._count_stats()
+        yield from self._drain_output(buffer)
+
+    def _begin_transform(self, keymap: KeymapConfig, stream: TextIO) -> None:
+        """Reset per-transform state and emit the configuration header."""
+        self.emitter = KanataEmitter(stream)
         self.hold_tap_definitions = {}
         self.macro_definitions = {}
-        self.layer_count = len(keymap.layers)
-        # self.error_messages = [] # Already initialized in __init__
+        self.macro_aliases = {}
+        self._macro_bodies = {}
+        self.layer_count = 0
+        self.binding_cache.clear()
+        self._summary.clear()
 
         # Update config from keymap if available
         if hasattr(keymap, "config"):
@@ -99,344 +339,488 @@ class KanataTransformer:
 
         self._add_header()
 
-        # --- Combo support: emit simple combos as Kanata aliases ---
-        if hasattr(keymap, "combos") and keymap.combos:
-            for combo in keymap.combos:
-                # Simple combo: single key output, no modifiers/macros
-                is_simple = (
-                    hasattr(combo, "binding") and  # Ensure combo.binding exists
+    def _count_stats(self) -> None:
+        """Add the counts of the finished transform to stats."""
+        cache = self.binding_cache.stats()
+        self.stats["aliases"] += self.emitter.alias_count
+        self.stats["binding_cache_hits"] += cache.hits
+        self.stats["binding_cache_misses"] += cache.misses
+
+    @staticmethod
+    def _drain_output(buffer: io.StringIO) -> Iterator[str]:
+        """Yield and discard the output accumulated in buffer so far."""
+        chunk = buffer.getvalue()
+        if chunk:
+            buffer.seek(0)
+            buffer.truncate()
+            yield chunk
+
+    def _emit_combos(self, combos: List, default_layer: Optional[Layer]) -> None:
+        """Emit simple combos as Kanata aliases, resolved against default_layer."""
+        index = ComboIndex(
+            combos,
+            [default_layer] if default_layer is not None else [],
+            resolver=self._to_kanata_symbolic,
+        )
+        self._report_combo_conflicts(index)
+        for combo in combos:
+            # Simple combo: single key output, no modifiers/macros
+            is_simple = (
+                hasattr(combo, "binding") and  # Ensure combo.binding exists
+                (
+                    (hasattr(combo.binding, "key") and combo.binding.key) or
                     (
-                        (hasattr(combo.binding, "key") and combo.binding.key) or
-                        (
-                            hasattr(combo.binding, "params") and
-                            isinstance(combo.binding.params, list) and
-                            len(combo.binding.params) == 1
-                        )
-                    ) and
-                    isinstance(combo.key_positions, list) and
-                    len(combo.key_positions) >= 2
-                )
-                if is_simple:
-                    # Map key positions to Kanata key names
-                    # (assume keymap.layers[0] is default)
-                    if keymap.layers:
-                        default_layer = keymap.layers[0]
-                        # Use flat list of bindings
-                        try:
-                            key_names = []
-                            for pos in combo.key_positions:
-                                binding = default_layer.bindings[pos]
-                                if hasattr(binding, "key") and binding.key:
-                                    key_name = binding.key
-                                elif hasattr(binding, "params") and binding.params:
-                                    key_name = binding.params[0]
-                                else:
-                                    key_name = str(pos)
-                                # Map to Kanata
-                                mapped = self._to_kanata_symbolic(key_name)
-                                key_names.append(mapped if mapped else key_name)
-                        except Exception:
-                            key_names = [str(pos) for pos in combo.key_positions]
-                    else:
-                        key_names = [str(pos) for pos in combo.key_positions]
-
-                    # Get output key
-                    if hasattr(combo.binding, "key") and combo.binding.key:
-                        out_key = combo.binding.key
-                    elif (
-                        hasattr(combo.binding, "params")
-                        and len(combo.binding.params) == 1
-                    ):
-                        out_key = combo.binding.params[0]
-                    else:
-                        out_key = None
-
-                    if out_key:
-                        out_key_mapped = self._to_kanata_symbolic(out_key) or out_key
-                        alias_name = f"{combo.name}"
-                        combo_str = (
-                            f"(defalias\\n  {alias_name} "
-                            f"(combo {' '.join(key_names)} {out_key_mapped})\\n)"
-                        )
-                        self.output.append(f"\\n{combo_str}")
-                    else:
-                        msg = (
-                            f"Warning: Combo '{combo.name}' skipped: "
-                            "output is not a simple key."
-                        )
-                        logging.warning(msg)
-                        self.error_messages.append(msg)
-                        comment = (
-                            f"; unsupported: combo '{combo.name}' "
-                            "is not a simple key output"
-                        )
-                        self.output.append(self._format_binding_comment("", comment))
+                        hasattr(combo.binding, "params") and
+                        isinstance(combo.binding.params, (list, tuple)) and
+                        len(combo.binding.params) == 1
+                    )
+                ) and
+                isinstance(combo.key_positions, (list, tuple)) and
+                len(combo.key_positions) >= 2
+            )
+            if is_simple:
+                # Map key positions to Kanata key names via the default layer
+                try:
+                    key_names = index.key_names(combo)
+                except Exception:
+                    key_names = None
+                if key_names is None:
+                    key_names = [str(pos) for pos in combo.key_positions]
+
+                # Get output key
+                if hasattr(combo.binding, "key") and combo.binding.key:
+                    out_key = combo.binding.key
+                elif (
+                    hasattr(combo.binding, "params")
+                    and len(combo.binding.params) == 1
+                ):
+                    out_key = combo.binding.params[0]
+                else:
+                    out_key = None
+
+                if out_key:
+                    out_key_mapped = self._to_kanata_symbolic(out_key) or out_key
+                    alias_name = f"{combo.name}"
+                    combo_str = (
+                        f"(defalias\n  {alias_name} "
+                        f"(combo {' '.join(key_names)} {out_key_mapped})\n)"
+                    )
+                    self.emitter.write_alias(f"\n{combo_str}")
                 else:
                     msg = (
-                        f"Warning: Combo '{combo.name}' skipped: " "not a simple combo."
+                        f"Warning: Combo '{combo.name}' skipped: "
+                        "output is not a simple key."
                     )
                     logging.warning(msg)
-                    self.error_messages.append(msg)
+                    self._record_error(msg, "combo-unsupported", ErrorSeverity.WARNING)
                     comment = (
-                        f"; unsupported: combo '{combo.name}' " "is not a simple combo"
+                        f"; unsupported: combo '{combo.name}' "
+                        "is not a simple key output"
                     )
-                    self.output.append(self._format_binding_comment("", comment))
+                    self.emitter.write_comment(self._format_binding_comment("", comment))
+            else:
+                msg = (
+                    f"Warning: Combo '{combo.name}' skipped: " "not a simple combo."
+                )
+                logging.warning(msg)
+                self._record_error(msg, "combo-unsupported", ErrorSeverity.WARNING)
+                comment = (
+                    f"; unsupported: combo '{combo.name}' " "is not a simple combo"
+                )
+                self.emitter.write_comment(self._format_binding_comment("", comment))
+
+    def _report_combo_conflicts(self, index: ComboIndex) -> None:
+        """Record duplicate, overlapping and timeout-conflicting combos."""
+        for conflict in index.conflicts():
+            names = ", ".join(f"'{c.name}'" for c in conflict.combos)
+            if conflict.kind == "duplicate":
+                msg = f"Combos {names} use the same key positions."
+            elif conflict.kind == "overlap":
+                msg = f"Combo key positions of {names} overlap (subset)."
+            else:
+                timeouts = "/".join(str(c.timeout_ms) for c in conflict.combos)
+                msg = f"Overlapping combos {names} have different timeouts ({timeouts} ms)."
+            self.diagnostics.warning(f"combo-{conflict.kind}", msg)
+
+    def _emit_behaviors(self, behaviors: Iterable) -> None:
+        """Emit macro definitions and base hold-tap aliases for behaviors."""
+        for behavior_obj in behaviors:  # Renamed to avoid conflict
+            if behavior_obj.type == "macro":
+                macro_str = self.macro_transformer.transform_macro(behavior_obj)
+                if behavior_obj.name in self.macro_definitions:
+                    continue
+                self.macro_definitions[behavior_obj.name] = macro_str
+                if self.dedup and self._dedup_macro(behavior_obj.name, macro_str):
+                    continue
+                self.emitter.write_macro(f"\n{macro_str}")
+            elif behavior_obj.type == "hold-tap":
+                # Always emit a base alias for any hold-tap type with a name
+                if not (hasattr(behavior_obj, "name")):
+                    msg = (
+                        "Warning: Skipping hold-tap behavior with no name "
+                        f"(got {type(behavior_obj)})."
+                    )
+                    logging.warning(msg)
+                    self._record_error(msg, "hold-tap-unnamed", ErrorSeverity.WARNING)
+                    comment = (
+                        "; unsupported: hold-tap behavior with no name "
+                        f"(got {type(behavior_obj)})"
+                    )
+                    self.emitter.write_comment(self._format_binding_comment("", comment))
+                    continue
 
-        if keymap.behaviors:
-            for behavior_obj in keymap.behaviors.values():  # Renamed to avoid conflict
-                if behavior_obj.type == "macro":
-                    macro_str = self.macro_transformer.transform_macro(behavior_obj)
-                    if behavior_obj.name not in self.macro_definitions:
-                        self.macro_definitions[behavior_obj.name] = macro_str
-                        self.output.append(f"\\n{macro_str}")
-                elif behavior_obj.type == "hold-tap":
-                    # Always emit a base alias for any hold-tap type with a name
-                    if not (hasattr(behavior_obj, "name")):
-                        msg = (
-                            "Warning: Skipping hold-tap behavior with no name "
-                            f"(got {type(behavior_obj)})."
-                        )
-                        logging.warning(msg)
-                        self.error_messages.append(msg)
+                tap_time, hold_time = self._holdtap_timeouts(behavior_obj)
+                tap_key = self._to_kanata_symbolic(
+                    getattr(behavior_obj, "tap_key", "A"), for_alias_name=True
+                )
+                hold_key = self._to_kanata_symbolic(
+                    getattr(behavior_obj, "hold_key", "LCTRL"), for_alias_name=True
+                )
+                alias_name = behavior_obj.name
+                config_parts = [
+                    "tap-hold",
+                    str(tap_time),
+                    str(hold_time),
+                    str(tap_key),
+                    str(hold_key),
+                ]
+                alias_def = f"(defalias {alias_name} ({' '.join(config_parts)}))"
+                self.emitter.write_alias(f"\n{alias_def}")
+                # Emit comments for unmapped properties (like retro-tap)
+                extra = getattr(behavior_obj, "extra_properties", {})
+                for prop in ["retro-tap", "hold-trigger-key-positions"]:
+                    val = extra.get(prop, None) if extra else None
+                    if val is None:
+                        val = getattr(behavior_obj, prop.replace("-", "_"), None)
+                    if val is not None:
                         comment = (
-                            "; unsupported: hold-tap behavior with no name "
-                            f"(got {type(behavior_obj)})"
+                            f"; TODO: {prop} property present; Kanata "
+                            "does not support this property. "
+                            "Manual review needed."
                         )
-                        self.output.append(self._format_binding_comment("", comment))
-                        continue
-
-                    tap_time = getattr(behavior_obj, "tapping_term_ms", 200)
-                    hold_time = getattr(behavior_obj, "hold_time_ms", tap_time)
-                    tap_key = self._to_kanata_symbolic(
-                        getattr(behavior_obj, "tap_key", "A"), for_alias_name=True
-                    )
-                    hold_key = self._to_kanata_symbolic(
-                        getattr(behavior_obj, "hold_key", "LCTRL"), for_alias_name=True
-                    )
-                    alias_name = behavior_obj.name
-                    config_parts = [
-                        "tap-hold",
-                        str(tap_time),
-                        str(hold_time),
-                        str(tap_key),
-                        str(hold_key),
-                    ]
-                    alias_def = f"(defalias {alias_name} ({' '.join(config_parts)}))"
-                    self.output.append(f"\\n{alias_def}")
-                    # Emit comments for unmapped properties (like retro-tap)
-                    extra = getattr(behavior_obj, "extra_properties", {})
-                    for prop in ["retro-tap", "hold-trigger-key-positions"]:
-                        val = extra.get(prop, None) if extra else None
-                        if val is None:
-                            val = getattr(behavior_obj, prop.replace("-", "_"), None)
-                        if val is not None:
+                        self.emitter.write_comment(
+                            self._format_binding_comment("", comment)
+                        )
+                if extra:
+                    for prop in extra:
+                        if prop not in (
+                            "hold-time-ms",
+                            "flavor",
+                            "bindings",
+                            "quick-tap-ms",
+                            "tap-hold-wait-ms",
+                            "require-prior-idle-ms",
+                            "retro-tap",
+                            "hold-trigger-key-positions",
+                        ):
                             comment = (
-                                f"; TODO: {prop} property present; Kanata "
-                                "does not support this property. "
+                                f"; TODO: hold-tap '{alias_name}' "
+                                f"property '{prop}' not mapped. "
                                 "Manual review needed."
                             )
-                            self.output.append(
+                            self.emitter.write_comment(
                                 self._format_binding_comment("", comment)
                             )
-                    if extra:
-                        for prop in extra:
-                            if prop not in (
-                                "hold-time-ms",
-                                "flavor",
-                                "bindings",
-                                "quick-tap-ms",
-                                "tap-hold-wait-ms",
-                                "require-prior-idle-ms",
-                                "retro-tap",
-                                "hold-trigger-key-positions",
-                            ):
-                                comment = (
-                                    f"; TODO: hold-tap '{alias_name}' "
-                                    f"property '{prop}' not mapped. "
-                                    "Manual review needed."
-                                )
-                                self.output.append(
-                                    self._format_binding_comment("", comment)
-                                )
-        holdtap_combos = set()
-        for layer in keymap.layers:
+
+    def _dedup_macro(self, name: str, macro_str: str) -> bool:
+        """Map a macro to an earlier one with the same body, if there is one.
+
+        References to the duplicate are rendered as the earlier macro (see
+        macro_aliases), so only a comment is written in its place.
+
+        Returns:
+            True if the macro is a duplicate and must not be emitted
+        """
+        body = macro_str.partition("\n")[2]
+        canonical = self._macro_bodies.setdefault(body, name)
+        if canonical == name:
+            return False
+        self.macro_aliases[name] = canonical
+        self.emitter.write_comment(
+            f"; defmacro {name} omitted: identical to {canonical}"
+        )
+        return True
+
+    def _index_holdtaps(self, layers: Iterable[Layer]) -> Dict[tuple, object]:
+        """Index the distinct hold-tap uses in layers in a single pass.
+
+        Returns:
+            Dict mapping each distinct (type, name, hold, tap) use, in
+            first-seen order, to the first behavior object seen with that
+            (type, name)
+        """
+        behaviors: Dict[tuple, object] = {}
+        uses: Dict[tuple, tuple] = {}
+        for layer in layers:
             for binding_item in layer.bindings:  # Renamed to avoid conflict
-                if (
-                    binding_item
-                    and hasattr(binding_item, "behavior")
-                    and binding_item.behavior is not None
-                    and getattr(binding_item.behavior, "type", None)
-                    in ("hold-tap", "zmk,behavior-mod-tap")
-                ):
-                    if not binding_item.params or len(binding_item.params) < 2:
-                        msg = (
-                            "Warning: Skipped hold-tap combo due to missing "
-                            "parameters "
-                            f"(binding: {getattr(binding_item, 'params', binding_item)})"
-                        )
-                        logging.error(msg)
-                        self.error_messages.append(msg)
-                        continue
-                    modifier = binding_item.params[0]
-                    key = binding_item.params[1]
-                    btype = getattr(binding_item.behavior, "type", None)
-                    bname = getattr(binding_item.behavior, "name", None)
-                    holdtap_combos.add((btype, bname, modifier, key))
-
-        for btype, bname, modifier, key in holdtap_combos:
-            alias_type = bname if bname in ("lt", "mt") else btype
-            # Resolve the actual behavior object
-            ht_behavior = None
-            for layer_conf in keymap.layers:  # Renamed to avoid conflict
-                for binding_obj in layer_conf.bindings:  # Renamed
-                    if (
-                        binding_obj
-                        and hasattr(binding_obj, "behavior")
-                        and binding_obj.behavior is not None
-                        and getattr(binding_obj.behavior, "type", None) == btype
-                        and getattr(binding_obj.behavior, "name", None) == bname
-                    ):
-                        ht_behavior = binding_obj.behavior
-                        break
-                if ht_behavior:
-                    break
-
-            if not (
-                ht_behavior  # Check if resolved
-                and hasattr(ht_behavior, "type")
-                and getattr(ht_behavior, "type", None) == "hold-tap"
-                and hasattr(ht_behavior, "name")
-            ):
-                msg = (
-                    f"Warning: Skipping hold-tap alias '{alias_type}' "
-                    f"(hold: {modifier}, tap: {key}) "
-                    "because behavior is not a hold-tap type "
-                    f"(got {type(ht_behavior)})."
-                )
-                logging.warning(msg)
-                self.error_messages.append(msg)
-                comment = (
-                    f"; unsupported: hold-tap alias '{alias_type}' "
-                    f"(hold: {modifier}, tap: {key}) not a hold-tap type"
+                behavior = getattr(binding_item, "behavior", None)
+                if behavior is None:
+                    continue
+                btype = getattr(behavior, "type", None)
+                if btype not in ("hold-tap", "zmk,behavior-mod-tap"):
+                    continue
+                bname = getattr(behavior, "name", None)
+                behavior_key = (btype, bname)
+                if behavior_key not in behaviors:
+                    behaviors[behavior_key] = behavior
+                if not binding_item.params or len(binding_item.params) < 2:
+                    msg = (
+                        "Warning: Skipped hold-tap combo due to missing "
+                        "parameters "
+                        f"(binding: {getattr(binding_item, 'params', binding_item)})"
+                    )
+                    logging.error(msg)
+                    self._record_error(msg, "hold-tap-missing-params", ErrorSeverity.WARNING)
+                    continue
+                use = (btype, bname, binding_item.params[0], binding_item.params[1])
+                if use not in uses:
+                    uses[use] = behavior_key
+        return {use: behaviors[behavior_key] for use, behavior_key in uses.items()}
+
+    def _emit_holdtap_alias(self, ht_behavior, btype, bname, modifier, key) -> None:
+        """Emit the tap-hold defalias for one hold-tap parameterization."""
+        alias_type = bname if bname in ("lt", "mt") else btype
+        if not (
+            ht_behavior  # Check if resolved
+            and hasattr(ht_behavior, "type")
+            and getattr(ht_behavior, "type", None) == "hold-tap"
+            and hasattr(ht_behavior, "name")
+        ):
+            msg = (
+                f"Warning: Skipping hold-tap alias '{alias_type}' "
+                f"(hold: {modifier}, tap: {key}) "
+                "because behavior is not a hold-tap type "
+                f"(got {type(ht_behavior)})."
+            )
+            logging.warning(msg)
+            self._record_error(msg, "hold-tap-alias-invalid", ErrorSeverity.WARNING)
+            comment = (
+                f"; unsupported: hold-tap alias '{alias_type}' "
+                f"(hold: {modifier}, tap: {key}) not a hold-tap type"
+            )
+            self.emitter.write_comment(self._format_binding_comment("", comment))
+            return
+
+        tap_time, hold_time = self._holdtap_timeouts(ht_behavior)
+        # Use mapped values for tap and hold keys, always symbolic
+        mapped_tap = self._to_kanata_symbolic(key, for_alias_name=True)
+        mapped_hold = self._to_kanata_symbolic(modifier, for_alias_name=True)
+        alias_name = self._holdtap_alias_name(
+            alias_type,
+            mapped_hold,
+            mapped_tap,
+        )
+        config_parts = [
+            "tap-hold",
+            str(tap_time),
+            str(hold_time),
+            str(mapped_tap),
+            str(mapped_hold),
+        ]
+
+        # Format defalias carefully to respect line length
+        alias_name_str = str(alias_name)
+        config_str = f"({' '.join(config_parts)})"
+        line2_for_defalias = f"  {alias_name_str} {config_str}"
+
+        if len(line2_for_defalias) <= 79:
+            alias_def = f"(defalias\n{line2_for_defalias}\n)"
+        else:
+            # Try to fit alias name on its own line, then config on next
+            line2_name_only = f"  {alias_name_str}"
+            line3_config_only = f"  {config_str}"
+            if len(line2_name_only) <= 79 and len(line3_config_only) <= 79:
+                alias_def = f"(defalias {alias_name_str}\n{line3_config_only}\n)" # Name on 1st line
+            else:
+                # If config_str itself is too long, it needs internal splitting by Kanata if supported
+                # or this indicates a very complex/long generated config part.
+                # For now, just put it on its line and let it exceed if it must.
+                # A more robust solution might truncate or further parse config_str.
+                logging.warning(
+                    f"Generated defalias config part is very long and might exceed line limits: {config_str}"
                 )
-                self.output.append(self._format_binding_comment("", comment))
-                continue
+                alias_def = f"(defalias {alias_name_str}\n  {config_str} ; Potentially long line\n)"
+
+        if alias_name not in self.hold_tap_definitions:
+            self.hold_tap_definitions[alias_name] = alias_def
+            self.emitter.write_alias(f"\n{alias_def}")
+
+    def _emit_layer(self, layer: Layer) -> None:
+        """Emit one deflayer, or an inline error comment if it fails."""
+        self._write_layer(layer, *self._render_layer(layer))
+
+    def _is_duplicate_layer(self, layer: Layer, seen: Set[str]) -> bool:
+        """Check whether a layer's name is already in seen, adding it if not.
 
-            tap_time = getattr(ht_behavior, "tapping_term_ms", 200)
-            hold_time = getattr(ht_behavior, "hold_time_ms", tap_time)
-            # Use mapped values for tap and hold keys, always symbolic
-            mapped_tap = self._to_kanata_symbolic(key, for_alias_name=True)
-            mapped_hold = self._to_kanata_symbolic(modifier, for_alias_name=True)
-            alias_name = self._holdtap_alias_name(
-                alias_type,
-                mapped_hold,
-                mapped_tap,
+        Layers are keyed by name and the first definition is kept: when
+        iter_transform() meets a duplicate, the earlier layer has already
+        been written.
+        """
+        if layer.name not in seen:
+            seen.add(layer.name)
+            return False
+        msg = f"Duplicate layer name {layer.name}. Keeping the first definition."
+        logging.warning(msg)
+        self._record_error(msg, "duplicate-layer", ErrorSeverity.WARNING)
+        return True
+
+    def _emit_layers(self, keymap: KeymapConfig, layers: List[Layer]) -> None:
+        """Render and emit the given layers of keymap in index order."""
+        rendered = self._render_layers(layers)
+        if self.dedup:
+            rendered = self._dedup_layers(list(rendered))
+        if self.hoist_aliases:
+            rendered = list(rendered)
+            reserved = {
+                *keymap.behaviors,
+                *(combo.name for combo in getattr(keymap, "combos", None) or ()),
+                *self.hold_tap_definitions,
+                *self.macro_definitions,
+                *(layer.name for layer in layers),
+            }
+            hoisted = hoist_repeated_actions(
+                [rows for _, rows, _ in rendered], reserved=reserved
             )
-            config_parts = [
-                "tap-hold",
-                str(tap_time),
-                str(hold_time),
-                str(mapped_tap),
-                str(mapped_hold),
+            if hoisted.aliases:
+                self.emitter.write_defalias(hoisted.aliases)
+            rendered = [
+                (layer, rows, comment)
+                for (layer, _, comment), rows in zip(rendered, hoisted.layers)
             ]
-            
-            # Format defalias carefully to respect line length
-            alias_name_str = str(alias_name)
-            config_str = f"({' '.join(config_parts)})"
-            line2_for_defalias = f"  {alias_name_str} {config_str}"
-
-            if len(line2_for_defalias) <= 79:
-                alias_def = f"(defalias\n{line2_for_defalias}\n)"
+        for layer, rows, comment in rendered:
+            self._write_layer(layer, rows, comment)
+
+    def _dedup_layers(
+        self, rendered: List[Tuple[Layer, List[str], Optional[str]]]
+    ) -> List[Tuple[Layer, List[str], Optional[str]]]:
+        """Replace layers identical to an earlier one with a comment.
+
+        Layer actions that name a dropped layer, by name or index, are
+        redirected to the layer it duplicates. Dropping a layer moves every
+        later layer down one position, so index references to those are
+        renumbered too.
+        """
+        duplicates = find_duplicate_layers(
+            [(layer.name, rows) for layer, rows, comment in rendered if comment is None]
+        )
+        if not duplicates:
+            return rendered
+        by_name = {layer.name: layer for layer, _, _ in rendered}
+        dropped = sorted(by_name[name].index for name in duplicates)
+        refs: Dict[str, str] = {}
+        for layer, _, _ in rendered:
+            target = by_name[duplicates.get(layer.name, layer.name)]
+            if target is not layer:
+                refs[layer.name] = target.name
+            position = target.index - bisect.bisect_left(dropped, target.index)
+            if position != layer.index:
+                refs[str(layer.index)] = str(position)
+        deduped = []
+        for layer, rows, comment in rendered:
+            canonical = duplicates.get(layer.name)
+            if canonical is not None:
+                comment = f"; deflayer {layer.name} omitted: identical to {canonical}"
+                deduped.append((layer, [], comment))
             else:
-                # Try to fit alias name on its own line, then config on next
-                line2_name_only = f"  {alias_name_str}"
-                line3_config_only = f"  {config_str}"
-                if len(line2_name_only) <= 79 and len(line3_config_only) <= 79:
-                    alias_def = f"(defalias {alias_name_str}\n{line3_config_only}\n)" # Name on 1st line
+                deduped.append((layer, rewrite_layer_refs(rows, refs), comment))
+        return deduped
+
+    def _render_layers(
+        self, layers: Sequence[Layer]
+    ) -> Iterator[Tuple[Layer, List[str], Optional[str]]]:
+        """Yield (layer, rows, error comment or None) in index order."""
+        if self.workers > 1 and len(layers) > 1:
+            yield from self._render_layers_parallel(layers)
+        else:
+            for layer in layers:
+                yield (layer, *self._render_layer(layer))
+
+    def _render_layer(self, layer: Layer) -> Tuple[List[str], Optional[str]]:
+        """Render a layer's rows, or record the failure and return its comment."""
+        try:
+            return self._layer_rows(layer), None
+        except Exception as e:
+            return [], self._layer_failed(layer, e)
+
+    def _render_layers_parallel(
+        self, layers: Sequence[Layer]
+    ) -> Iterator[Tuple[Layer, List[str], Optional[str]]]:
+        """Render layers in worker processes, yielding them in index order.
+
+        Records made by the workers are recorded again here, layer by layer,
+        so diagnostics and the error summary match a serial transform.
+        """
+        # Imported here: it pulls in concurrent.futures.process
+        from .parallel import render_layers_parallel
+
+        layers = list(layers)
+        chunks = render_layers_parallel(
+            self.config,
+            list(self.macro_definitions),
+            layers,
+            self.workers,
+            macro_aliases=self.macro_aliases,
+        )
+        pending = iter(layers)
+        for chunk in chunks:
+            self.binding_cache.hits += chunk.hits
+            self.binding_cache.misses += chunk.misses
+            for rendered in chunk.layers:
+                layer = next(pending)
+                for record in rendered.records:
+                    self._record_error(*record)
+                if rendered.error is not None:
+                    yield layer, [], self._layer_failed(layer, rendered.error)
                 else:
-                    # If config_str itself is too long, it needs internal splitting by Kanata if supported
-                    # or this indicates a very complex/long generated config part.
-                    # For now, just put it on its line and let it exceed if it must.
-                    # A more robust solution might truncate or further parse config_str.
-                    logging.warning(
-                        f"Generated defalias config part is very long and might exceed line limits: {config_str}"
-                    )
-                    alias_def = f"(defalias {alias_name_str}\n  {config_str} ; Potentially long line\n)"
-            
-            if alias_name not in self.hold_tap_definitions:
-                self.hold_tap_definitions[alias_name] = alias_def
-                self.output.append(f"\\n{alias_def}")
-
-        for layer in keymap.layers:
-            try:
-                self.output.append(self._transform_layer(layer))
-            except Exception as e:
-                msg = (
-                    f"Error: Failed to transform layer "
-                    f"'{getattr(layer, 'name', None)}'. Reason: {e}"
-                )
-                logging.error(msg)
-                self.error_messages.append(msg)
-                err_line = (
-                    f"; unsupported: failed to transform layer "
-                    f"{getattr(layer, 'name', None)}. Reason: {e}>"
-                )
-                self.output.append(self._format_binding_comment("", err_line))
-
-        # Append error summary as a Kanata comment
-        if self.error_messages:
-            # Deduplicate and filter messages
-            unique_msgs = list(dict.fromkeys(self.error_messages))
-            filtered_msgs = []
-            skip_phrases = [
-                "Warning: Skipped hold-tap alias due to missing parameters",
-                "Warning: Skipped hold-tap combo due to missing parameters",
-            ]
-            skip_counts = {phrase: 0 for phrase in skip_phrases}
+                    yield layer, rendered.rows, None
 
-            for msg_item in unique_msgs:
-                for phrase in skip_phrases:
-                    if msg_item.startswith(phrase):
-                        skip_counts[phrase] += 1
-                        break
-                else:
-                    filtered_msgs.append(msg_item)
-
-            self.output.append("\n; --- Unsupported/Unknown ZMK Features ---")
-            # Grouped warnings
-            for phrase, count in skip_counts.items():
-                if count:
-                    line = (
-                        f"; {phrase} ({count} occurrence"
-                        f"{'s' if count > 1 else ''})"
-                    )
-                    if len(line) > 79: # Max length for summary lines
-                        line = line[:76] + "..."
-                    self.output.append(line)
-
-            # Other unique, actionable messages
-            for msg_item in filtered_msgs:
-                # msg_item could be like "; unsupported: some feature" or "ERROR: Some error"
-                if not msg_item.startswith(";"):
-                    # If it's a raw error message like "ERROR: Some error"
-                    line = f"; {msg_item.lstrip()}"
-                else:
-                    # If it's already a comment like "; unsupported: ..."
-                    line = msg_item.lstrip()
-                
-                if len(line) > 79: # Max length for summary lines
-                    line = line[:76] + "..."
-                self.output.append(line)
-        
-        return "\n".join(self.output) + "\n" # Ensure trailing newline
+    def _layer_failed(self, layer: Layer, e) -> str:
+        """Record a failed layer and return the inline error comment for it."""
+        msg = (
+            f"Error: Failed to transform layer "
+            f"'{getattr(layer, 'name', None)}'. Reason: {e}"
+        )
+        logging.error(msg)
+        self._record_error(msg, "layer-failed", ErrorSeverity.ERROR)
+        err_line = (
+            f"; unsupported: failed to transform layer "
+            f"{getattr(layer, 'name', None)}. Reason: {e}>"
+        )
+        return self._format_binding_comment("", err_line)
+
+    def _write_layer(
+        self, layer: Layer, rows: List[str], comment: Optional[str]
+    ) -> None:
+        """Write a rendered deflayer, or the comment that replaces it."""
+        if comment is not None:
+            self.emitter.write_comment(comment)
+        else:
+            self.emitter.write_layer(layer.name, rows)
+
+    def _emit_error_summary(self) -> None:
+        """Append a summary of all errors as a Kanata comment."""
+        if not self._summary:
+            return
+        self.emitter.write_comment("\n; --- Unsupported/Unknown ZMK Features ---")
+        # Grouped warnings
+        for code, phrase in _GROUPED_SUMMARY_CODES.items():
+            count = self._summary.count(code)
+            if count:
+                line = f"; {phrase} ({count} occurrence{'s' if count > 1 else ''})"
+                self.emitter.write_comment(_truncate_summary_line(line))
+
+        # Other unique, actionable messages
+        for diagnostic in self._summary:
+            if diagnostic.code in _GROUPED_SUMMARY_CODES:
+                continue
+            # Messages are either comments ("; unsupported: ...") or raw errors
+            msg = diagnostic.message
+            line = msg.lstrip() if msg.startswith(";") else f"; {msg.lstrip()}"
+            self.emitter.write_comment(_truncate_summary_line(line))
 
     def _add_header(self):
         """Add Kanata configuration header."""
-        self.output.append("(defcfg")
-        self.output.append("  input (kb () () )")
-        self.output.append("  output (kbd ())")
-        self.output.append(")")
-        self.output.append("")
+        self.emitter.write_defcfg(["input (kb () () )", "output (kbd ())"])
         # Add global settings (tap-time, hold-time)
         tap_time_cfg = getattr(self, "tap_time", None) or self.config.get(  # Renamed
             "tap_time", 200
@@ -444,13 +828,13 @@ class KanataTransformer:
         hold_time_cfg = getattr(self, "hold_time", None) or self.config.get(  # Renamed
             "hold_time", 250
         )
-        self.output.append(f"(defvar tap-time {tap_time_cfg})")
-        self.output.append(f"(defvar hold-time {hold_time_cfg})")
-        self.output.append("")
+        self.emitter.write_defvar("tap-time", tap_time_cfg)
+        self.emitter.write_defvar("hold-time", hold_time_cfg)
+        self.emitter.write_line()
 
-    def _transform_layer(self, layer: Layer) -> str:
+    def _layer_rows(self, layer: Layer) -> List[str]:
         """
-        Transform a single layer to Kanata format.
+        Render the body lines of a layer's deflayer block.
 
         Unsupported or malformed bindings are output as Kanata comments inline.
         """
@@ -458,11 +842,11 @@ class KanataTransformer:
             f"[KanataTransformer] Transforming layer: {layer.name} "
             f"with {len(layer.bindings)} bindings"
         )
-        lines = [f"(deflayer {layer.name}"]
+        lines: List[str] = []
         for idx, binding_obj in enumerate(layer.bindings):
             logging.debug(f"  Binding {idx}: {binding_obj}")
 
-            if type(binding_obj).__name__ == "UnicodeBinding":
+            if isinstance(binding_obj, (UnicodeBinding, FrozenUnicodeBinding)):
                 result_str = binding_obj.to_kanata()  # type: ignore
                 # UnicodeBinding.to_kanata() should return a correctly formatted Kanata string.
                 # It might be a comment or a Kanata action like (unicode "X").
@@ -507,12 +891,12 @@ class KanataTransformer:
                     )
                     lines.append(f"  @{alias_name}")
                     logging.debug(
-                        f"[DEBUG] _transform_layer: emitted hold-tap alias: @{alias_name}"
+                        f"[DEBUG] _layer_rows: emitted hold-tap alias: @{alias_name}"
                     )
                     continue # Binding handled
 
             # General binding transformation
-            result_obj = self._transform_binding(binding_obj)
+            result_obj = self._render_binding(binding_obj)
 
             if "\n" in result_obj:  # It's a pre-formatted multi-line string
                 # Split it and add lines, assuming they are correctly formatted
@@ -527,9 +911,40 @@ class KanataTransformer:
                     lines.append(result_stripped)  # Add unindented comment
                 else:
                     lines.append(f"  {result_obj}")  # Indent normal bindings
-            
-        lines.append(")")
-        return "\n".join(lines)
+
+        return lines
+
+    def cache_stats(self) -> CacheStats:
+        """Return binding cache hit/miss counters for the last transform."""
+        return self.binding_cache.stats()
+
+    def _render_binding(self, binding: Binding) -> str:
+        """Transform a binding, reusing the rendering of an identical one.
+
+        Errors recorded while rendering are stored with the cached fragment
+        and recorded again on every hit, so the summary and diagnostics do
+        not depend on the cache.
+        """
+        key = self.binding_cache.key(binding)
+        if key is None:
+            return self._transform_binding(binding)
+        cached = self.binding_cache.get(key)
+        if cached is not None:
+            for record in cached.records:
+                self._record_error(*record)
+            return cached.fragment
+
+        outer_capture = self._record_capture
+        records: List[tuple] = []
+        self._record_capture = records
+        try:
+            fragment = self._transform_binding(binding)
+        finally:
+            self._record_capture = outer_capture
+            if outer_capture is not None:
+                outer_capture.extend(records)
+        self.binding_cache.put(key, fragment, records)
+        return fragment
 
     def _transform_binding(self, binding: Binding) -> str:
         """
@@ -558,7 +973,7 @@ class KanataTransformer:
         elif (
             getattr(binding, "behavior", None) is None
             and hasattr(binding, "params")
-            and isinstance(binding.params, list)
+            and isinstance(binding.params, (list, tuple))
             and len(binding.params) == 1
             and binding.params[0] in ("&bootloader", "&reset")
         ):
@@ -572,7 +987,7 @@ class KanataTransformer:
             if behavior_type == "macro" or (
                 macro_name and macro_name in self.macro_definitions
             ):
-                return f"(macro {macro_name})"
+                return f"(macro {self.macro_aliases.get(macro_name, macro_name)})"
 
         # Map ZMK transparent/none to Kanata '_'
         if behavior_type in (
@@ -586,26 +1001,22 @@ class KanataTransformer:
         if behavior_type == "zmk,behavior-key-repeat":
             return "rpt"
 
-        # Handle Unicode behavior
+        # Handle Unicode behavior. Behaviors with a known code point are
+        # resolved to UnicodeBinding by the extractor, so only unresolved
+        # ones reach this point.
         if behavior_type == "zmk,behavior-unicode":
             unicode_char_name = None
             if binding.behavior:
                 unicode_char_name = getattr(binding.behavior, "name", None)
 
             if unicode_char_name:
-                if unicode_char_name == "uni_pi":
-                    # On macOS, Kanata uses (unicode "char").
-                    # Other platforms might differ or lack support.
-                    # Simulating macOS output for the test.
-                    return '(unicode "π")'
-                else:
-                    return self._format_binding_comment(
-                        "",
-                        (
-                            f"; TODO: Unicode behavior '{unicode_char_name}' "
-                            "needs manual mapping"
-                        ),
-                    )
+                return self._format_binding_comment(
+                    "",
+                    (
+                        f"; TODO: Unicode behavior '{unicode_char_name}' "
+                        "needs manual mapping"
+                    ),
+                )
             else:
                 return self._format_binding_comment(
                     "", "; TODO: Nameless Unicode behavior found"
@@ -746,7 +1157,7 @@ class KanataTransformer:
                 output_lines.append("  ; that may not be fully represented.")
                 output_lines.append(f"  ; See ZMK ({zmk_doc_url})")
                 output_lines.append(f"  ; vs Kanata ({kanata_doc_url}) docs.")
-                return "\\n".join(output_lines)
+                return "\n".join(output_lines)
             else:
                 return base_kanata_output  # No TODO for simple tap-dances
 
@@ -828,8 +1239,7 @@ class KanataTransformer:
             comment_str = self._format_binding_comment(
                 "", f"; {error_msg_text}"
             )  # Renamed
-            if error_msg_text not in self.error_messages:
-                self.error_messages.append(error_msg_text)
+            self._record_error(error_msg_text, "binding-error", ErrorSeverity.ERROR)
             return comment_str
         # --- END: Error binding handling ---
 
@@ -840,13 +1250,10 @@ class KanataTransformer:
 
             if isinstance(mapped_val, str) and mapped_val.startswith("ERROR:"):
                 comment_str = self._format_binding_comment("", f"; {mapped_val}")
-                if mapped_val not in self.error_messages:
-                    self.error_messages.append(mapped_val)
+                self._record_error(mapped_val, "binding-error", ErrorSeverity.ERROR)
                 return comment_str
             
             # Check for untransformed but potentially malformed/incomplete macros
-            # MODIFIER_MACROS is like [("LSHIFT(%s)", "ls(%s)"), ...]
-            # We need the ZMK prefixes like "LSHIFT", "LCTL"
             # This is a simplified check. A full parser for these would be better.
             is_potentially_malformed = False
             if mapped_val == param_str_val: # No specific Kanata mapping found by _to_kanata_symbolic
@@ -865,54 +1272,22 @@ class KanataTransformer:
                 # Case 4: Specific known pattern like "LS LA(A)" (space means not a single macro)
                 elif re.match(r"^[A-Z0-9_]+\s+[A-Z0-9_]+\(.+\)$", param_str_val):
                     is_potentially_malformed = True
+                # Case 5: modifier macro with a space before the parenthesis,
+                # e.g. "LS (A)"
+                elif param_str_val.strip().startswith(_MACRO_OPENERS):
+                    is_potentially_malformed = True
 
             if is_potentially_malformed:
                 error_msg = f"ERROR: malformed or incomplete macro: {param_str_val}"
                 comment_str = self._format_binding_comment(  # Renamed
                     "", f"; {error_msg}"
                 )
-                if error_msg not in self.error_messages:
-                    self.error_messages.append(error_msg)
+                self._record_error(error_msg, "malformed-macro", ErrorSeverity.ERROR)
                 return comment_str
             
             if mapped_val is not None: # If not an error and not malformed, and there is a value
                 return mapped_val
             
-            # Fallback for unmapped macros that were not caught as malformed above
-            # This regex was for things like "LS (" with space, or other oddities
-            # MODIFIER_MACROS is imported at the top
-            macro_prefixes = [
-                p.split("\\\\")[0][2:-3]  # Corrected regex escape
-                for p, _ in MODIFIER_MACROS
-                if p and len(p.split("\\\\")) > 0 and len(p) > 5  # Corrected
-            ]
-            if macro_prefixes:
-                try:
-                    # Ensure regex is valid by escaping prefixes if they contain special chars
-                    safe_prefixes = [re.escape(p) for p in macro_prefixes]
-                    macro_regex_str = rf"^({'|'.join(safe_prefixes)})\\s*\\("
-                    macro_regex = re.compile(macro_regex_str)
-                    if macro_regex.match(param_str_val.strip()):
-                        error_msg = (
-                            f"ERROR: malformed or unknown macro: {param_str_val}"
-                        )
-                        comment_str = self._format_binding_comment(  # Renamed
-                            "", f"; {error_msg}"
-                        )
-                        if error_msg not in self.error_messages:
-                            self.error_messages.append(error_msg)
-                        return comment_str
-                except re.error:
-                    error_msg = (
-                        f"ERROR: malformed or unknown macro (regex error): "
-                        f"{param_str_val}"
-                    )
-                    comment_str = self._format_binding_comment(  # Renamed
-                        "", f"; {error_msg}"
-                    )
-                    if error_msg not in self.error_messages:
-                        self.error_messages.append(error_msg)
-                    return comment_str
             return param_str_val  # Return original param if no mapping/error
 
         # Final fallback for truly unknown bindings
@@ -982,7 +1357,7 @@ class KanataTransformer:
             truncated_comment_str = comment  # Renamed
             if len(comment) > comment_max_len:
                 truncated_comment_str = comment[: comment_max_len - 3] + "..."
-            return f"{binding_str}\\n{indent_str}{truncated_comment_str.strip()}"
+            return f"{binding_str}\n{indent_str}{truncated_comment_str.strip()}"
         else:
             # Comment is on the first line (binding_str was empty)
             # This path should ideally not be taken if comment was single line
@@ -993,6 +1368,21 @@ class KanataTransformer:
                 truncated_comment_str = comment[: comment_max_len - 3] + "..."
             return f"{indent_str}{truncated_comment_str.strip()}"
 
+    def _holdtap_timeouts(self, behavior) -> tuple[int, int]:
+        """Return the (tap, hold) timeouts of a hold-tap alias.
+
+        A behavior without tapping-term-ms or hold-time-ms leaves them
+        None; Kanata needs both, so fall back to the configured tapping
+        term and to the tap timeout, like HoldTapTransformer does.
+        """
+        tap_time = getattr(behavior, "tapping_term_ms", None)
+        if tap_time is None:
+            tap_time = self.config["tapping_term_ms"]
+        hold_time = getattr(behavior, "hold_time_ms", None)
+        if hold_time is None:
+            hold_time = tap_time
+        return tap_time, hold_time
+
     def _holdtap_alias_name(self, behavior_type, hold_param, tap_param):
         """Generate a consistent alias name for hold-tap behaviors."""
         hold = self._to_kanata_symbolic(hold_param, for_alias_name=True)
@@ -1,16 +1,18 @@
 import logging
-from typing import Any
+from typing import Any, Optional
 
 from converter.behaviors.key_sequence import KeySequenceBinding
-from converter.error_handling import ErrorSeverity, get_error_manager
+from converter.error_handling import ErrorManager, ErrorSeverity, get_error_manager
 
 
 class KeySequenceTransformer:
     """Transformer for ZMK key sequence behaviors to Kanata format."""
 
-    def __init__(self):
+    def __init__(self, error_manager: Optional[ErrorManager] = None):
         self.logger = logging.getLogger(__name__)
-        self.error_manager = get_error_manager()
+        self.error_manager = (
+            error_manager if error_manager is not None else get_error_manager()
+        )
 
     def transform_binding(self, binding: Any) -> str:
         """
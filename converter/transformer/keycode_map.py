@@ -4,339 +4,193 @@ Handles symbolic names, numeric codes, and recursive modifier macros.
 """
 
 import re
+from collections import namedtuple
+from functools import lru_cache
 from typing import Optional
 
-# Main mapping table: ZMK symbolic name -> Kanata name
-ZMK_TO_KANATA = {
-    # Letters
-    "A": "a",
-    "B": "b",
-    "C": "c",
-    "D": "d",
-    "E": "e",
-    "F": "f",
-    "G": "g",
-    "H": "h",
-    "I": "i",
-    "J": "j",
-    "K": "k",
-    "L": "l",
-    "M": "m",
-    "N": "n",
-    "O": "o",
-    "P": "p",
-    "Q": "q",
-    "R": "r",
-    "S": "s",
-    "T": "t",
-    "U": "u",
-    "V": "v",
-    "W": "w",
-    "X": "x",
-    "Y": "y",
-    "Z": "z",
-    # Numbers
-    "N0": "0",
-    "N1": "1",
-    "N2": "2",
-    "N3": "3",
-    "N4": "4",
-    "N5": "5",
-    "N6": "6",
-    "N7": "7",
-    "N8": "8",
-    "N9": "9",
-    # Function keys
-    "F1": "f1",
-    "F2": "f2",
-    "F3": "f3",
-    "F4": "f4",
-    "F5": "f5",
-    "F6": "f6",
-    "F7": "f7",
-    "F8": "f8",
-    "F9": "f9",
-    "F10": "f10",
-    "F11": "f11",
-    "F12": "f12",
-    # Navigation
-    "LEFT": "left",
-    "RIGHT": "right",
-    "UP": "up",
-    "DOWN": "down",
-    "HOME": "home",
-    "END": "end",
-    "PG_UP": "pg_up",
-    "PG_DN": "pg_dn",
-    # Editing
-    "ENTER": "ret",
-    "RET": "ret",
-    "ESC": "esc",
-    "BSPC": "bspc",
-    "DEL": "del",
-    "TAB": "tab",
-    "SPACE": "spc",
-    "SPC": "spc",
-    "CAPS": "caps",
-    # Modifiers
-    "LSHIFT": "lsft",
-    "RSHIFT": "rsft",
-    "LCTRL": "lctl",
-    "RCTRL": "rctl",
-    "LALT": "lalt",
-    "RALT": "ralt",
-    "LGUI": "lmet",
-    "RGUI": "rmet",
-    # Punctuation
-    "GRAVE": "grv",
-    "MINUS": "minus",
-    "EQUAL": "equal",
-    "LBKT": "lbrc",
-    "RBKT": "rbrc",
-    "BSLH": "bslh",
-    "SEMI": "semi",
-    "APOS": "apos",
-    "COMMA": "comma",
-    "DOT": "dot",
-    "FSLH": "fslh",
-    # Symbols
-    "EXCL": "excl",
-    "AT": "at",
-    "HASH": "hash",
-    "DLLR": "dollar",
-    "PRCNT": "percent",
-    "CARET": "caret",
-    "AMPS": "amp",
-    "STAR": "astrk",
-    "LPAR": "lpar",
-    "RPAR": "rpar",
-    "UNDER": "under",
-    "PLUS": "plus",
-    "PIPE": "pipe",
-    "TILDE": "tilde",
-    # Numpad
-    "KP_N0": "kp0",
-    "KP_N1": "kp1",
-    "KP_N2": "kp2",
-    "KP_N3": "kp3",
-    "KP_N4": "kp4",
-    "KP_N5": "kp5",
-    "KP_N6": "kp6",
-    "KP_N7": "kp7",
-    "KP_N8": "kp8",
-    "KP_N9": "kp9",
-    "KP_DOT": "kp_dot",
-    "KP_PLUS": "kp_plus",
-    "KP_MINUS": "kp_minus",
-    "KP_MULTIPLY": "kp_multiply",
-    "KP_DIVIDE": "kp_divide",
-    "KP_ENTER": "kp_enter",
-    # Media
-    "C_MUTE": "c_mute",
-    "C_VOL_UP": "c_vol_up",
-    "C_VOL_DN": "c_vol_dn",
-    "C_PP": "c_pp",
-    "C_NEXT": "c_next",
-    "C_PREV": "c_prev",
-    # Special
-    "PSCRN": "prnt",
-    "SLCK": "slck",
-    "PAUSE": "pause",
-    "INS": "ins",
-    "MENU": "menu",
-    # ZMK-specific/extra
-    "SQT": "sqt",
-    "DQT": "dqt",
-    "LBRC": "lbrc",
-    "RBRC": "rbrc",
-    "LPRN": "lpar",
-    "RPRN": "rpar",
-    "COLON": "colon",
-    "ATSN": "atsn",
-    "SLASH": "fslh",
-    # Add synonyms
-    "LSHFT": "lsft",
-    "RSHFT": "rsft",
+# Key tables live in keycode_registry; re-exported here for existing importers
+from .keycode_registry import (
+    NUMERIC_TO_SYMBOLIC,
+    REVERSE_KEY_MAP,
+    ZMK_TO_KANATA,
+)
+
+# Modifier functions: ZMK prefix -> Kanata prefix
+MODIFIER_FUNCTIONS = {
+    "LS": "ls",
+    "LA": "la",
+    "LG": "lg",
+    "RC": "rc",
+    "RS": "rs",
+    "RA": "ra",
+    "RG": "rg",
+    "LC": "lc",
 }
 
 # Modifier macro patterns
 MODIFIER_MACROS = [
-    (r"^LS\((.+)\)$", "ls"),
-    (r"^LA\((.+)\)$", "la"),
-    (r"^LG\((.+)\)$", "lg"),
-    (r"^RC\((.+)\)$", "rc"),
-    (r"^RS\((.+)\)$", "rs"),
-    (r"^RA\((.+)\)$", "ra"),
-    (r"^RG\((.+)\)$", "rg"),
-    (r"^LC\((.+)\)$", "lc"),
+    (rf"^{prefix}\((.+)\)$", kanata_mod)
+    for prefix, kanata_mod in MODIFIER_FUNCTIONS.items()
 ]
 
-# Add numeric HID usage codes for standard keys (based on ZMK/QMK HID usage tables)
-NUMERIC_TO_SYMBOLIC = {
-    # Letters
-    "4": "A",
-    "5": "B",
-    "6": "C",
-    "7": "D",
-    "8": "E",
-    "9": "F",
-    "10": "G",
-    "11": "H",
-    "12": "I",
-    "13": "J",
-    "14": "K",
-    "15": "L",
-    "16": "M",
-    "17": "N",
-    "18": "O",
-    "19": "P",
-    "20": "Q",
-    "21": "R",
-    "22": "S",
-    "23": "T",
-    "24": "U",
-    "25": "V",
-    "26": "W",
-    "27": "X",
-    "28": "Y",
-    "29": "Z",
-    # Numbers
-    "30": "N1",
-    "31": "N2",
-    "32": "N3",
-    "33": "N4",
-    "34": "N5",
-    "35": "N6",
-    "36": "N7",
-    "37": "N8",
-    "38": "N9",
-    "39": "N0",
-    # Enter, Escape, Backspace, Tab, Space
-    "40": "ENTER",
-    "41": "ESC",
-    "42": "BSPC",
-    "43": "TAB",
-    "44": "SPACE",
-    # Punctuation
-    "45": "MINUS",
-    "46": "EQUAL",
-    "47": "LBKT",
-    "48": "RBKT",
-    "49": "BSLH",
-    "51": "SEMI",
-    "52": "APOS",
-    "53": "GRAVE",
-    "54": "COMMA",
-    "55": "DOT",
-    "56": "FSLH",
-    # Caps Lock
-    "57": "CAPS",
-    # Function keys
-    "58": "F1",
-    "59": "F2",
-    "60": "F3",
-    "61": "F4",
-    "62": "F5",
-    "63": "F6",
-    "64": "F7",
-    "65": "F8",
-    "66": "F9",
-    "67": "F10",
-    "68": "F11",
-    "69": "F12",
-    # Print, Scroll, Pause
-    "70": "PSCRN",
-    "71": "SLCK",
-    "72": "PAUSE",
-    # Insert, Home, Page Up, Delete, End, Page Down
-    "73": "INS",
-    "74": "HOME",
-    "75": "PG_UP",
-    "76": "DEL",
-    "77": "END",
-    "78": "PG_DN",
-    # Arrows
-    "79": "RIGHT",
-    "80": "LEFT",
-    "81": "DOWN",
-    "82": "UP",
-    # Numpad
-    "83": "NUMLOCK",
-    "84": "KP_SLASH",
-    "85": "KP_ASTERISK",
-    "86": "KP_MINUS",
-    "87": "KP_PLUS",
-    "88": "KP_ENTER",
-    "89": "KP_N1",
-    "90": "KP_N2",
-    "91": "KP_N3",
-    "92": "KP_N4",
-    "93": "KP_N5",
-    "94": "KP_N6",
-    "95": "KP_N7",
-    "96": "KP_N8",
-    "97": "KP_N9",
-    "98": "KP_N0",
-    "99": "KP_DOT",
-    # Modifiers
-    "224": "LCTRL",
-    "225": "LSHIFT",
-    "226": "LALT",
-    "227": "LGUI",
-    "228": "RCTRL",
-    "229": "RSHIFT",
-    "230": "RALT",
-    "231": "RGUI",
-}
+# ZMK's numeric encoding packs modifiers into the top byte of a keycode
+# (bits as in dt-bindings/zmk/modifiers.h), lowest bit wrapped innermost.
+MODIFIER_BITS = (
+    (0x01, "lc"),
+    (0x02, "ls"),
+    (0x04, "la"),
+    (0x08, "lg"),
+    (0x10, "rc"),
+    (0x20, "rs"),
+    (0x40, "ra"),
+    (0x80, "rg"),
+)
+HID_USAGE_KEY = 0x07
+
+ModifierExpression = namedtuple("ModifierExpression", ["modifiers", "key"])
+"""A parsed modifier expression, e.g. LS(LC(A)) -> (("ls", "lc"), "A")."""
+
+_TRIE_END = ""
+
+
+def _build_prefix_trie(words):
+    """Build a character trie mapping each word to its value."""
+    root = {}
+    for word, value in words.items():
+        node = root
+        for char in word:
+            node = node.setdefault(char, {})
+        node[_TRIE_END] = value
+    return root
+
+
+_MODIFIER_TRIE = _build_prefix_trie(MODIFIER_FUNCTIONS)
+_MACRO_OPENERS = tuple(f"{prefix}(" for prefix in MODIFIER_FUNCTIONS) + tuple(
+    f"{prefix} (" for prefix in MODIFIER_FUNCTIONS
+)
+_NUMERIC_RE = re.compile(r"^(0x[0-9A-Fa-f]+|\d+)$")
+_UNKNOWN_MACRO_RE = re.compile(r"^[A-Z]{2,}\(.*\)$")
+
+
+def _match_modifier(text: str, pos: int):
+    """Match a modifier prefix followed by '(' at pos.
+
+    Returns:
+        (kanata modifier, index of the '(') or None
+    """
+    node = _MODIFIER_TRIE
+    match = None
+    while pos < len(text):
+        node = node.get(text[pos])
+        if node is None:
+            break
+        pos += 1
+        if _TRIE_END in node and pos < len(text) and text[pos] == "(":
+            match = (node[_TRIE_END], pos)
+    return match
+
 
-# Update ZMK_TO_KANATA to include numeric keys for all mapped symbolic keys
-for num, sym in NUMERIC_TO_SYMBOLIC.items():
-    if sym in ZMK_TO_KANATA:
-        ZMK_TO_KANATA[num] = ZMK_TO_KANATA[sym]
+def _skip_spaces(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
 
-# Reverse mapping for numeric to symbolic
-REVERSE_KEY_MAP = {num: sym for num, sym in NUMERIC_TO_SYMBOLIC.items()}
 
+@lru_cache(maxsize=1024)
+def parse_modifier_expression(expr: str) -> Optional[ModifierExpression]:
+    """Parse a (possibly nested) ZMK modifier expression in one pass.
 
+    Args:
+        expr: Expression such as 'LS(A)' or 'LS(LC(A))'
+
+    Returns:
+        The modifiers (outermost first) and the inner key, or None if expr
+        does not start with a modifier function
+
+    Raises:
+        ValueError: If expr starts with a modifier function but is malformed
+    """
+    modifiers = []
+    pos = 0
+    while True:
+        match = _match_modifier(expr, _skip_spaces(expr, pos))
+        if match is None:
+            break
+        kanata_mod, paren = match
+        modifiers.append(kanata_mod)
+        pos = paren + 1
+    if not modifiers:
+        return None
+
+    end = expr.find(")", pos)
+    key = expr[pos:end].strip() if end != -1 else ""
+    if not key or "(" in key:
+        raise ValueError(f"malformed modifier expression: {expr}")
+    pos = end
+    for _ in modifiers:
+        pos = _skip_spaces(expr, pos)
+        if pos >= len(expr) or expr[pos] != ")":
+            raise ValueError(f"malformed modifier expression: {expr}")
+        pos += 1
+    if pos != len(expr):
+        raise ValueError(f"malformed modifier expression: {expr}")
+    return ModifierExpression(tuple(modifiers), key)
+
+
+def _wrap_modifiers(modifiers, kanata_key: str) -> str:
+    """Wrap a Kanata key in modifiers given outermost first."""
+    for kanata_mod in reversed(modifiers):
+        kanata_key = f"{kanata_mod}({kanata_key})"
+    return kanata_key
+
+
+def _numeric_to_kanata(key: str) -> str:
+    """Map a decimal or hex keycode, decoding ZMK's packed modifier bits."""
+    # Try to map numeric to symbolic, then to Kanata
+    sym = REVERSE_KEY_MAP.get(key)
+    if sym and sym in ZMK_TO_KANATA:
+        return ZMK_TO_KANATA[sym]
+    value = int(key, 16) if key.startswith("0x") else int(key)
+    mods = value >> 24
+    page = (value >> 16) & 0xFF
+    usage = value & 0xFFFF
+    if mods <= 0xFF and page in (0, HID_USAGE_KEY):
+        mapped = ZMK_TO_KANATA.get(NUMERIC_TO_SYMBOLIC.get(str(usage), ""))
+        if mapped is not None:
+            return _wrap_modifiers(
+                [m for bit, m in reversed(MODIFIER_BITS) if mods & bit], mapped
+            )
+    return f"; TODO: Unknown numeric keycode: {key}"
+
+
+@lru_cache(maxsize=4096)
 def zmk_to_kanata(key: str) -> Optional[str]:
     """
     Convert a ZMK key name, numeric code, or modifier macro to Kanata equivalent.
-    Handles nested modifier macros recursively.
+    Handles nested modifier macros and ZMK's numeric modifier encoding.
     """
     key = key.strip()
     # Direct mapping
     if key in ZMK_TO_KANATA:
         return ZMK_TO_KANATA[key]
     # Numeric code (decimal or hex)
-    if re.match(r"^(0x[0-9A-Fa-f]+|\d+)$", key):
-        # Try to map numeric to symbolic, then to Kanata
-        sym = REVERSE_KEY_MAP.get(key)
-        if sym and sym in ZMK_TO_KANATA:
-            return ZMK_TO_KANATA[sym]
-        return f"; TODO: Unknown numeric keycode: {key}"
+    if _NUMERIC_RE.match(key):
+        return _numeric_to_kanata(key)
     # Modifier macro (possibly nested)
-    for pattern, kanata_mod in MODIFIER_MACROS:
-        m = re.match(pattern, key)
-        if m:
-            inner = m.group(1).strip()
-            if not inner:
-                return f"ERROR: malformed or unknown macro: {key}"
-            inner_mapped = zmk_to_kanata(inner)
-            if inner_mapped and not inner_mapped.startswith("ERROR:"):
-                return f"{kanata_mod}({inner_mapped})"
-            else:
-                return f"ERROR: malformed or unknown macro: {key}"
+    try:
+        expr = parse_modifier_expression(key)
+    except ValueError:
+        return f"ERROR: malformed or unknown macro: {key}"
+    if expr is not None:
+        inner_mapped = zmk_to_kanata(expr.key)
+        if inner_mapped and not inner_mapped.startswith("ERROR:"):
+            return _wrap_modifiers(expr.modifiers, inner_mapped)
+        return f"ERROR: malformed or unknown macro: {key}"
     # If it looks like a macro but is not supported, emit error
-    if re.match(r"^[A-Z]{2,}\(.*\)$", key):
+    if _UNKNOWN_MACRO_RE.match(key):
         return f"ERROR: malformed or unknown macro: {key}"
     # If it starts with a known macro prefix and contains '(', but does not end with ')', emit error
-    macro_prefixes = [
-        p.split("\\")[0][2:-3] for p, _ in MODIFIER_MACROS
-    ]  # e.g., 'LS', 'LA', ...
-    if any(
-        key.startswith(f"{prefix}(") or key.startswith(f"{prefix} (")
-        for prefix in macro_prefixes
-    ):
+    if key.startswith(_MACRO_OPENERS):
         if "(" in key and not key.rstrip().endswith(")"):
             return f"ERROR: malformed or unknown macro: {key}"
     # Fallback: unmapped
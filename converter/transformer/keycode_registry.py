@@ -0,0 +1,228 @@
+"""Keycode Registry Module.
+
+Single source of truth for keycodes used by every conversion stage: the HID
+keyboard usage table with ZMK names and aliases, the Kanata name of each key,
+and the numeric and reverse lookups derived from it.
+
+All tables are built once at import time and exposed as read-only
+MappingProxyType views, so every lookup is a single dict access and no
+consumer can modify the shared tables.
+"""
+
+from types import MappingProxyType
+from typing import Dict, Optional, Tuple
+
+# HID keyboard page usages: (usage id, Kanata name, ZMK names). The first ZMK
+# name is the canonical one used by the reverse maps. The table covers every
+# usage ZMK names on the page; keys Kanata has no name for have None and only
+# appear in the usage lookups.
+_HID_KEYBOARD_USAGES: Tuple[Tuple[int, Optional[str], Tuple[str, ...]], ...] = (
+    *(
+        (0x04 + i, c.lower(), (c,))
+        for i, c in enumerate("ABCDEFGHIJKLMNOPQRSTUVWXYZ")
+    ),
+    *(
+        (0x1E + i, str(d), (f"N{d}", f"NUMBER_{d}"))
+        for i, d in enumerate((1, 2, 3, 4, 5, 6, 7, 8, 9, 0))
+    ),
+    (0x28, "ret", ("ENTER", "RET", "RETURN")),
+    (0x29, "esc", ("ESC", "ESCAPE")),
+    (0x2A, "bspc", ("BSPC", "BACKSPACE")),
+    (0x2B, "tab", ("TAB",)),
+    (0x2C, "spc", ("SPACE", "SPC")),
+    (0x2D, "minus", ("MINUS",)),
+    (0x2E, "equal", ("EQUAL",)),
+    (0x2F, "lbrc", ("LBKT", "LEFT_BRACKET", "LBRC")),
+    (0x30, "rbrc", ("RBKT", "RIGHT_BRACKET", "RBRC")),
+    (0x31, "bslh", ("BSLH", "BACKSLASH")),
+    (0x32, None, ("NON_US_HASH", "NUHS")),
+    (0x33, "semi", ("SEMI", "SEMICOLON")),
+    (0x34, "apos", ("APOS", "APOSTROPHE")),
+    (0x35, "grv", ("GRAVE",)),
+    (0x36, "comma", ("COMMA",)),
+    (0x37, "dot", ("DOT", "PERIOD")),
+    (0x38, "fslh", ("FSLH", "SLASH")),
+    (0x39, "caps", ("CAPS", "CAPSLOCK")),
+    *((0x3A + i, f"f{i + 1}", (f"F{i + 1}",)) for i in range(12)),
+    (0x46, "prnt", ("PSCRN", "PRINTSCREEN")),
+    (0x47, "slck", ("SLCK", "SCROLLLOCK")),
+    (0x48, "pause", ("PAUSE", "PAUSE_BREAK")),
+    (0x49, "ins", ("INS", "INSERT")),
+    (0x4A, "home", ("HOME",)),
+    (0x4B, "pg_up", ("PG_UP", "PAGE_UP")),
+    (0x4C, "del", ("DEL", "DELETE")),
+    (0x4D, "end", ("END",)),
+    (0x4E, "pg_dn", ("PG_DN", "PAGE_DOWN")),
+    (0x4F, "right", ("RIGHT",)),
+    (0x50, "left", ("LEFT",)),
+    (0x51, "down", ("DOWN",)),
+    (0x52, "up", ("UP",)),
+    (0x53, "nlck", ("NUMLOCK", "KP_NUMLOCK")),
+    (0x54, "kp_divide", ("KP_SLASH", "KP_DIVIDE")),
+    (0x55, "kp_multiply", ("KP_ASTERISK", "KP_MULTIPLY")),
+    (0x56, "kp_minus", ("KP_MINUS",)),
+    (0x57, "kp_plus", ("KP_PLUS",)),
+    (0x58, "kp_enter", ("KP_ENTER",)),
+    *((0x59 + i, f"kp{i + 1}", (f"KP_N{i + 1}",)) for i in range(9)),
+    (0x62, "kp0", ("KP_N0",)),
+    (0x63, "kp_dot", ("KP_DOT",)),
+    (0x64, "nubs", ("NON_US_BACKSLASH", "NON_US_BSLH", "NUBS")),
+    (0x65, "comp", ("K_APPLICATION", "K_APP", "K_CONTEXT_MENU", "K_CMENU")),
+    (0x66, None, ("K_POWER", "K_PWR")),
+    (0x67, "kp=", ("KP_EQUAL",)),
+    *((0x68 + i, f"f{i + 13}", (f"F{i + 13}",)) for i in range(12)),
+    (0x74, None, ("K_EXECUTE", "K_EXEC")),
+    (0x75, None, ("K_HELP",)),
+    (0x76, None, ("K_MENU",)),
+    (0x77, None, ("K_SELECT",)),
+    (0x78, None, ("K_STOP",)),
+    (0x79, None, ("K_AGAIN", "K_REDO")),
+    (0x7A, None, ("K_UNDO",)),
+    (0x7B, None, ("K_CUT",)),
+    (0x7C, None, ("K_COPY",)),
+    (0x7D, None, ("K_PASTE",)),
+    (0x7E, None, ("K_FIND",)),
+    (0x7F, "mute", ("K_MUTE",)),
+    (0x80, "volu", ("K_VOLUME_UP", "K_VOL_UP")),
+    (0x81, "voldwn", ("K_VOLUME_DOWN", "K_VOL_DN")),
+    (0x82, None, ("LOCKING_CAPS", "LCAPS")),
+    (0x83, None, ("LOCKING_NUM", "LNLCK")),
+    (0x84, None, ("LOCKING_SCROLL", "LSLCK")),
+    (0x85, None, ("KP_COMMA",)),
+    (0x86, None, ("KP_EQUAL_AS400",)),
+    (0x87, None, ("INTERNATIONAL_1", "INT1", "INT_RO")),
+    (0x88, None, ("INTERNATIONAL_2", "INT2", "INT_KATAKANAHIRAGANA", "INT_KANA")),
+    (0x89, None, ("INTERNATIONAL_3", "INT3", "INT_YEN")),
+    (0x8A, None, ("INTERNATIONAL_4", "INT4", "INT_HENKAN")),
+    (0x8B, None, ("INTERNATIONAL_5", "INT5", "INT_MUHENKAN")),
+    (0x8C, None, ("INTERNATIONAL_6", "INT6", "INT_KPJPCOMMA")),
+    *((0x8D + i, None, (f"INTERNATIONAL_{i + 7}", f"INT{i + 7}")) for i in range(3)),
+    (0x90, None, ("LANGUAGE_1", "LANG1", "LANG_HANGEUL")),
+    (0x91, None, ("LANGUAGE_2", "LANG2", "LANG_HANJA")),
+    (0x92, None, ("LANGUAGE_3", "LANG3", "LANG_KATAKANA")),
+    (0x93, None, ("LANGUAGE_4", "LANG4", "LANG_HIRAGANA")),
+    (0x94, None, ("LANGUAGE_5", "LANG5", "LANG_ZENKAKUHANKAKU")),
+    *((0x95 + i, None, (f"LANGUAGE_{i + 6}", f"LANG{i + 6}")) for i in range(4)),
+    (0x99, None, ("ALT_ERASE",)),
+    (0x9A, "sysrq", ("SYSREQ", "ATTENTION")),
+    (0x9B, None, ("K_CANCEL",)),
+    (0x9C, None, ("CLEAR",)),
+    (0x9D, None, ("PRIOR",)),
+    (0x9E, None, ("RETURN2", "RET2")),
+    (0x9F, None, ("SEPARATOR",)),
+    (0xA0, None, ("OUT",)),
+    (0xA1, None, ("OPER",)),
+    (0xA2, None, ("CLEAR_AGAIN",)),
+    (0xA3, None, ("CRSEL",)),
+    (0xA4, None, ("EXSEL",)),
+    (0xB6, None, ("KP_LEFT_PARENTHESIS", "KP_LPAR")),
+    (0xB7, None, ("KP_RIGHT_PARENTHESIS", "KP_RPAR")),
+    (0xD8, None, ("KP_CLEAR",)),
+    (0xE0, "lctl", ("LCTRL", "LEFT_CONTROL", "LCTL")),
+    (0xE1, "lsft", ("LSHIFT", "LEFT_SHIFT", "LSHFT", "LSFT")),
+    (0xE2, "lalt", ("LALT", "LEFT_ALT")),
+    (0xE3, "lmet", ("LGUI", "LEFT_GUI", "LWIN", "LCMD", "LMETA")),
+    (0xE4, "rctl", ("RCTRL", "RIGHT_CONTROL", "RCTL")),
+    (0xE5, "rsft", ("RSHIFT", "RIGHT_SHIFT", "RSHFT", "RSFT")),
+    (0xE6, "ralt", ("RALT", "RIGHT_ALT")),
+    (0xE7, "rmet", ("RGUI", "RIGHT_GUI", "RWIN", "RCMD", "RMETA")),
+)
+
+# ZMK names without a plain HID keyboard usage (shifted symbols, consumer
+# keys) or with their own Kanata spelling.
+_EXTRA_KEYS: Dict[str, str] = {
+    # Symbols
+    "EXCL": "excl",
+    "AT": "at",
+    "HASH": "hash",
+    "DLLR": "dollar",
+    "PRCNT": "percent",
+    "CARET": "caret",
+    "AMPS": "amp",
+    "STAR": "astrk",
+    "LPAR": "lpar",
+    "RPAR": "rpar",
+    "LPRN": "lpar",
+    "RPRN": "rpar",
+    "UNDER": "under",
+    "PLUS": "plus",
+    "PIPE": "pipe",
+    "TILDE": "tilde",
+    "COLON": "colon",
+    "SQT": "sqt",
+    "DQT": "dqt",
+    "ATSN": "atsn",
+    "MENU": "menu",
+    # Media
+    "C_MUTE": "c_mute",
+    "C_VOL_UP": "c_vol_up",
+    "C_VOL_DN": "c_vol_dn",
+    "C_PP": "c_pp",
+    "C_NEXT": "c_next",
+    "C_PREV": "c_prev",
+}
+
+
+def _build():
+    """Build the read-only lookup tables from the usage table."""
+    zmk_to_kanata: Dict[str, str] = {}
+    zmk_to_usage: Dict[str, int] = {}
+    usage_to_zmk: Dict[int, str] = {}
+    numeric_to_symbolic: Dict[str, str] = {}
+    reverse_key_map: Dict[str, str] = {}
+    kanata_to_zmk: Dict[str, str] = {}
+    for usage, kanata, names in _HID_KEYBOARD_USAGES:
+        canonical = names[0]
+        usage_to_zmk[usage] = canonical
+        numeric_to_symbolic[str(usage)] = canonical
+        reverse_key_map[str(usage)] = canonical
+        reverse_key_map[f"0x{usage:02X}"] = canonical
+        for name in names:
+            zmk_to_usage[name] = usage
+        if kanata is None:
+            continue
+        kanata_to_zmk.setdefault(kanata, canonical)
+        for name in names:
+            zmk_to_kanata[name] = kanata
+    for name, kanata in _EXTRA_KEYS.items():
+        zmk_to_kanata[name] = kanata
+        kanata_to_zmk.setdefault(kanata, name)
+    # Decimal usage ids resolve directly, as the preprocessor may emit them
+    for num, sym in numeric_to_symbolic.items():
+        if sym in zmk_to_kanata:
+            zmk_to_kanata[num] = zmk_to_kanata[sym]
+    return (
+        MappingProxyType(zmk_to_kanata),
+        MappingProxyType(zmk_to_usage),
+        MappingProxyType(usage_to_zmk),
+        MappingProxyType(numeric_to_symbolic),
+        MappingProxyType(reverse_key_map),
+        MappingProxyType(kanata_to_zmk),
+    )
+
+
+(
+    ZMK_TO_KANATA,
+    ZMK_TO_USAGE,
+    USAGE_TO_ZMK,
+    NUMERIC_TO_SYMBOLIC,
+    REVERSE_KEY_MAP,
+    KANATA_TO_ZMK,
+) = _build()
+"""Read-only lookup tables.
+
+ZMK_TO_KANATA: ZMK name or alias (and decimal usage id) -> Kanata name, for
+    the keys Kanata has a name for
+ZMK_TO_USAGE: ZMK name or alias -> HID keyboard usage id
+USAGE_TO_ZMK: HID keyboard usage id -> canonical ZMK name
+NUMERIC_TO_SYMBOLIC: decimal usage id string -> canonical ZMK name
+REVERSE_KEY_MAP: decimal or '0xNN' usage id string -> canonical ZMK name
+KANATA_TO_ZMK: Kanata name -> first ZMK name mapping to it
+"""
+
+
+def usage_hex(zmk_name: str) -> Optional[str]:
+    """Return the '0xNN' HID usage code of a ZMK key name, or None."""
+    usage = ZMK_TO_USAGE.get(zmk_name)
+    return f"0x{usage:02X}" if usage is not None else None
+
@@ -0,0 +1,196 @@
+"""Output Optimization Module.
+
+This module contains optional passes over rendered layers that shrink the
+generated Kanata configuration without changing its behavior.
+
+hoist_repeated_actions() finds compound actions such as
+``(tap-dance 200 a b c)`` or ``(layer-while-held 3)`` that appear in several
+layer slots and moves each one into a generated defalias, so every slot
+references it as ``@name`` and Kanata parses the action only once.
+
+find_duplicate_layers() and rewrite_layer_refs() let a layer whose rendered
+body is identical to an earlier one be dropped, with layer actions pointing
+at it redirected to the earlier layer.
+"""
+
+import hashlib
+import re
+from collections import Counter, namedtuple
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+HoistedActions = namedtuple("HoistedActions", ["aliases", "layers"])
+"""(name, action) pairs to define and the rewritten rows of every layer."""
+
+# Generated names are at most this long before a disambiguating suffix
+_MAX_SLUG_LENGTH = 24
+_SLUG_TOKEN_RE = re.compile(r"[A-Za-z0-9]+")
+_NESTED_HEAD_RE = re.compile(r"\(([^\s()]+)")
+_LAYER_REF_RE = re.compile(
+    r"\((layer-switch|layer-while-held|layer-toggle) ([^\s()]+)\)"
+)
+
+
+def hoistable_action(row: str) -> Optional[str]:
+    """Return the action of a layer row if it can be moved into an alias.
+
+    Only single-line parenthesized actions without trailing comments are
+    hoisted; plain keys and @references are already as short as an alias.
+    """
+    action = row.strip()
+    if (
+        action.startswith("(")
+        and action.endswith(")")
+        and ";" not in action
+        and "\n" not in action
+    ):
+        return action
+    return None
+
+
+def count_actions(layers: Iterable[Sequence[str]]) -> Counter:
+    """Count the hoistable actions over the rows of all layers."""
+    counts: Counter = Counter()
+    for rows in layers:
+        for row in rows:
+            action = hoistable_action(row)
+            if action is not None:
+                counts[action] += 1
+    return counts
+
+
+def _initials(head: str) -> str:
+    """Return the initials of a hyphenated action name."""
+    return "".join(word[0] for word in head.split("-") if word[:1].isalnum())
+
+
+def _slug(action: str) -> str:
+    """Return a short name for an action: head initials, then its arguments.
+
+    ``(layer-while-held 3)`` becomes ``lwh_3`` and
+    ``(one-shot 500 (layer-while-held 1))`` becomes ``os_500_lwh_1``.
+    """
+    tokens = action.strip()[1:-1].split(None, 1)
+    if not tokens:
+        return ""
+    head = _initials(tokens[0])
+    args = []
+    if len(tokens) > 1:
+        nested = _NESTED_HEAD_RE.sub(lambda m: f" {_initials(m.group(1))} ", tokens[1])
+        args = _SLUG_TOKEN_RE.findall(nested)
+    return "_".join([head, *args] if head else args)[:_MAX_SLUG_LENGTH].strip("_")
+
+
+def alias_name(action: str, taken: Set[str]) -> str:
+    """Derive a short alias name for action that is not in taken.
+
+    If the short name collides, a short hash of the action is appended, so
+    the name only depends on the action and the names already taken.
+    """
+    name = _slug(action) or "action"
+    if name not in taken:
+        return name
+    digest = hashlib.sha1(action.encode("utf-8")).hexdigest()
+    for length in range(6, len(digest) + 1):
+        candidate = f"{name}_{digest[:length]}"
+        if candidate not in taken:
+            return candidate
+    raise ValueError(f"Could not find a free alias name for {action!r}")
+
+
+def _saves_space(action: str, name: str, uses: int) -> bool:
+    """Check whether defining action as an alias shrinks the output."""
+    # "  name action\n" once, then "@name" instead of the action in each slot
+    definition_cost = len(name) + len(action) + 4
+    return uses * (len(action) - len(name) - 1) > definition_cost
+
+
+def hoist_repeated_actions(
+    layers: Sequence[Sequence[str]],
+    reserved: Iterable[str] = (),
+    min_uses: int = 2,
+) -> HoistedActions:
+    """Move actions repeated across layer slots into generated aliases.
+
+    Args:
+        layers: Rendered deflayer body rows of every layer
+        reserved: Alias, macro and layer names that are already defined
+        min_uses: Minimum number of slots an action must fill to be hoisted
+
+    Returns:
+        The aliases to define, sorted by action, and the rewritten rows
+    """
+    counts = count_actions(layers)
+    taken = set(reserved)
+    names: Dict[str, str] = {}
+    # Sorted so that names don't depend on where the actions appear
+    for action in sorted(counts):
+        uses = counts[action]
+        if uses < min_uses:
+            continue
+        name = alias_name(action, taken)
+        if not _saves_space(action, name, uses):
+            continue
+        taken.add(name)
+        names[action] = name
+
+    if not names:
+        return HoistedActions([], [list(rows) for rows in layers])
+
+    rewritten: List[List[str]] = []
+    for rows in layers:
+        new_rows = []
+        for row in rows:
+            name = names.get(row.strip())
+            if name is None:
+                new_rows.append(row)
+            else:
+                indent = row[: len(row) - len(row.lstrip())]
+                new_rows.append(f"{indent}@{name}")
+        rewritten.append(new_rows)
+    aliases = [(name, action) for action, name in names.items()]
+    return HoistedActions(aliases, rewritten)
+
+
+def find_duplicate_layers(
+    layers: Sequence[Tuple[str, Sequence[str]]]
+) -> Dict[str, str]:
+    """Find layers whose rendered body equals that of an earlier layer.
+
+    Args:
+        layers: (name, rendered rows) of every layer, in output order
+
+    Returns:
+        Dict mapping each duplicate layer name to the first layer with the
+        same body
+    """
+    canonical: Dict[Tuple[str, ...], str] = {}
+    duplicates: Dict[str, str] = {}
+    for name, rows in layers:
+        first = canonical.setdefault(tuple(rows), name)
+        if first != name:
+            duplicates[name] = first
+    return duplicates
+
+
+def rewrite_layer_refs(rows: Sequence[str], refs: Mapping[str, str]) -> List[str]:
+    """Redirect layer actions in rows whose layer argument is a key of refs.
+
+    Args:
+        rows: Rendered deflayer body rows
+        refs: Layer name or index to the name or index to use instead
+
+    Returns:
+        The rewritten rows
+    """
+    if not refs:
+        return list(rows)
+
+    def redirect(match):
+        target = refs.get(match.group(2))
+        if target is None:
+            return match.group(0)
+        return f"({match.group(1)} {target})"
+
+    return [
+        _LAYER_REF_RE.sub(redirect, row) if "(layer-" in row else row for row in rows
+    ]
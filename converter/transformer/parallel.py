@@ -0,0 +1,98 @@
+"""Parallel Layer Rendering Module.
+
+This module renders deflayer bodies in worker processes. Once aliases and
+macros are collected, rendering a layer only depends on the layer, the
+transformer config and the set of defined macro names, so contiguous runs of
+layers can be rendered independently and reassembled in index order.
+
+Workers don't touch the parent's diagnostics. Each rendered layer carries the
+(msg, code, severity) records made while rendering it, and the parent records
+them again in layer order, so the error summary is the same as a serial run.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence
+
+RenderedLayer = namedtuple("RenderedLayer", ["rows", "records", "error"])
+"""Rendered deflayer body lines, the records made, and the error text if any."""
+
+RenderedChunk = namedtuple("RenderedChunk", ["layers", "hits", "misses"])
+"""Rendered layers of one task and the worker's binding cache counters."""
+
+
+def render_layer_chunk(
+    config: Dict,
+    macro_names: Sequence[str],
+    layers: Sequence,
+    macro_aliases: Optional[Dict[str, str]] = None,
+) -> RenderedChunk:
+    """Render a run of layers in a fresh transformer.
+
+    This is the worker entry point, so it must stay a module-level function.
+    The worker's binding cache is shared by every layer in the chunk.
+
+    Args:
+        config: Transformer config of the parent
+        macro_names: Names of the macros the parent has defined
+        layers: Layers to render
+        macro_aliases: Duplicate macro names and the macros they refer to
+
+    Returns:
+        The rendered layers, in the order given
+    """
+    # Imported here to avoid a cycle with kanata_transformer
+    from .kanata_transformer import KanataTransformer
+
+    transformer = KanataTransformer()
+    transformer.config.update(config)
+    transformer.macro_definitions = dict.fromkeys(macro_names, "")
+    transformer.macro_aliases = dict(macro_aliases or {})
+    rendered: List[RenderedLayer] = []
+    for layer in layers:
+        records: List[tuple] = []
+        transformer._record_capture = records
+        try:
+            rows = transformer._layer_rows(layer)
+        except Exception as e:
+            rendered.append(RenderedLayer([], records, str(e)))
+        else:
+            rendered.append(RenderedLayer(rows, records, None))
+        finally:
+            transformer._record_capture = None
+    stats = transformer.binding_cache.stats()
+    return RenderedChunk(rendered, stats.hits, stats.misses)
+
+
+def render_layers_parallel(
+    config: Dict,
+    macro_names: Sequence[str],
+    layers: Sequence,
+    workers: int,
+    chunk_size: Optional[int] = None,
+    macro_aliases: Optional[Dict[str, str]] = None,
+) -> Iterator[RenderedChunk]:
+    """Render layers in a process pool, yielding chunks in layer order.
+
+    Args:
+        config: Transformer config of the parent
+        macro_names: Names of the macros the parent has defined
+        layers: Layers to render
+        workers: Number of worker processes
+        chunk_size: Layers per task; defaults to an even split over workers
+        macro_aliases: Duplicate macro names and the macros they refer to
+
+    Yields:
+        RenderedChunk objects covering layers in order
+    """
+    if chunk_size is None:
+        chunk_size = max(1, -(-len(layers) // workers))
+    chunks = [layers[i : i + chunk_size] for i in range(0, len(layers), chunk_size)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            render_layer_chunk,
+            [config] * len(chunks),
+            [tuple(macro_names)] * len(chunks),
+            chunks,
+            [macro_aliases] * len(chunks),
+        )
@@ -0,0 +1,296 @@
+"""Watch Module
+
+This module keeps the conversion pipeline loaded in a long-running process
+and reconverts a keymap whenever it or one of its includes changes.
+
+Changes are found by polling the modification time and size of the keymap
+and of every file it includes (resolved again after each rebuild). A
+rebuild only runs the stages whose input changed:
+
+- If the contents of the sources are unchanged (e.g. the file was only
+  touched), nothing runs.
+- If cpp produces the same text (e.g. only a comment changed), parsing,
+  extraction and transformation are skipped.
+- If the generated configuration is unchanged, or identical to what the
+  output file already holds, the output is not rewritten.
+
+The output file is polled as well: if it is deleted or changed by someone
+else, the last generated configuration is written again without running
+any stage.
+
+The output is replaced atomically, so Kanata never reads a partial file.
+
+Usage:
+    zmk-kanata watch keymap.keymap -o kanata.kbd
+"""
+
+import argparse
+import hashlib
+import logging
+import os
+import re
+import sys
+import time
+from collections import namedtuple
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from converter.output.file_writer import write_if_changed
+from converter.pipeline import Pipeline, PipelineRun
+from converter.transformer.kanata_transformer import KanataTransformer
+
+# Seconds between polls; small enough for sub-100 ms edit-to-config latency
+DEFAULT_INTERVAL = 0.05
+
+# cpp line markers name the temporary input file, which differs per run; the
+# parser skips them, so they are left out of the preprocessed-text hash
+_LINE_MARKER_RE = re.compile(r'^# \S+ "[^"\n]*".*\n?', re.MULTILINE)
+
+RebuildResult = namedtuple(
+    "RebuildResult", ["stages", "written", "error", "diagnostics", "seconds"]
+)
+"""Stages that ran, whether the output was rewritten, and what went wrong."""
+
+
+def _stat(path: Path) -> Optional[Tuple[int, int]]:
+    """Return the (mtime, size) of a file, or None if it is missing."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _digest(*parts: str) -> str:
+    """Return the sha256 hex digest of the given strings."""
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(part.encode("utf-8", "surrogateescape"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+class KeymapWatcher:
+    """Reconverts one keymap when its sources change."""
+
+    def __init__(
+        self,
+        input_path: str,
+        output_path: str,
+        include_paths: Optional[List[str]] = None,
+        options: Optional[Dict] = None,
+        force_write: bool = False,
+    ):
+        """Initialize the watcher.
+
+        Args:
+            input_path: Path to the ZMK keymap file
+            output_path: Path of the Kanata configuration to keep up to date
+            include_paths: Extra include paths for the preprocessor
+            options: KanataTransformer keyword arguments
+            force_write: Rewrite the output after every conversion, even if
+                its content is unchanged
+        """
+        self.input_path = Path(input_path)
+        self.output_path = Path(output_path)
+        self.force_write = force_write
+        self.pipeline = Pipeline(
+            include_paths=include_paths,
+            transformer=KanataTransformer(**(options or {})),
+        )
+        self.sources: List[Path] = [self.input_path]
+        # Stage name -> hash of the input it last ran on
+        self._hashes: Dict[str, str] = {}
+        self._stats: Dict[Path, Optional[Tuple[int, int]]] = {}
+        # The last generated configuration and the output's stat after it
+        # was written, to restore a deleted or modified output
+        self._config: Optional[str] = None
+        self._output_stat: Optional[Tuple[int, int]] = None
+
+    def _stat_sources(self) -> Dict[Path, Optional[Tuple[int, int]]]:
+        """Return the (mtime, size) of every source, or None if missing."""
+        return {path: _stat(path) for path in self.sources}
+
+    def changed(self) -> bool:
+        """Check whether a source or the output changed since the last rebuild."""
+        return (
+            self._stat_sources() != self._stats
+            or (
+                self._config is not None
+                and _stat(self.output_path) != self._output_stat
+            )
+        )
+
+    def rebuild(self) -> RebuildResult:
+        """Run the stages whose inputs changed and update the output.
+
+        Errors are returned in the result; the previous output is kept.
+        """
+        start = time.perf_counter()
+        run = self.pipeline.start(str(self.input_path))
+        try:
+            self.sources = [
+                self.input_path,
+                *self.pipeline.preprocessor.resolve_includes(str(self.input_path)),
+            ]
+            self._stats = self._stat_sources()
+            contents = []
+            for path in self.sources:
+                try:
+                    contents.extend([str(path), path.read_text()])
+                except OSError:
+                    contents.extend([str(path), ""])
+            if not self._stage_changed("preprocess", _digest(*contents)):
+                return self._result(run, self._restore_output(), None, start)
+
+            text = self.pipeline.resume(run, until="preprocess").preprocessed
+            digest = _digest(_LINE_MARKER_RE.sub("", text))
+            if not self._stage_changed("parse", digest):
+                return self._result(run, self._restore_output(), None, start)
+
+            config = self.pipeline.resume(run).config
+            written = False
+            if (
+                self._stage_changed("write", _digest(config))
+                or self.force_write
+                or _stat(self.output_path) != self._output_stat
+            ):
+                written = write_if_changed(
+                    self.output_path, config, force=self.force_write
+                )
+            self._config = config
+            self._output_stat = _stat(self.output_path)
+            return self._result(run, written, None, start)
+        except Exception as e:
+            # Forget what ran so the next change rebuilds every stage
+            self._hashes.clear()
+            return self._result(run, False, str(e), start)
+
+    def _restore_output(self) -> bool:
+        """Write the last configuration again if the output no longer holds it.
+
+        Returns:
+            Whether the output was written
+        """
+        if self._config is None or _stat(self.output_path) == self._output_stat:
+            return False
+        written = write_if_changed(self.output_path, self._config)
+        self._output_stat = _stat(self.output_path)
+        return written
+
+    def _stage_changed(self, stage: str, digest: str) -> bool:
+        """Record the input hash of a stage and report whether it changed."""
+        changed = self._hashes.get(stage) != digest
+        self._hashes[stage] = digest
+        return changed
+
+    @staticmethod
+    def _result(run: PipelineRun, written, error, start) -> RebuildResult:
+        """Build the result of a rebuild that started at start."""
+        stages = run.completed
+        if error and run.stage and run.stage not in stages:
+            stages.append(run.stage)
+        return RebuildResult(
+            stages,
+            written,
+            error,
+            list(run.context.diagnostics),
+            time.perf_counter() - start,
+        )
+
+    def run(
+        self, interval: float = DEFAULT_INTERVAL, max_rebuilds: Optional[int] = None
+    ) -> None:
+        """Rebuild now and then whenever a source changes.
+
+        Args:
+            interval: Seconds between polls
+            max_rebuilds: Stop after this many rebuilds; None runs until
+                interrupted
+        """
+        rebuilds = 0
+        while max_rebuilds is None or rebuilds < max_rebuilds:
+            if rebuilds == 0 or self.changed():
+                _report(self.rebuild(), self.output_path)
+                rebuilds += 1
+            else:
+                time.sleep(interval)
+
+
+def _report(result: RebuildResult, output_path: Path) -> None:
+    """Print a one-line status for a rebuild to stderr."""
+    ms = result.seconds * 1000
+    if result.error:
+        print(f"error: {result.error}", file=sys.stderr)
+    elif result.written:
+        print(f"wrote {output_path} in {ms:.0f} ms", file=sys.stderr)
+    else:
+        ran = ", ".join(result.stages) or "nothing"
+        print(f"unchanged ({ran} ran, {ms:.0f} ms)", file=sys.stderr)
+    for diagnostic in result.diagnostics:
+        logging.info(diagnostic.to_text())
+
+
+def main(args=None) -> int:
+    """Run the ``zmk-kanata watch`` command."""
+    parser = argparse.ArgumentParser(
+        prog="zmk-kanata watch",
+        description="Reconvert a ZMK keymap whenever it or its includes change",
+    )
+    parser.add_argument("input_file", help="Path to the ZMK keymap file")
+    parser.add_argument("-o", "--output", required=True, help="Path to the output file")
+    parser.add_argument(
+        "-I",
+        "--include",
+        action="append",
+        help="Add an include path for preprocessing (can be used multiple times)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        metavar="SECONDS",
+        help=f"Polling interval (default: {DEFAULT_INTERVAL})",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Convert once and exit instead of watching",
+    )
+    parser.add_argument(
+        "--force-write",
+        action="store_true",
+        help="Rewrite the output after every conversion, even if unchanged",
+    )
+    parser.add_argument(
+        "--hoist-aliases",
+        action="store_true",
+        help="Move compound actions repeated across layers into defalias entries",
+    )
+    parser.add_argument(
+        "--dedup",
+        action="store_true",
+        help="Emit identical layers and macros once and redirect references",
+    )
+    parsed_args = parser.parse_args(args)
+
+    watcher = KeymapWatcher(
+        parsed_args.input_file,
+        parsed_args.output,
+        include_paths=parsed_args.include,
+        options={
+            "hoist_aliases": parsed_args.hoist_aliases,
+            "dedup": parsed_args.dedup,
+        },
+        force_write=parsed_args.force_write,
+    )
+    if parsed_args.once:
+        result = watcher.rebuild()
+        _report(result, watcher.output_path)
+        return 1 if result.error else 0
+    print(f"watching {parsed_args.input_file} (Ctrl-C to stop)", file=sys.stderr)
+    try:
+        watcher.run(parsed_args.interval)
+    except KeyboardInterrupt:
+        pass
+    return 0
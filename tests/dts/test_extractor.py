@@ -178,3 +178,49 @@ def test_extract_invalid_content():
 
     # Invalid layer should be skipped
     assert len(config.layers) == 0
+
+
+def test_iter_extract_yields_header_then_layers():
+    """Test streaming extraction yields behaviors/combos before each layer."""
+    content = """
+    / {
+        behaviors {
+            hm: homerow_mods {
+                compatible = "zmk,behavior-hold-tap";
+                tapping-term-ms = <200>;
+            };
+        };
+        combos {
+            compatible = "zmk,combos";
+            combo_esc {
+                timeout-ms = <50>;
+                key-positions = <0 1>;
+                bindings = <&kp ESC>;
+            };
+        };
+        keymap {
+            default_layer {
+                bindings = <&kp A &hm LSHIFT B>;
+            };
+            lower_layer {
+                bindings = <&kp C &kp D>;
+            };
+        };
+    };
+    """
+
+    ast = DtsParser().parse(content)
+    items = list(KeymapExtractor().iter_extract(ast))
+
+    header, layers = items[0], items[1:]
+    assert isinstance(header, KeymapConfig)
+    assert header.layers == []
+    assert "hm" in header.behaviors
+    assert [c.name for c in header.combos] == ["combo_esc"]
+    assert [layer.name for layer in layers] == ["default_layer", "lower_layer"]
+    assert layers[0].bindings[1].behavior is header.behaviors["hm"]
+
+    config = KeymapExtractor().extract(ast)
+    assert [
+        [(b.behavior.name, b.params) for b in layer.bindings] for layer in config.layers
+    ] == [[(b.behavior.name, b.params) for b in layer.bindings] for layer in layers]
@@ -3,8 +3,9 @@
 import pytest
 from converter.dts.parser import DtsParser
 from converter.dts.extractor import KeymapExtractor
-from converter.models import KeymapConfig, Binding
+from converter.models import Behavior, Binding, KeymapConfig, Layer
 from converter.dts.error_handler import DtsParseError
+from converter.transformer.kanata_transformer import KanataTransformer
 
 
 def test_full_pipeline_simple_keymap():
@@ -255,3 +256,97 @@ def test_full_pipeline_error_handling():
     # This is a valid boolean property in ZMK DTS, so do not expect an error
     # with pytest.raises(DtsParseError, match="Invalid node declaration"):
     #     parser.parse(content)
+
+
+def test_streaming_pipeline_matches_batch_definitions():
+    """Test iter_extract feeding iter_transform emits the same definitions."""
+    content = """
+    / {
+        behaviors {
+            hm: homerow_mods {
+                compatible = "zmk,behavior-hold-tap";
+                tapping-term-ms = <200>;
+            };
+        };
+        keymap {
+            default_layer {
+                bindings = <&kp A &hm LSHIFT B>;
+            };
+            lower_layer {
+                bindings = <&hm LCTRL C &kp D>;
+            };
+        };
+    };
+    """
+
+    ast = DtsParser().parse(content)
+    batch = KanataTransformer().transform(KeymapExtractor().extract(ast))
+
+    chunks = KanataTransformer().iter_transform(KeymapExtractor().iter_extract(ast))
+    first = next(chunks)
+    assert first.startswith("(defcfg")
+    streamed = first + "".join(chunks)
+
+    assert sorted(streamed.splitlines()) == sorted(batch.splitlines())
+    assert streamed.index("ht_lsft_b") < streamed.index("(deflayer default_layer")
+    assert streamed.index("ht_lctl_c") > streamed.index("(deflayer default_layer")
+
+
+def test_streaming_and_batch_skip_duplicate_layer_names():
+    """Test iter_transform keeps the first of two same-named layers."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    layers = [
+        Layer(name="base", index=0, bindings=[Binding(kp, ["A"])]),
+        Layer(name="nav", index=1, bindings=[Binding(kp, ["B"])]),
+        Layer(name="base", index=2, bindings=[Binding(kp, ["C"])]),
+    ]
+    keymap = KeymapConfig(layers=layers, behaviors={"kp": kp})
+    header = KeymapConfig(layers=[], behaviors={"kp": kp})
+
+    transformer = KanataTransformer()
+    batch = transformer.transform(keymap)
+    streamer = KanataTransformer()
+    streamed = "".join(streamer.iter_transform([header, *layers]))
+
+    assert streamed == batch
+    assert batch.count("(deflayer base") == 1
+    assert "(deflayer base\n  a\n)" in batch
+    assert transformer.layer_count == streamer.layer_count == 2
+    assert [d.code for d in streamer.diagnostics] == ["duplicate-layer"]
+
+
+def test_frozen_pipeline_matches_mutable():
+    """Transforming a frozen keymap gives the same output as the mutable one."""
+    content = """
+    / {
+        behaviors {
+            hm: homerow_mods {
+                compatible = "zmk,behavior-hold-tap";
+                tapping-term-ms = <200>;
+            };
+        };
+        combos {
+            compatible = "zmk,combos";
+            combo_esc {
+                timeout-ms = <50>;
+                key-positions = <0 1>;
+                bindings = <&kp ESC>;
+            };
+        };
+        keymap {
+            default_layer {
+                bindings = <&kp A &hm LSHIFT B &pi>;
+            };
+            lower_layer {
+                bindings = <&hm LCTRL C &kp D &trans>;
+            };
+        };
+    };
+    """
+
+    ast = DtsParser().parse(content)
+    mutable = KanataTransformer().transform(KeymapExtractor().extract(ast))
+    frozen_config = KeymapExtractor().extract(ast, freeze=True)
+    frozen = KanataTransformer().transform(frozen_config)
+
+    assert frozen == mutable
@@ -3,11 +3,18 @@
 import pytest
 import time
 import statistics
+import subprocess
+import sys
+import tracemalloc
 from pathlib import Path
+from converter import __version__
 from converter.dts.preprocessor import DtsPreprocessor
 from converter.dts.parser import DtsParser
 from converter.dts.extractor import KeymapExtractor
 from converter.transformer.kanata_transformer import KanataTransformer
+from converter.model.frozen import FrozenLayer, freeze_binding
+from converter.models import Behavior, Binding, KeymapConfig, Layer
+from converter.output.validator import validate_kanata
 
 
 def measure_time(func, *args, **kwargs):
@@ -149,3 +156,260 @@ def test_full_pipeline_performance(sample_keymap_path):
 
     # Assert reasonable performance
     assert mean_time < 1.0  # Should complete in under 1 second
+
+
+def _synthetic_keymap(num_layers=100, keys_per_layer=80):
+    """Build a mutable keymap with mixed key-press, hold-tap and layer keys."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    hm = Behavior(name="hm", type="hold-tap")
+    mo = Behavior(name="mo", type="zmk,behavior-momentary-layer")
+    letters = [chr(ord("A") + i) for i in range(26)]
+    layers = []
+    for layer_idx in range(num_layers):
+        bindings = []
+        for pos in range(keys_per_layer):
+            if pos % 10 == 0:
+                bindings.append(Binding(hm, ["LSHIFT", letters[pos % 26]]))
+            elif pos % 17 == 0:
+                bindings.append(Binding(mo, [str(layer_idx % 4)]))
+            else:
+                bindings.append(Binding(kp, [letters[(pos + layer_idx) % 26]]))
+        layers.append(
+            Layer(name=f"layer_{layer_idx}", index=layer_idx, bindings=bindings)
+        )
+    return KeymapConfig(layers=layers, behaviors={"kp": kp, "hm": hm, "mo": mo})
+
+
+def _traced_bytes(build):
+    """Return build() and the memory it left allocated, per tracemalloc."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+
+
+def test_frozen_keymap_memory():
+    """Test how slots and binding interning shrink a 100-layer keymap."""
+    keymap, mutable_bytes = _traced_bytes(_synthetic_keymap)
+    # Slotted objects only: one FrozenBinding per slot, nothing shared
+    _, slotted_bytes = _traced_bytes(
+        lambda: tuple(
+            FrozenLayer(
+                layer.name,
+                layer.index,
+                tuple(freeze_binding(b) for b in layer.bindings),
+            )
+            for layer in keymap.layers
+        )
+    )
+    frozen, frozen_bytes = _traced_bytes(keymap.freeze)
+
+    # Log results
+    print("\nFrozen Keymap Memory (100 layers):")
+    print(f"Mutable: {mutable_bytes / 1024:.1f} KiB")
+    print(f"Slots only: {slotted_bytes / 1024:.1f} KiB")
+    print(f"Slots and interning: {frozen_bytes / 1024:.1f} KiB")
+    print(f"Saved by slots: {100 * (1 - slotted_bytes / mutable_bytes):.1f}%")
+    interned = (slotted_bytes - frozen_bytes) / mutable_bytes
+    print(f"Saved by interning: {100 * interned:.1f}%")
+
+    assert len(frozen.layers) == 100
+    # Slots alone save about a third; interning the repeated bindings
+    # accounts for most of the rest
+    assert slotted_bytes < mutable_bytes * 0.8
+    assert frozen_bytes < slotted_bytes / 4
+
+
+def test_holdtap_alias_scaling():
+    """Test transform time on 50 layers x 100 keys of mixed hold-taps."""
+    behaviors = {
+        name: Behavior(name=name, type="hold-tap") for name in ("hml", "hmr", "ht")
+    }
+    behaviors["kp"] = Behavior(name="kp", type="zmk,behavior-key-press")
+    mods = ["LSHIFT", "LCTRL", "LALT", "LGUI"]
+    letters = [chr(ord("A") + i) for i in range(26)]
+    layers = []
+    for layer_idx in range(50):
+        bindings = []
+        for pos in range(100):
+            if pos % 3 == 0:
+                bindings.append(Binding(behaviors["kp"], [letters[pos % 26]]))
+            else:
+                name = ("hml", "hmr", "ht")[(pos + layer_idx) % 3]
+                mod = mods[(pos // 26 + layer_idx) % 4]
+                key = letters[(pos * 5 + layer_idx) % 26]
+                bindings.append(Binding(behaviors[name], [mod, key]))
+        layers.append(
+            Layer(name=f"layer_{layer_idx}", index=layer_idx, bindings=bindings)
+        )
+    keymap = KeymapConfig(layers=layers, behaviors=behaviors)
+
+    output, duration = measure_time(KanataTransformer().transform, keymap)
+
+    # Log results
+    print("\nHold-Tap Alias Scaling (50 layers x 100 keys):")
+    print(f"Aliases: {output.count('(tap-hold ')}")
+    print(f"Transform time: {duration:.4f} seconds")
+
+    assert output.count("(deflayer ") == 50
+    # Assert reasonable performance
+    assert duration < 1.0
+
+
+class _CountingSink:
+    """Text sink that only counts the characters written to it."""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, text):
+        self.size += len(text)
+
+
+def test_streaming_transform_memory():
+    """Test that transform_to keeps peak memory below building the string."""
+    keymap = _synthetic_keymap(num_layers=400)
+
+    tracemalloc.start()
+    try:
+        output = KanataTransformer().transform(keymap)
+        batch_peak = tracemalloc.get_traced_memory()[1]
+        del output
+        tracemalloc.reset_peak()
+
+        base = tracemalloc.get_traced_memory()[0]
+        sink = _CountingSink()
+        KanataTransformer().transform_to(keymap, sink)
+        stream_peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    # Log results
+    print("\nStreaming Transform Memory (400 layers):")
+    print(f"Output: {sink.size / 1024:.1f} KiB")
+    print(f"Batch peak: {batch_peak / 1024:.1f} KiB")
+    print(f"Streaming peak: {stream_peak / 1024:.1f} KiB")
+
+    # Assert the full output is never held in memory
+    assert stream_peak < sink.size
+    assert stream_peak < batch_peak / 2
+
+
+def test_hoisted_alias_size():
+    """Test config size with repeated compound actions hoisted to aliases."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    td = Behavior(name="td_esc", type="zmk,behavior-tap-dance")
+    sl = Behavior(name="sl", type="zmk,behavior-sticky-layer")
+    tog = Behavior(name="tog", type="zmk,behavior-toggle-layer")
+    layers = []
+    for layer_idx in range(200):
+        bindings = []
+        for pos in range(60):
+            if pos % 6 == 0:
+                bindings.append(Binding(td, ["ESC", "CAPS", "TAB"]))
+            elif pos % 6 == 1:
+                bindings.append(Binding(sl, [str(pos % 4)]))
+            elif pos % 6 == 2:
+                bindings.append(Binding(tog, [str(pos % 5)]))
+            else:
+                bindings.append(Binding(kp, [chr(ord("A") + (pos + layer_idx) % 26)]))
+        layers.append(
+            Layer(name=f"layer_{layer_idx}", index=layer_idx, bindings=bindings)
+        )
+    keymap = KeymapConfig(
+        layers=layers, behaviors={"kp": kp, "td_esc": td, "sl": sl, "tog": tog}
+    )
+
+    plain = KanataTransformer().transform(keymap)
+    hoisted, duration = measure_time(
+        KanataTransformer(hoist_aliases=True).transform, keymap
+    )
+
+    # Log results
+    print("\nHoisted Alias Size (200 layers x 60 keys):")
+    print(f"Plain: {len(plain) / 1024:.1f} KiB")
+    print(f"Hoisted: {len(hoisted) / 1024:.1f} KiB")
+    print(f"Reduction: {100 * (1 - len(hoisted) / len(plain)):.1f}%")
+    print(f"Transform time: {duration:.4f} seconds")
+
+    assert hoisted.count("(deflayer ") == 200
+    # Assert a substantial reduction
+    assert len(hoisted) < 0.8 * len(plain)
+
+
+def test_validator_throughput():
+    """Test that generated configs validate at thousands per second."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    mo = Behavior(name="mo", type="zmk,behavior-momentary-layer")
+    layers = []
+    for layer_idx in range(4):
+        bindings = [Binding(mo, [str((layer_idx + 1) % 4)])]
+        for pos in range(41):
+            bindings.append(Binding(kp, [chr(ord("A") + (pos + layer_idx) % 26)]))
+        layers.append(
+            Layer(name=f"layer_{layer_idx}", index=layer_idx, bindings=bindings)
+        )
+    config = KanataTransformer().transform(
+        KeymapConfig(layers=layers, behaviors={"kp": kp, "mo": mo})
+    )
+
+    runs = 500
+    start_time = time.perf_counter()
+    for _ in range(runs):
+        validate_kanata(config)
+    duration = time.perf_counter() - start_time
+
+    # Log results
+    print("\nValidator Throughput (4 layers x 42 keys):")
+    print(f"Config size: {len(config)} bytes")
+    print(f"Configs per second: {runs / duration:.0f}")
+
+    # Assert at least a thousand configs per second
+    assert runs / duration > 1000
+
+
+def test_cli_import_time():
+    """Test that importing the CLI doesn't load the conversion stages."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import converter.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent.parent,
+    )
+    # Lines look like "import time:  self [us] | cumulative | imported package"
+    cumulative = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, total, name = line.split("|")
+            if total.strip().isdigit():
+                cumulative[name.strip()] = int(total)
+
+    # Log results
+    print("\nCLI Import Time:")
+    print(f"converter.main: {cumulative['converter.main'] / 1000:.1f}ms")
+
+    for module in (
+        "yaml",
+        "converter.dts.parser",
+        "converter.transformer.kanata_transformer",
+        "concurrent.futures.process",
+    ):
+        assert module not in cumulative, f"{module} imported by the CLI"
+    # Loading the stages eagerly took about 200ms
+    assert cumulative["converter.main"] < 150_000
+
+
+def test_cli_version():
+    """Test that --version answers without converting anything."""
+    result = subprocess.run(
+        [sys.executable, "-m", "converter.main", "--version"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parent.parent.parent,
+    )
+    assert __version__ in result.stdout
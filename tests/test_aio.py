@@ -0,0 +1,89 @@
+"""Tests for the asyncio conversion API."""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import converter.aio
+from converter.aio import aconvert, aconvert_many, apreprocess
+from converter.context import ConversionContext
+from converter.dts.preprocessor import DtsPreprocessor
+from converter.main import convert_zmk_to_kanata
+
+KEYMAP = """#include "keys.h"
+
+/ {
+    keymap {
+        compatible = "zmk,keymap";
+        default_layer {
+            bindings = <&kp A &kp BASE_KEY &mt LSHIFT>;
+        };
+    };
+};
+"""
+
+
+def _setup(tmp_path):
+    (tmp_path / "keys.h").write_text("#define BASE_KEY B\n")
+    keymap = tmp_path / "main.keymap"
+    keymap.write_text(KEYMAP)
+    return keymap
+
+
+def test_aconvert_matches_blocking_conversion(tmp_path):
+    """cpp reading stdin gives the same output and diagnostics."""
+    keymap = _setup(tmp_path)
+    context = ConversionContext()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        config = asyncio.run(aconvert(str(keymap), context=context, executor=executor))
+
+    assert config == convert_zmk_to_kanata(str(keymap))
+    assert "b" in config.split()
+    assert [d.code for d in context.diagnostics] == ["hold-tap-missing-params"]
+
+    with pytest.raises(ValueError, match="Failed to convert keymap"):
+        asyncio.run(aconvert(str(tmp_path / "missing.keymap")))
+
+
+def test_aconvert_many_keeps_order_and_limit(tmp_path, monkeypatch):
+    """Results come back in input order with at most limit conversions."""
+    keymap = _setup(tmp_path)
+    running = []
+    peak = []
+
+    async def counting_preprocess(preprocessor, input_path):
+        running.append(input_path)
+        peak.append(len(running))
+        try:
+            await asyncio.sleep(0.01)
+            return await apreprocess(preprocessor, input_path)
+        finally:
+            running.remove(input_path)
+
+    monkeypatch.setattr(converter.aio, "apreprocess", counting_preprocess)
+    paths = [str(keymap), str(tmp_path / "missing.keymap")] * 3
+    results = asyncio.run(aconvert_many(paths, limit=2, return_exceptions=True))
+
+    assert all(isinstance(r, ValueError) for r in results[1::2])
+    assert len(set(results[0::2])) == 1 and isinstance(results[0], str)
+    assert max(peak) == 2
+
+
+def test_timeout_kills_preprocessor(tmp_path):
+    """A preprocessor still running at the timeout is killed."""
+    keymap = _setup(tmp_path)
+    pid_file = tmp_path / "cpp.pid"
+    cpp = tmp_path / "slow-cpp"
+    cpp.write_text(f"#!/bin/sh\necho $$ > {pid_file}\nexec sleep 30\n")
+    cpp.chmod(0o755)
+    preprocessor = DtsPreprocessor(cpp_path=str(cpp))
+
+    async def convert():
+        await asyncio.wait_for(apreprocess(preprocessor, str(keymap)), 0.5)
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(convert())
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)
@@ -0,0 +1,112 @@
+"""Tests for batch conversion of keymap trees."""
+
+import json
+from pathlib import Path
+
+from converter.batch import collect_inputs, main as batch_main, run_batch
+
+KEYMAP = """
+/ {
+    keymap {
+        compatible = "zmk,keymap";
+        default_layer {
+            bindings = <&kp A &kp B>;
+        };
+    };
+};
+"""
+
+
+def _tree(root: Path) -> Path:
+    src = root / "src"
+    (src / "boards" / "left").mkdir(parents=True)
+    (src / "main.keymap").write_text(KEYMAP)
+    (src / "boards" / "left" / "left.dtsi").write_text(KEYMAP)
+    (src / "boards" / "broken.keymap").write_text("not dts {")
+    (src / "README.md").write_text("ignored")
+    return src
+
+
+def test_collect_inputs_dirs_and_globs(tmp_path):
+    """Directories are searched recursively; globs keep paths below their root."""
+    src = _tree(tmp_path)
+
+    from_dir = [str(rel) for _, rel in collect_inputs([str(src)])]
+    assert from_dir == [
+        "boards/broken.keymap",
+        "boards/left/left.dtsi",
+        "main.keymap",
+    ]
+    from_glob = collect_inputs([str(src / "**" / "*.dtsi"), str(src / "main.keymap")])
+    assert [str(rel) for _, rel in from_glob] == [
+        "boards/left/left.dtsi",
+        "main.keymap",
+    ]
+
+
+def test_run_batch_mirrors_tree_and_reports(tmp_path):
+    """Outputs mirror the input tree and failures are reported per file."""
+    src = _tree(tmp_path)
+    out = tmp_path / "out"
+
+    report = run_batch(collect_inputs([str(src)]), out, workers=2)
+
+    assert report["summary"]["total"] == 3
+    assert report["summary"]["failed"] == 1
+    by_input = {Path(r["input"]).name: r for r in report["files"]}
+    assert by_input["broken.keymap"]["status"] == "error"
+    assert by_input["broken.keymap"]["error"].startswith("parse failed")
+    ok = by_input["left.dtsi"]
+    assert ok["status"] == "ok"
+    assert set(ok["timings"]) == {"preprocess", "parse", "extract", "transform"}
+    assert "(deflayer default_layer" in (out / "boards/left/left.kbd").read_text()
+    assert (out / "main.kbd").exists()
+    assert report["summary"]["written"] == 2
+
+    # A second run leaves the unchanged outputs alone
+    rerun = run_batch(collect_inputs([str(src)]), out, workers=1)
+    assert rerun["summary"]["written"] == 0
+    assert rerun["summary"]["ok"] == 2
+
+
+def test_batch_cli_writes_json_report(tmp_path):
+    """The batch command exits 1 on failures and writes a JSON report."""
+    src = _tree(tmp_path)
+    report_path = tmp_path / "report.json"
+
+    code = batch_main(
+        [str(src), "-o", str(tmp_path / "out"), "-j", "1", "--report", str(report_path)]
+    )
+
+    assert code == 1
+    report = json.loads(report_path.read_text())
+    assert [r["status"] for r in report["files"]] == ["error", "ok", "ok"]
+
+
+def test_collect_inputs_skips_included_files(tmp_path):
+    """Fragments meant for #include aren't converted on their own."""
+    src = tmp_path / "src"
+    src.mkdir()
+    (src / "combos.dtsi").write_text("/ { combos { }; };\n")
+    (src / "layers.dtsi").write_text(KEYMAP)
+    (src / "main.keymap").write_text('#include "layers.dtsi"\n')
+
+    found = collect_inputs([str(src), str(src / "*.dtsi")])
+    assert [str(rel) for _, rel in found] == ["main.keymap"]
+
+
+def test_batch_refuses_clashing_outputs(tmp_path, capsys):
+    """Inputs that map to the same output file fail before converting."""
+    for root in ("a", "b"):
+        (tmp_path / root).mkdir()
+        (tmp_path / root / "main.keymap").write_text(KEYMAP)
+    (tmp_path / "a" / "main.dtsi").write_text(KEYMAP)
+    out = tmp_path / "out"
+
+    code = batch_main([str(tmp_path / "a"), str(tmp_path / "b"), "-o", str(out)])
+
+    assert code == 1
+    error = capsys.readouterr().err
+    assert "main.kbd <- " in error
+    assert "a/main.dtsi" in error and "b/main.keymap" in error
+    assert not out.exists()
@@ -0,0 +1,73 @@
+"""Tests for the transformer binding cache."""
+
+from converter.error_handling.error_manager import ErrorSeverity
+from converter.models import Behavior, Binding, KeymapConfig, Layer
+from converter.transformer.binding_cache import BindingCache
+from converter.transformer.kanata_transformer import KanataTransformer
+
+
+def test_lru_eviction_and_stats():
+    """The least recently used entry is evicted and lookups are counted."""
+    cache = BindingCache(maxsize=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a").fragment == "1"
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("c").fragment == "3"
+    stats = cache.stats()
+    assert (stats.hits, stats.misses, stats.size, stats.maxsize) == (2, 1, 2, 2)
+    assert stats.hit_rate == 2 / 3
+
+
+def test_key_uses_behavior_identity_and_params():
+    """Bindings with equal behavior and params share a key."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    other = Behavior(name="kp", type="zmk,behavior-key-press")
+
+    key = BindingCache.key(Binding(kp, ["A"]))
+    assert key == BindingCache.key(Binding(kp, ["A"]))
+    assert key != BindingCache.key(Binding(kp, ["B"]))
+    assert key != BindingCache.key(Binding(other, ["A"]))
+    assert BindingCache.key(Binding(kp, [["unhashable"]])) is None
+
+
+def test_transformer_reuses_renderings():
+    """Repeated bindings are rendered once per transform."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    bindings = [Binding(kp, ["A"]), Binding(None, ["ERROR: bad key"])] * 3
+    keymap = KeymapConfig(
+        layers=[
+            Layer(name="base", index=0, bindings=list(bindings)),
+            Layer(name="lower", index=1, bindings=list(bindings)),
+        ],
+        behaviors={"kp": kp},
+    )
+    transformer = KanataTransformer()
+    output = transformer.transform(keymap)
+
+    stats = transformer.cache_stats()
+    assert (stats.hits, stats.misses) == (10, 2)
+    # Six inline comments plus one summary line
+    assert output.count("; ERROR: bad key") == 7
+    assert transformer.diagnostics.count("binding-error") == 1
+
+    # The cache is cleared for every transform
+    transformer.transform(keymap)
+    assert transformer.cache_stats().misses == 2
+
+
+def test_cache_hits_replay_recorded_errors():
+    """A cache hit records the errors stored with the cached fragment."""
+    transformer = KanataTransformer()
+    binding = Binding(None, ["X"])
+    transformer.binding_cache.put(
+        BindingCache.key(binding),
+        "; cached",
+        [("cached problem", "binding-error", ErrorSeverity.ERROR)],
+    )
+
+    assert transformer._render_binding(binding) == "; cached"
+    assert "cached problem" in transformer.error_messages
+    assert transformer.diagnostics.count("binding-error") == 1
@@ -0,0 +1,106 @@
+"""Tests for the end-to-end result cache."""
+
+import os
+import threading
+
+from converter.cache import ResultCache
+from converter.context import ConversionContext
+from converter.dts.preprocessor import DtsPreprocessor
+from converter.main import convert_zmk_to_kanata
+from converter.pipeline import Pipeline
+
+KEYMAP = """#include "keys.h"
+
+/ {
+    keymap {
+        compatible = "zmk,keymap";
+        default_layer {
+            bindings = <&kp A &kp BASE_KEY &mt LSHIFT>;
+        };
+    };
+};
+"""
+
+
+class CountingPreprocessor(DtsPreprocessor):
+    """Preprocessor that counts how often cpp runs."""
+
+    calls = 0
+
+    def preprocess(self, input_path, *args, **kwargs):
+        CountingPreprocessor.calls += 1
+        return super().preprocess(input_path, *args, **kwargs)
+
+
+def _setup(tmp_path):
+    (tmp_path / "keys.h").write_text("#define BASE_KEY B\n")
+    keymap = tmp_path / "main.keymap"
+    keymap.write_text(KEYMAP)
+    return keymap
+
+
+def test_cache_hit_skips_every_stage(tmp_path):
+    """A repeat conversion is served from the cache with its diagnostics."""
+    keymap = _setup(tmp_path)
+    cache = ResultCache(tmp_path / "cache")
+    pipeline = Pipeline(preprocessor=CountingPreprocessor(), cache=cache)
+    CountingPreprocessor.calls = 0
+
+    first = pipeline.run(str(keymap))
+    second = pipeline.run(str(keymap))
+    assert not first.cached and second.cached
+    assert second.config == first.config
+    assert second.completed == []
+    assert [d.code for d in second.context.diagnostics] == ["hold-tap-missing-params"]
+    assert CountingPreprocessor.calls == 1
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # Editing an include or changing options misses
+    (tmp_path / "keys.h").write_text("#define BASE_KEY C\n")
+    third = pipeline.run(str(keymap))
+    assert not third.cached and "c" in third.config.split()
+    context = ConversionContext(config={"tapping_term_ms": 150})
+    assert not pipeline.run(str(keymap), context=context).cached
+
+    cached = convert_zmk_to_kanata(str(keymap), cache_dir=str(tmp_path / "cache2"))
+    assert convert_zmk_to_kanata(str(keymap), cache_dir=str(tmp_path / "cache2")) == (
+        cached
+    )
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    """Entries beyond the size limit are deleted oldest-access first."""
+    cache = ResultCache(tmp_path, max_bytes=10**9)
+    for i, key in enumerate(["a", "b", "c"]):
+        cache.put(key, "x" * 100, [])
+        os.utime(tmp_path / f"{key}.json", ns=(i * 10**9, i * 10**9))
+    assert cache.get("a") is not None  # refreshes a
+
+    cache.max_bytes = 2 * os.path.getsize(tmp_path / "a.json")
+    cache.evict()
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["a.json", "c.json"]
+
+
+def test_cache_concurrent_writers(tmp_path):
+    """Concurrent puts and evictions never leave a partial entry."""
+    cache = ResultCache(tmp_path, max_bytes=20_000)
+    errors = []
+
+    def worker(n):
+        try:
+            for i in range(30):
+                key = f"k{(n + i) % 40}"
+                cache.put(key, f"config {key}" * 50, [])
+                entry = cache.get(key)
+                assert entry is None or entry.config == f"config {key}" * 50
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert not [p for p in tmp_path.iterdir() if p.name.endswith(".tmp")]
+    assert sum(p.stat().st_size for p in tmp_path.iterdir()) <= 20_000
@@ -0,0 +1,88 @@
+"""Tests for the combo position index."""
+
+import time
+
+from converter.models import Binding, Combo, KeymapConfig, Layer
+from converter.transformer.combo_index import ComboIndex
+from converter.transformer.kanata_transformer import KanataTransformer
+
+
+def _combo(name, positions, timeout=50, key="ESC"):
+    return Combo(
+        name=name,
+        timeout_ms=timeout,
+        key_positions=positions,
+        binding=Binding(behavior=None, params=[key]),
+    )
+
+
+def _layer(keys, index=0):
+    return Layer(
+        name=f"layer{index}",
+        index=index,
+        bindings=[Binding(behavior=None, params=[k]) for k in keys],
+    )
+
+
+def test_position_lookup_and_resolution():
+    """Combos are found by position and positions resolve per layer."""
+    a = _combo("a", [0, 1])
+    b = _combo("b", [1, 2])
+    index = ComboIndex(
+        [a, b],
+        [_layer(["Q", "W", "E"]), _layer(["N1", "N2", "N3"], 1)],
+        resolver=str.lower,
+    )
+
+    assert index.combos_at(1) == [a, b]
+    assert index.combos_at(5) == []
+    assert index.key_names(a) == ["q", "w"]
+    assert index.key_names(b, layer_index=1) == ["n2", "n3"]
+    assert index.resolve(7) is None
+    assert index.key_names(_combo("c", [2, 9])) is None
+
+
+def test_duplicates_overlaps_and_timeouts():
+    """Duplicate, subset and timeout conflicts are reported."""
+    ab = _combo("ab", [0, 1])
+    ba = _combo("ba", [1, 0])
+    abc = _combo("abc", [0, 1, 2], timeout=80)
+    de = _combo("de", [3, 4])
+    index = ComboIndex([ab, ba, abc, de])
+
+    assert [c.combos for c in index.find_duplicates()] == [(ab, ba)]
+    assert sorted(
+        (c.combos[0].name, c.combos[1].name) for c in index.find_overlaps()
+    ) == [("ab", "abc"), ("ba", "abc")]
+    assert sorted(
+        tuple(c.name for c in conflict.combos)
+        for conflict in index.find_timeout_conflicts()
+    ) == [("ab", "abc"), ("ba", "abc")]
+
+
+def test_transformer_reports_combo_conflicts():
+    """The transformer records combo conflicts as diagnostics."""
+    keymap = KeymapConfig(
+        layers=[_layer(["A", "B", "C"])],
+        combos=[_combo("x", [0, 1]), _combo("y", [0, 1])],
+    )
+    transformer = KanataTransformer()
+    output = transformer.transform(keymap)
+
+    assert "(combo a b esc)" in output
+    assert transformer.diagnostics.count("combo-duplicate") == 1
+
+
+def test_large_combo_set_is_fast():
+    """A 300-combo steno-style set is analyzed well under a second."""
+    combos = [
+        _combo(f"c{i}", [i % 40, (i * 7 + 1) % 40, (i * 13 + 2) % 40])
+        for i in range(300)
+    ]
+    index = ComboIndex(combos, [_layer([f"K{i}" for i in range(40)])])
+
+    start = time.perf_counter()
+    index.conflicts()
+    for combo in combos:
+        index.key_names(combo)
+    assert time.perf_counter() - start < 1.0
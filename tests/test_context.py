@@ -0,0 +1,93 @@
+"""Tests for concurrent conversions with per-call ConversionContexts."""
+
+import threading
+
+from converter.context import ConversionContext
+from converter.dts.extractor import KeymapExtractor
+from converter.dts.parser import DtsParser
+from converter.transformer.kanata_transformer import KanataTransformer
+
+DTS_TEMPLATE = """
+/ {{
+    combos {{
+        compatible = "zmk,combos";
+        combo_{n} {{
+            bindings = <&kp Z>;
+        }};
+    }};
+    keymap {{
+        compatible = "zmk,keymap";
+        layer_{n} {{
+            bindings = <&kp {key} &kp N{digit} &kp B>;
+        }};
+        other_{n} {{
+            bindings = <&kp C &trans &kp {key}>;
+        }};
+    }};
+}};
+"""
+
+THREADS = 64
+
+
+def _dts(n):
+    return DTS_TEMPLATE.format(n=n, key=chr(ord("A") + n % 26), digit=n % 10)
+
+
+def _convert(parser, extractor, transformer, n, context):
+    ast = parser.parse(_dts(n), context=context)
+    keymap = extractor.extract(ast, context=context)
+    return transformer.transform(keymap, context=context)
+
+
+def test_context_conversion_matches_plain_conversion():
+    """Converting with a context gives the same text as fresh stages."""
+    context = ConversionContext()
+    plain = KanataTransformer().transform(
+        KeymapExtractor().extract(DtsParser().parse(_dts(3)))
+    )
+    result = _convert(DtsParser(), KeymapExtractor(), KanataTransformer(), 3, context)
+
+    assert result == plain
+    assert [d.code for d in context.diagnostics] == ["combo-invalid"]
+
+
+def test_concurrent_conversions_are_isolated():
+    """64 threads share one set of stages; each result stays its own."""
+    parser, extractor, transformer = DtsParser(), KeymapExtractor(), KanataTransformer()
+    expected = {
+        n: _convert(parser, extractor, transformer, n, ConversionContext())
+        for n in range(THREADS)
+    }
+    results, contexts, failures = {}, {}, []
+    barrier = threading.Barrier(THREADS)
+
+    def worker(n):
+        context = ConversionContext()
+        contexts[n] = context
+        barrier.wait()
+        try:
+            # Several rounds so conversions overlap at different stages
+            for _ in range(3):
+                results[n] = _convert(parser, extractor, transformer, n, context)
+        except Exception as e:  # pragma: no cover - reported below
+            failures.append((n, e))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert failures == []
+    for n in range(THREADS):
+        assert results[n] == expected[n]
+        assert f"(deflayer layer_{n}\n" in results[n]
+        messages = [d.message for d in contexts[n].diagnostics]
+        assert messages == [
+            f"Skipping combo 'combo_{n}' due to missing/invalid properties."
+        ]
+    # The shared stages were never used directly
+    assert transformer.error_messages == []
+    assert extractor.layers == {}
+    assert parser.tokens == []
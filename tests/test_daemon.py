@@ -0,0 +1,138 @@
+"""Tests for the conversion daemon and its client."""
+
+import os
+import socket
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from converter.daemon import (
+    ConversionServer,
+    client_main,
+    convert,
+    default_socket_path,
+    is_trusted_socket,
+    request,
+)
+
+KEYMAP = """/ {
+    keymap {
+        compatible = "zmk,keymap";
+        default_layer {
+            bindings = <&kp A &kp B &mo 1>;
+        };
+        lower_layer {
+            bindings = <&kp N1 &kp N2 &trans>;
+        };
+    };
+};
+"""
+
+
+@pytest.fixture
+def server(tmp_path):
+    """Serve on a socket in tmp_path from a background thread."""
+    server = ConversionServer(str(tmp_path / "zk.sock"))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    thread.join()
+
+
+def test_daemon_round_trip(server, tmp_path):
+    """Path and content requests match in-process conversion."""
+    keymap = tmp_path / "main.keymap"
+    keymap.write_text(KEYMAP)
+    socket_path = server.socket_path
+    assert stat.S_IMODE(os.stat(socket_path).st_mode) == 0o600
+    assert request(socket_path, {"command": "ping"})["pid"] == os.getpid()
+
+    expected = convert({"path": str(keymap)}, str(tmp_path / "missing.sock"))
+    assert expected["ok"], expected
+    payloads = [{"path": str(keymap)}, {"content": KEYMAP}] * 8
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        responses = list(executor.map(lambda p: request(socket_path, p), payloads))
+    for response in responses:
+        assert response["ok"], response
+        assert response["config"] == expected["config"]
+
+    # A second server can't take over a live socket
+    with pytest.raises(OSError):
+        ConversionServer(socket_path)
+
+
+def test_daemon_reports_errors(server, tmp_path):
+    """Bad requests and failed conversions come back as error responses."""
+    response = request(server.socket_path, {"command": "reload"})
+    assert not response["ok"] and "unknown command" in response["error"]
+    response = request(server.socket_path, {"options": {}})
+    assert not response["ok"] and "'path' or 'content'" in response["error"]
+    response = request(server.socket_path, {"path": str(tmp_path / "no.keymap")})
+    assert not response["ok"] and response["error"]
+
+
+def test_client_falls_back_without_daemon(tmp_path, capsys):
+    """The client converts in-process when nothing listens on the socket."""
+    keymap = tmp_path / "main.keymap"
+    keymap.write_text(KEYMAP)
+    output = tmp_path / "out.kbd"
+    code = client_main(
+        [str(keymap), "-o", str(output), "--socket", str(tmp_path / "none.sock")]
+    )
+    assert code == 0
+    assert "deflayer" in output.read_text()
+
+
+def test_server_only_replaces_stale_sockets(tmp_path):
+    """A stale socket is replaced; any other file at the path is kept."""
+    path = tmp_path / "victim.txt"
+    path.write_text("keep me")
+    with pytest.raises(OSError, match="not a socket"):
+        ConversionServer(str(path))
+    assert path.read_text() == "keep me"
+
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(tmp_path / "stale.sock"))
+    stale.close()
+    server = ConversionServer(str(tmp_path / "stale.sock"))
+    server.server_close()
+
+
+def test_client_ignores_untrusted_socket(server, tmp_path, monkeypatch):
+    """A socket in a directory others can write to is never connected to."""
+    keymap = tmp_path / "main.keymap"
+    keymap.write_text(KEYMAP)
+    requests = []
+    monkeypatch.setattr(
+        "converter.daemon.request", lambda *args, **kwargs: requests.append(args)
+    )
+
+    os.chmod(tmp_path, 0o777)
+    try:
+        response = convert({"path": str(keymap)}, server.socket_path)
+    finally:
+        os.chmod(tmp_path, 0o700)
+    assert response["ok"] and "deflayer" in response["config"]
+    assert requests == []
+    assert not is_trusted_socket(str(keymap))
+
+
+def test_default_socket_path_is_private(tmp_path, monkeypatch):
+    """The default socket lives in $XDG_RUNTIME_DIR or a 0700 directory."""
+    monkeypatch.delenv("ZMK_KANATA_SOCKET", raising=False)
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path / "run"))
+    assert default_socket_path() == str(tmp_path / "run" / "zmk-kanata.sock")
+
+    monkeypatch.delenv("XDG_RUNTIME_DIR")
+    monkeypatch.setattr("tempfile.gettempdir", lambda: str(tmp_path))
+    path = default_socket_path()
+    server = ConversionServer(path)
+    try:
+        assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+        assert is_trusted_socket(path)
+    finally:
+        server.server_close()
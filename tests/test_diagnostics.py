@@ -0,0 +1,99 @@
+"""Tests for the structured diagnostics collector."""
+
+import json
+import threading
+
+from converter.error_handling.diagnostics import DiagnosticsCollector
+from converter.error_handling.error_manager import ErrorSeverity
+from converter.models import Behavior, Binding, KeymapConfig, Layer
+from converter.transformer.kanata_transformer import KanataTransformer
+
+
+def test_add_deduplicates_and_keeps_order():
+    """Identical diagnostics are recorded once, in first-seen order."""
+    diagnostics = DiagnosticsCollector()
+    assert diagnostics.warning("combo-invalid", "bad combo", path="/combos/c1")
+    assert diagnostics.error("binding-error", "bad binding")
+    assert not diagnostics.warning("combo-invalid", "bad combo", path="/combos/c1")
+
+    assert [d.code for d in diagnostics] == ["combo-invalid", "binding-error"]
+    assert diagnostics.count("combo-invalid") == 1
+    assert diagnostics.has_errors()
+
+
+def test_render_text_and_json():
+    """Diagnostics render to one text line each and to a JSON array."""
+    diagnostics = DiagnosticsCollector()
+    diagnostics.add(
+        "layer-invalid",
+        "missing bindings",
+        ErrorSeverity.WARNING,
+        path="/keymap/base",
+        line=3,
+        column=9,
+    )
+
+    assert diagnostics.render_text() == (
+        "warning[layer-invalid] /keymap/base:3:9: missing bindings"
+    )
+    assert json.loads(diagnostics.render_json()) == [
+        {
+            "code": "layer-invalid",
+            "severity": "warning",
+            "message": "missing bindings",
+            "path": "/keymap/base",
+            "line": 3,
+            "column": 9,
+        }
+    ]
+
+
+def test_concurrent_adds_are_not_lost():
+    """Threads sharing a collector record every distinct diagnostic."""
+    diagnostics = DiagnosticsCollector()
+
+    def worker(n):
+        for i in range(200):
+            diagnostics.warning("w", f"{n}-{i}")
+            diagnostics.warning("w", "shared")
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(diagnostics) == 8 * 200 + 1
+
+
+def test_transformer_summary_is_per_transform():
+    """Summary messages are grouped by code and reset for each transform."""
+    hm = Behavior(name="hm", type="hold-tap")
+    keymap = KeymapConfig(
+        layers=[
+            Layer(
+                name="base",
+                index=0,
+                bindings=[
+                    Binding(hm, ["A"]),
+                    Binding(hm, ["B"]),
+                    Binding(None, ["ERROR: broken"]),
+                ],
+            )
+        ],
+        behaviors={"hm": hm},
+    )
+    clean = KeymapConfig(layers=[Layer(name="base", index=0, bindings=[])])
+    transformer = KanataTransformer()
+
+    first = transformer.transform(keymap)
+    assert len(transformer.error_messages) == 3
+    second = transformer.transform(clean)
+
+    assert transformer.error_messages == []
+    assert "Unsupported/Unknown ZMK Features" not in second
+    assert (
+        "; Warning: Skipped hold-tap combo due to missing parameters (2 occurrences)"
+        in first
+    )
+    assert "; ERROR: broken" in first
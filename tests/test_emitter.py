@@ -0,0 +1,58 @@
+"""Tests for the streaming Kanata emitter."""
+
+import io
+
+from converter.models import Behavior, Binding, KeymapConfig, Layer
+from converter.output.emitter import KanataEmitter
+from converter.output.file_writer import AtomicOutput
+from converter.transformer.kanata_transformer import KanataTransformer
+
+
+def _keymap():
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    hm = Behavior(name="hm", type="hold-tap")
+    return KeymapConfig(
+        layers=[
+            Layer(
+                name="base",
+                index=0,
+                bindings=[Binding(kp, ["A"]), Binding(hm, ["LSHIFT", "B"])],
+            ),
+            Layer(name="lower", index=1, bindings=[Binding(None, ["ERROR: x"])]),
+        ],
+        behaviors={"kp": kp, "hm": hm},
+    )
+
+
+def test_emitter_sections():
+    """Sections are written as newline-terminated Kanata forms."""
+    buffer = io.StringIO()
+    emitter = KanataEmitter(buffer)
+    emitter.write_defcfg(["process-unmapped-keys yes"])
+    emitter.write_defvar("tap-time", 200)
+    emitter.write_layer("base", ["  a", "  b"])
+
+    assert buffer.getvalue() == (
+        "(defcfg\n  process-unmapped-keys yes\n)\n\n"
+        "(defvar tap-time 200)\n"
+        "(deflayer base\n  a\n  b\n)\n"
+    )
+
+
+def test_transform_to_matches_transform():
+    """Streaming to a file produces exactly the transform() text."""
+    expected = KanataTransformer().transform(_keymap())
+    buffer = io.StringIO()
+    KanataTransformer().transform_to(_keymap(), buffer)
+
+    assert buffer.getvalue() == expected
+    assert "(deflayer lower" in expected
+
+
+def test_atomic_output_creates_parent_dirs(tmp_path):
+    """AtomicOutput creates missing directories for the output file."""
+    path = tmp_path / "nested" / "out.kbd"
+    with AtomicOutput(path) as f:
+        KanataTransformer().transform_to(_keymap(), f)
+
+    assert path.read_text() == KanataTransformer().transform(_keymap())
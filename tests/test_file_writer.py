@@ -0,0 +1,71 @@
+"""Tests for atomic, write-if-changed output."""
+
+import os
+
+import pytest
+
+from converter.output.file_writer import (
+    AtomicOutput,
+    KanataFileWriter,
+    write_if_changed,
+)
+
+
+def _age(path):
+    """Move path's mtime into the past so a rewrite is detectable."""
+    os.utime(path, ns=(0, 0))
+
+
+def test_write_if_changed_skips_identical_content(tmp_path):
+    """Identical content is not rewritten unless forced."""
+    path = tmp_path / "out" / "kanata.kbd"
+    assert write_if_changed(path, "(defsrc a)\n")
+    os.chmod(path, 0o600)
+    _age(path)
+
+    assert not write_if_changed(path, "(defsrc a)\n")
+    assert os.stat(path).st_mtime_ns == 0
+    assert write_if_changed(path, "(defsrc a)\n", force=True)
+    assert os.stat(path).st_mtime_ns != 0
+
+    assert write_if_changed(path, "(defsrc b)\n")
+    assert path.read_text() == "(defsrc b)\n"
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    assert os.listdir(path.parent) == ["kanata.kbd"]
+
+
+def test_atomic_output_streams_into_place(tmp_path):
+    """Streamed output replaces the target only when its content changed."""
+    path = tmp_path / "kanata.kbd"
+    output = AtomicOutput(path)
+    with output as f:
+        f.write("(defsrc a)\n")
+    assert output.changed and path.read_text() == "(defsrc a)\n"
+    _age(path)
+
+    output = AtomicOutput(path)
+    with output as f:
+        f.write("(defsrc a)\n")
+    assert not output.changed and os.stat(path).st_mtime_ns == 0
+
+    # A failure keeps the previous file
+    with pytest.raises(RuntimeError):
+        with AtomicOutput(path) as f:
+            f.write("(defsrc")
+            raise RuntimeError("transform failed")
+    assert path.read_text() == "(defsrc a)\n"
+    assert os.listdir(tmp_path) == ["kanata.kbd"]
+
+
+def test_file_writer_force(tmp_path):
+    """KanataFileWriter compares large files and honours force."""
+    path = tmp_path / "kanata.kbd"
+    content = "(defsrc a)\n" * 20_000  # several hash chunks
+    writer = KanataFileWriter()
+    assert writer.write(content, path)
+    _age(path)
+
+    assert not writer.write(content, path)
+    assert os.stat(path).st_mtime_ns == 0
+    assert writer.write(content, path, force=True)
+    assert os.stat(path).st_mtime_ns != 0
@@ -0,0 +1,104 @@
+"""Unit tests for converter/model/frozen.py."""
+
+import pytest
+from dataclasses import FrozenInstanceError
+
+from converter.behaviors.unicode import UnicodeBinding
+from converter.model.frozen import (
+    FrozenBinding,
+    FrozenKeymapConfig,
+    FrozenUnicodeBinding,
+    freeze_keymap,
+)
+from converter.model import keymap_model
+from converter.models import (
+    Behavior,
+    Binding,
+    Combo,
+    ConditionalLayer,
+    KeyMapping,
+    KeymapConfig,
+    Layer,
+)
+
+
+def _keymap():
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    return KeymapConfig(
+        layers=[
+            Layer(
+                name="base",
+                index=0,
+                bindings=[
+                    Binding(kp, ["A"]),
+                    Binding(kp, ["A"]),
+                    UnicodeBinding("π"),
+                ],
+            ),
+            Layer(name="lower", index=1, bindings=[Binding(kp, ["A"])]),
+        ],
+        behaviors={"kp": kp},
+        combos=[Combo("esc", 50, [0, 1], Binding(kp, ["ESC"]))],
+        conditional_layers=[ConditionalLayer("tri", [0, 1], 2)],
+    )
+
+
+def test_freeze_converts_containers_and_interns_bindings():
+    """freeze() returns tuples and shares equal bindings."""
+    frozen = _keymap().freeze()
+
+    assert isinstance(frozen, FrozenKeymapConfig)
+    base, lower = frozen.layers
+    assert base.bindings[0] is base.bindings[1] is lower.bindings[0]
+    assert base.bindings[0].params == ("A",)
+    assert isinstance(base.bindings[2], FrozenUnicodeBinding)
+    assert base.bindings[2].character == "π"
+    assert frozen.combos[0].key_positions == (0, 1)
+    assert frozen.conditional_layers[0].if_layers == (0, 1)
+    assert frozen.freeze() is frozen
+
+
+def test_frozen_models_are_hashable_and_immutable():
+    """Frozen configs hash by content and reject mutation."""
+    first, second = _keymap().freeze(), _keymap().freeze()
+
+    assert first == second
+    assert hash(first) == hash(second)
+    assert len({first.layers[0].bindings[0], FrozenBinding(None, ("A",))}) == 2
+    assert not hasattr(first.layers[0], "__dict__")
+    with pytest.raises(FrozenInstanceError):
+        first.layers[0].name = "other"
+    with pytest.raises(TypeError):
+        first.behaviors["kp"] = None
+
+
+def test_freeze_accepts_both_model_modules():
+    """Both KeymapConfig flavors freeze to the same representation."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    legacy = keymap_model.KeymapConfig(
+        layers=[
+            keymap_model.Layer(name="base", index=0, bindings=[Binding(kp, ["A"])])
+        ],
+        behaviors={"kp": kp},
+    )
+    current = KeymapConfig(
+        layers=[Layer(name="base", index=0, bindings=[Binding(kp, ["A"])])],
+        behaviors={"kp": kp},
+    )
+
+    assert legacy.freeze() == current.freeze()
+
+
+def test_freeze_rejects_unsupported_bindings():
+    """Bindings with extra state are not silently flattened."""
+    keymap = KeymapConfig(
+        layers=[
+            Layer(
+                name="base",
+                index=0,
+                bindings=[KeyMapping(behavior=None, params=[], key="A")],
+            )
+        ]
+    )
+    with pytest.raises(TypeError):
+        freeze_keymap(keymap)
@@ -233,7 +233,7 @@ def test_kanata_transformer_malformed_macro():
     from converter.model.keymap_model import Binding, Layer, KeymapConfig
     from converter.transformer.kanata_transformer import KanataTransformer
 
-    for macro in ["LS()", "LS(LA())", "LS(A", "LS LA(A)"]:
+    for macro in ["LS()", "LS(LA())", "LS(A", "LS LA(A)", "LS (A)", "LC (A"]:
         binding = Binding(behavior=None, params=[macro])
         layer = Layer(name="default", index=0, bindings=[binding])
         keymap = KeymapConfig(layers=[layer])
@@ -124,14 +124,20 @@ def parse_and_transform(zmk_str):
 
 def test_complex_combo_todo(capsys):
     """Test that complex combos emit a TODO or unsupported comment."""
-    kanata = parse_and_transform(ZMK_COMPLEX_COMBO)
+    extractor = KeymapExtractor()
+    keymap = extractor.extract(DtsParser().parse(ZMK_COMPLEX_COMBO))
+    kanata = KanataTransformer().transform(keymap)
 
     captured = capsys.readouterr()
+    assert "Skipping combo" not in captured.out
 
+    (diagnostic,) = extractor.diagnostics.diagnostics
+    assert diagnostic.code == "combo-invalid"
+    assert diagnostic.path == "/combos/combo1"
     assert (
-        "Skipping combo 'combo1'" in captured.out
-        and "missing/invalid properties" in captured.out
-    ), "Expected warning about skipping combo was not printed to stdout"
+        "Skipping combo 'combo1'" in diagnostic.message
+        and "missing/invalid properties" in diagnostic.message
+    ), "Expected warning about skipping combo was not recorded"
 
     assert "unsupported: combo 'combo1'" not in kanata
     assert "(deflayer default_layer" in kanata
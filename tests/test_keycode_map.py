@@ -0,0 +1,100 @@
+"""Unit tests for converter/transformer/keycode_map.py."""
+
+import pytest
+
+from converter.transformer.keycode_map import (
+    ModifierExpression,
+    parse_modifier_expression,
+    zmk_to_kanata,
+)
+from converter.transformer.keycode_registry import (
+    REVERSE_KEY_MAP,
+    USAGE_TO_ZMK,
+    ZMK_TO_KANATA,
+    usage_hex,
+)
+from converter.transformer.macro_transformer import MacroTransformer
+
+
+def test_parse_modifier_expression():
+    """Nested modifier expressions parse into modifiers and a key."""
+    assert parse_modifier_expression("LS(A)") == ModifierExpression(("ls",), "A")
+    assert parse_modifier_expression("LS( LC(N1) )") == ModifierExpression(
+        ("ls", "lc"), "N1"
+    )
+    assert parse_modifier_expression("LSHIFT") is None
+    assert parse_modifier_expression("LS (A)") is None
+    for malformed in ("LS()", "LS(A", "LS(A))", "LS(A)(B)", "LS(XX(A))"):
+        with pytest.raises(ValueError):
+            parse_modifier_expression(malformed)
+
+
+@pytest.mark.parametrize(
+    "key, expected",
+    [
+        ("LS(A)", "ls(a)"),
+        ("LS(LC(A))", "ls(lc(a))"),
+        ("RA(LG(N1))", "ra(lg(1))"),
+        ("LS()", "ERROR: malformed or unknown macro: LS()"),
+        ("LS(A", "ERROR: malformed or unknown macro: LS(A"),
+        ("XX(A)", "ERROR: malformed or unknown macro: XX(A)"),
+        ("LS(FOO)", "ERROR: malformed or unknown macro: LS(FOO)"),
+        ("FOO", None),
+    ],
+)
+def test_zmk_to_kanata_modifier_macros(key, expected):
+    """Modifier macros map to nested Kanata modifiers or an error."""
+    assert zmk_to_kanata(key) == expected
+
+
+@pytest.mark.parametrize(
+    "key, expected",
+    [
+        ("0x04", "a"),
+        ("4", "a"),
+        ("0x02000004", "ls(a)"),
+        ("0x02070004", "ls(a)"),
+        ("0x03070004", "ls(lc(a))"),
+        ("0x40070027", "ra(0)"),
+        ("0x0C00E9", "; TODO: Unknown numeric keycode: 0x0C00E9"),
+    ],
+)
+def test_zmk_to_kanata_numeric_codes(key, expected):
+    """Numeric keycodes decode the HID usage and ZMK modifier bits."""
+    assert zmk_to_kanata(key) == expected
+
+
+def test_registry_tables_are_shared_and_read_only():
+    """Consumers share the registry tables, which can't be modified."""
+    macro = MacroTransformer()
+    assert macro.key_map is ZMK_TO_KANATA
+    assert macro.reverse_key_map is REVERSE_KEY_MAP
+    with pytest.raises(TypeError):
+        ZMK_TO_KANATA["A"] = "b"
+
+
+def test_registry_aliases_and_reverse_lookups():
+    """Aliases share a usage and reverse lookups return the canonical name."""
+    assert ZMK_TO_KANATA["DELETE"] == ZMK_TO_KANATA["DEL"] == "del"
+    assert REVERSE_KEY_MAP["76"] == REVERSE_KEY_MAP["0x4C"] == "DEL"
+    assert USAGE_TO_ZMK[0x1E] == "N1"
+    assert usage_hex("N0") == "0x27"
+    assert usage_hex("NUMBER_0") == "0x27"
+    assert usage_hex("C_MUTE") is None
+
+
+def test_registry_covers_high_keyboard_usages():
+    """Usages past the keypad resolve by name and by usage id."""
+    assert usage_hex("NON_US_HASH") == "0x32"
+    assert usage_hex("NON_US_BSLH") == "0x64"
+    assert usage_hex("F24") == "0x73"
+    assert usage_hex("INT_YEN") == "0x89"
+    assert usage_hex("LANG_HANJA") == "0x91"
+    assert USAGE_TO_ZMK[0x68] == "F13"
+    assert REVERSE_KEY_MAP["0x80"] == "K_VOLUME_UP"
+    assert zmk_to_kanata("F13") == "f13"
+    assert zmk_to_kanata("0x73") == "f24"
+    assert zmk_to_kanata("K_MUTE") == "mute"
+    # Keys Kanata has no name for are only in the usage tables
+    assert usage_hex("K_UNDO") == "0x7A"
+    assert "K_UNDO" not in ZMK_TO_KANATA
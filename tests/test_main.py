@@ -1,5 +1,7 @@
 """Integration tests for the main converter script (converter/main.py)."""
 
+import json
+import pstats
 import pytest
 import subprocess
 from pathlib import Path
@@ -120,6 +122,88 @@ def test_main_with_include(dts_with_include_files: Path, tmp_path: Path):
     assert result.stderr == ""
 
 
+def test_main_validate(simple_dts_file: Path, tmp_path: Path):
+    """Test --validate accepts good output and rejects mismatched layers."""
+    output_file = tmp_path / "output.kanata"
+    result = run_main_script(
+        [str(simple_dts_file), "-o", str(output_file), "--validate"]
+    )
+    assert result.returncode == 0
+    assert "error[kbd-" not in result.stderr
+
+    uneven = tmp_path / "uneven.keymap"
+    uneven.write_text(SIMPLE_DTS.replace("&kp C &kp D", "&kp C"))
+    result = run_main_script([str(uneven), "--validate"])
+    assert result.returncode == 1
+    assert "error[kbd-layer-size]" in result.stderr
+
+
+def test_main_skips_unchanged_output(simple_dts_file: Path, tmp_path: Path):
+    """Test identical output is not rewritten unless --force-write is given."""
+    output_file = tmp_path / "output.kanata"
+    args = [str(simple_dts_file), "-o", str(output_file)]
+    assert run_main_script(args).returncode == 0
+    os.utime(output_file, ns=(0, 0))
+
+    assert run_main_script(args).returncode == 0
+    assert output_file.stat().st_mtime_ns == 0
+    assert run_main_script(args + ["--force-write"]).returncode == 0
+    assert output_file.stat().st_mtime_ns != 0
+
+
+def test_main_keeps_output_when_transform_fails(
+    simple_dts_file: Path, tmp_path: Path, monkeypatch
+):
+    """Test a failed transform leaves the previous output file untouched."""
+    from converter.main import main
+    from converter.transformer.kanata_transformer import KanataTransformer
+
+    output_file = tmp_path / "output.kanata"
+    args = [str(simple_dts_file), "-o", str(output_file)]
+    assert main(args) == 0
+    good = output_file.read_text()
+    os.utime(output_file, ns=(0, 0))
+
+    def fail(self, keymap, stream, context=None):
+        stream.write("(defcfg\n")
+        raise RuntimeError("boom")
+
+    monkeypatch.setattr(KanataTransformer, "transform_to", fail)
+    assert main(args + ["--force-write"]) == 1
+    assert output_file.read_text() == good
+    assert output_file.stat().st_mtime_ns == 0
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_main_stats_and_profile(simple_dts_file: Path, tmp_path: Path):
+    """Test --stats writes the metrics document and --profile saves pstats data."""
+    stats_file = tmp_path / "stats.json"
+    profile_file = tmp_path / "profile.out"
+    output_file = tmp_path / "output.kanata"
+    result = run_main_script(
+        [
+            str(simple_dts_file),
+            "-o",
+            str(output_file),
+            f"--stats={stats_file}",
+            f"--profile={profile_file}",
+        ]
+    )
+    assert result.returncode == 0, result.stderr
+
+    stats = json.loads(stats_file.read_text())
+    assert stats["bytes_in"] == simple_dts_file.stat().st_size
+    assert stats["bytes_out"] == output_file.stat().st_size
+    assert stats["layers"] == 2
+    assert stats["bindings"] == 4
+    assert stats["distinct_bindings"] == 4
+    assert stats["tokens"] > 0 and stats["nodes"] == 4
+    assert stats["peak_memory_bytes"] > 0
+    assert list(stats["stages"]) == ["preprocess", "parse", "extract", "transform"]
+    assert 0.0 <= stats["cache"]["binding"]["hit_rate"] <= 1.0
+    assert pstats.Stats(str(profile_file)).total_calls > 0
+
+
 def test_main_input_file_not_found(tmp_path: Path):
     """Test error handling for non-existent input file."""
     non_existent_file = tmp_path / "does_not_exist.keymap"
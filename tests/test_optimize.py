@@ -0,0 +1,171 @@
+"""Tests for the output optimization passes."""
+
+from converter.behaviors.macro import MacroBehavior
+from converter.models import Behavior, Binding, KeymapConfig, Layer
+from converter.transformer.kanata_transformer import KanataTransformer
+from converter.transformer.optimize import (
+    alias_name,
+    find_duplicate_layers,
+    hoist_repeated_actions,
+    rewrite_layer_refs,
+)
+
+TAP_DANCE = "(tap-dance 200 esc caps tab)"
+STICKY = "(one-shot 500 (layer-while-held 1))"
+
+
+def test_hoist_repeated_actions():
+    """Repeated compound actions become aliases when that saves space."""
+    layers = [
+        [f"  {TAP_DANCE}", "  a", f"  {STICKY}"],
+        [f"  {TAP_DANCE}", "  (layer-toggle 2)", f"  {STICKY}"],
+        [f"  {TAP_DANCE}", "; comment", f"  {STICKY}"],
+    ] * 4
+    hoisted = hoist_repeated_actions(layers)
+
+    assert hoisted.aliases == [
+        ("lt_2", "(layer-toggle 2)"),
+        ("os_500_lwh_1", STICKY),
+        ("td_200_esc_caps_tab", TAP_DANCE),
+    ]
+    assert hoisted.layers[1] == [
+        "  @td_200_esc_caps_tab",
+        "  @lt_2",
+        "  @os_500_lwh_1",
+    ]
+    assert hoisted.layers[2][1] == "; comment"
+
+
+def test_alias_names_are_stable_and_collision_free():
+    """Taken names get a hash suffix derived from the action only."""
+    first = alias_name(TAP_DANCE, {"td_200_esc_caps_tab"})
+    assert first.startswith("td_200_esc_caps_tab_")
+    assert alias_name(TAP_DANCE, {"td_200_esc_caps_tab"}) == first
+    assert alias_name('(unicode "π")', set()) == "u"
+
+    toggle = "(layer-toggle 0)"
+    hoisted = hoist_repeated_actions([[toggle]] * 12, reserved={"lt_0"})
+    assert hoisted.aliases == [(alias_name(toggle, {"lt_0"}), toggle)]
+    assert hoisted.aliases[0][0].startswith("lt_0_")
+
+
+def test_transformer_hoists_aliases():
+    """hoist_aliases defines repeated actions once and references them."""
+    td = Behavior(name="td_esc", type="zmk,behavior-tap-dance")
+    tog = Behavior(name="tog", type="zmk,behavior-toggle-layer")
+    layers = [
+        Layer(
+            name=f"layer_{i}",
+            index=i,
+            bindings=[Binding(td, ["ESC", "CAPS", "TAB"]), Binding(tog, ["0"])],
+        )
+        for i in range(12)
+    ]
+    keymap = KeymapConfig(layers=layers, behaviors={"td_esc": td, "tog": tog})
+
+    plain = KanataTransformer().transform(keymap)
+    hoisted = KanataTransformer(hoist_aliases=True).transform(keymap)
+
+    assert plain.count(TAP_DANCE) == 12
+    assert hoisted.count(TAP_DANCE) == 1
+    assert hoisted.count("  @td_200_esc_caps_tab") == 12
+    assert hoisted.count("  @lt_0") == 12
+    assert hoisted.index("  td_200_esc_caps_tab (") < hoisted.index("(deflayer layer_0")
+    assert len(hoisted) < len(plain)
+
+
+def test_hoisting_skips_actions_that_do_not_pay_off():
+    """An action used twice is kept inline when an alias would be longer."""
+    hoisted = hoist_repeated_actions([[f"  {TAP_DANCE}"]] * 2)
+
+    assert hoisted.aliases == []
+    assert hoisted.layers == [[f"  {TAP_DANCE}"]] * 2
+
+
+def test_find_duplicate_layers_and_rewrite_refs():
+    """Later identical layers map to the first; layer actions are redirected."""
+    duplicates = find_duplicate_layers(
+        [("base", ["  a"]), ("nav", ["  _"]), ("copy", ["  a"]), ("nav2", ["  _"])]
+    )
+    assert duplicates == {"copy": "base", "nav2": "nav"}
+
+    rows = ["  (layer-toggle nav2)", "  (one-shot 500 (layer-while-held 3))", "  x"]
+    assert rewrite_layer_refs(rows, {"nav2": "nav", "3": "1"}) == [
+        "  (layer-toggle nav)",
+        "  (one-shot 500 (layer-while-held 1))",
+        "  x",
+    ]
+
+
+def test_transformer_dedups_layers_and_macros():
+    """Duplicate layers are omitted and duplicate macros become aliases."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    tog = Behavior(name="tog", type="zmk,behavior-toggle-layer")
+    copy_a = MacroBehavior(name="copy_a", bindings=["&kp LCTRL", "&kp C"])
+    copy_b = MacroBehavior(name="copy_b", bindings=["&kp LCTRL", "&kp C"])
+    copy_a.type = copy_b.type = "macro"
+    layers = [
+        Layer(
+            name="base",
+            index=0,
+            bindings=[Binding(tog, ["2"]), Binding(copy_b, [])],
+        ),
+        *(
+            Layer(
+                name=name,
+                index=index,
+                bindings=[Binding(kp, ["LEFT"]), Binding(kp, ["A"])],
+            )
+            for index, name in ((1, "nav"), (2, "nav2"))
+        ),
+    ]
+    keymap = KeymapConfig(
+        layers=layers,
+        behaviors={"kp": kp, "tog": tog, "copy_a": copy_a, "copy_b": copy_b},
+    )
+
+    plain = KanataTransformer().transform(keymap)
+    deduped = KanataTransformer(dedup=True).transform(keymap)
+
+    assert plain.count("(defmacro ") == 2
+    assert deduped.count("(defmacro ") == 1
+    assert "(defalias copy_b" not in deduped
+    assert "; defmacro copy_b omitted: identical to copy_a" in deduped
+    assert "(deflayer nav2" not in deduped
+    assert "; deflayer nav2 omitted: identical to nav" in deduped
+    assert "  (layer-toggle 1)\n  (macro copy_a)\n" in deduped
+
+
+def test_dedup_renumbers_later_layer_refs():
+    """Index references to layers after a dropped one follow its removal."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    sl = Behavior(name="sl", type="zmk,behavior-sticky-layer")
+    tog = Behavior(name="tog", type="zmk,behavior-toggle-layer")
+    nav = [Binding(kp, ["LEFT"]), Binding(kp, ["RIGHT"])]
+    layers = [
+        Layer(
+            name="base",
+            index=0,
+            bindings=[Binding(sl, ["1"]), Binding(sl, ["2"]), Binding(tog, ["3"])],
+        ),
+        Layer(name="nav", index=1, bindings=nav),
+        Layer(name="nav2", index=2, bindings=nav),
+        Layer(
+            name="num",
+            index=3,
+            bindings=[Binding(kp, ["N1"]), Binding(sl, ["3"]), Binding(tog, ["0"])],
+        ),
+    ]
+    keymap = KeymapConfig(layers=layers, behaviors={"kp": kp, "sl": sl, "tog": tog})
+
+    deduped = KanataTransformer(dedup=True).transform(keymap)
+
+    assert "(deflayer nav2" not in deduped
+    # num is now the third deflayer, at index 2
+    assert (
+        "(deflayer base\n"
+        "  (one-shot 500 (layer-while-held 1))\n"
+        "  (one-shot 500 (layer-while-held 1))\n"
+        "  (layer-toggle 2)\n)"
+    ) in deduped
+    assert "  (one-shot 500 (layer-while-held 2))\n  (layer-toggle 0)\n)" in deduped
@@ -0,0 +1,44 @@
+"""Tests for parallel layer rendering."""
+
+from converter.models import Behavior, Binding, KeymapConfig, Layer
+from converter.transformer.kanata_transformer import KanataTransformer
+from converter.transformer.parallel import render_layer_chunk
+
+
+def _keymap(num_layers=12):
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    hm = Behavior(name="hm", type="hold-tap")
+    layers = []
+    for index in range(num_layers):
+        bindings = [
+            Binding(kp, [chr(ord("A") + index % 26)]),
+            Binding(hm, ["LSHIFT", "B"]),
+            Binding(None, [f"ERROR: bad key {index % 3}"]),
+        ]
+        layers.append(Layer(name=f"layer_{index}", index=index, bindings=bindings))
+    return KeymapConfig(layers=layers, behaviors={"kp": kp, "hm": hm})
+
+
+def test_parallel_matches_serial():
+    """Parallel rendering gives the serial output and diagnostics."""
+    serial = KanataTransformer()
+    parallel = KanataTransformer(workers=3)
+
+    assert parallel.transform(_keymap()) == serial.transform(_keymap())
+    assert parallel.error_messages == serial.error_messages
+    assert [d.message for d in parallel.diagnostics] == [
+        d.message for d in serial.diagnostics
+    ]
+    stats = parallel.cache_stats()
+    assert stats.hits + stats.misses == 24  # hold-taps bypass the cache
+
+
+def test_render_layer_chunk_captures_records():
+    """Each rendered layer carries the records made while rendering it."""
+    keymap = _keymap(2)
+    chunk = render_layer_chunk({}, [], keymap.layers)
+
+    assert [len(layer.records) for layer in chunk.layers] == [1, 1]
+    assert chunk.layers[0].rows[0] == "  a"
+    assert chunk.layers[1].error is None
+    assert chunk.misses == 4
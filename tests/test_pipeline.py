@@ -0,0 +1,67 @@
+"""Tests for the staged conversion pipeline."""
+
+import io
+
+from converter.model.frozen import FrozenKeymapConfig
+from converter.models import KeymapConfig
+from converter.pipeline import STAGES, Pipeline
+from converter.transformer.transformer import Transformer
+
+KEYMAP = """/ {
+    keymap {
+        compatible = "zmk,keymap";
+        default_layer {
+            bindings = <&kp A &kp B>;
+        };
+    };
+};
+"""
+
+
+def test_pipeline_runs_stages_with_timings_and_hooks(tmp_path):
+    """Every stage runs once, in order, with hooks around it."""
+    keymap = tmp_path / "main.keymap"
+    keymap.write_text(KEYMAP)
+    pipeline = Pipeline()
+    calls = []
+    pipeline.add_hook("before", lambda stage, run: calls.append(("before", stage)))
+    pipeline.add_hook(
+        "after", lambda stage, run: calls.append(("after", stage, stage in run.timings))
+    )
+
+    run = pipeline.run(str(keymap), until="extract")
+    assert run.completed == ["preprocess", "parse", "extract"]
+    assert isinstance(run.keymap, FrozenKeymapConfig)
+    mutable = Pipeline(freeze=False).run(str(keymap), until="extract").keymap
+    assert isinstance(mutable, KeymapConfig) and mutable.freeze() == run.keymap
+    assert run.config is None
+    stream = io.StringIO()
+    pipeline.resume(run, output=stream)
+
+    assert run.completed == list(STAGES)
+    assert calls == [
+        call for stage in STAGES for call in [("before", stage), ("after", stage, True)]
+    ]
+    for timing in run.timings.values():
+        assert timing.wall >= 0 and timing.cpu >= 0
+        assert isinstance(timing.allocations, int)
+    assert "(deflayer default_layer" in stream.getvalue()
+
+
+def test_pipeline_stages_are_pluggable(tmp_path):
+    """A replacement stage receives the previous stage's output."""
+
+    class UpperTransformer:
+        def transform(self, keymap, context=None):
+            return ",".join(layer.name.upper() for layer in keymap.layers)
+
+    pipeline = Pipeline(transformer=UpperTransformer())
+    run = pipeline.start(None, preprocessed=KEYMAP)
+    assert pipeline.resume(run).config == "DEFAULT_LAYER"
+    assert run.stage == "transform"
+
+
+def test_transformer_transform_returns_kanata_config():
+    """Transformer.transform converts preprocessed DTS text."""
+    outputs = Transformer().transform(KEYMAP)
+    assert "(deflayer default_layer" in outputs["kanata"]
@@ -1,4 +1,14 @@
-from converter.behaviors.unicode import UnicodeBinding, is_unicode_binding
+from converter.behaviors.unicode import (
+    UnicodeBinding,
+    UnicodeRegistry,
+    is_unicode_binding,
+)
+from converter.dts.extractor import KeymapExtractor
+from converter.dts.parser import DtsParser
+from converter.model.frozen import freeze_keymap
+from converter.models import Behavior
+from converter.output.validator import validate_kanata
+from converter.transformer.kanata_transformer import KanataTransformer
 
 
 def test_unicodebinding_init_and_to_kanata():
@@ -58,3 +68,107 @@ def test_unicodebinding_to_kanata_platform(monkeypatch):
         ub.to_kanata()
         == "; WARNING: Unicode output is only supported on macOS (darwin). Unicode 'π' not emitted."
     )
+
+
+UNICODE_KEYMAP = """
+/ {
+    behaviors {
+        uni_pi: uni_pi {
+            compatible = "zmk,behavior-unicode";
+            unicode = <0x03C0>;
+        };
+        euro: euro {
+            compatible = "zmk,behavior-macro";
+            #binding-cells = <0>;
+            bindings = <&macro_press &kp LALT>,
+                       <&macro_tap &kp N2 &kp N0 &kp A &kp C>,
+                       <&macro_release &kp LALT>;
+        };
+        ae_lower: ae_lower {
+            compatible = "zmk,behavior-macro";
+            #binding-cells = <0>;
+            bindings = <&macro_tap &kp LS(LC(U)) &kp N0 &kp N0 &kp E &kp N6 &kp SPACE>;
+        };
+        ae_upper: ae_upper {
+            compatible = "zmk,behavior-macro";
+            #binding-cells = <0>;
+            bindings = <&macro_tap &kp LS(LC(U)) &kp N0 &kp N0 &kp C &kp N6 &kp SPACE>;
+        };
+        ae: ae {
+            compatible = "zmk,behavior-mod-morph";
+            #binding-cells = <0>;
+            bindings = <&ae_lower>, <&ae_upper>;
+            mods = <(MOD_LSFT|MOD_RSFT)>;
+        };
+        cafe: cafe {
+            compatible = "zmk,behavior-macro";
+            #binding-cells = <0>;
+            bindings = <&macro_tap &kp C &kp A &kp F &kp E>;
+        };
+        pipe: pipe {
+            compatible = "zmk,behavior-macro";
+            #binding-cells = <0>;
+            bindings = <&macro_tap &kp PIPE>;
+        };
+    };
+
+    keymap {
+        compatible = "zmk,keymap";
+        default_layer {
+            bindings = <&uni_pi &euro &ae &cafe &pipe &pi &unicode_foo &kp A>;
+        };
+    };
+};
+"""
+
+
+def test_registry_resolves_keymap_code_points():
+    extractor = KeymapExtractor()
+    config = extractor.extract(DtsParser().parse(UNICODE_KEYMAP))
+    registry = UnicodeRegistry.from_behaviors(config.behaviors)
+
+    assert registry.get("uni_pi") == "π"
+    assert registry.get("euro") == "€"
+    assert registry.get("ae") == "æ"
+    assert registry.shifted["ae"] == "Æ"
+    assert "cafe" not in registry
+    assert "pipe" not in registry
+
+
+def test_extractor_dispatches_unicode_by_behavior_name():
+    config = KeymapExtractor().extract(DtsParser().parse(UNICODE_KEYMAP))
+    bindings = config.layers[0].bindings
+
+    assert [getattr(b, "character", None) for b in bindings] == [
+        "π",
+        "€",
+        "æ",
+        None,
+        None,
+        "π",
+        "?",
+        None,
+    ]
+    assert bindings[4].behavior.name == "pipe"
+
+
+def test_keymap_behavior_shadows_builtin_unicode_name():
+    registry = UnicodeRegistry.from_behaviors({"pi": Behavior(name="pi")})
+    assert "pi" not in registry
+    assert registry.get("n_tilde") == "ñ"
+
+
+def test_unicode_pair_emits_shifted_character(monkeypatch):
+    config = KeymapExtractor().extract(DtsParser().parse(UNICODE_KEYMAP))
+    assert config.layers[0].bindings[2].shifted == "Æ"
+
+    monkeypatch.setattr("sys.platform", "darwin")
+    pair = '(fork (unicode "æ") (unicode "Æ") (lsft rsft))'
+    for keymap in (config, freeze_keymap(config)):
+        output = KanataTransformer().transform(keymap)
+        assert pair in output
+        assert '(unicode "π")' in output
+        assert validate_kanata(output) == []
+
+    monkeypatch.setattr("sys.platform", "linux")
+    assert "'æ' / shifted 'Æ'" in UnicodeBinding("æ", "Æ").to_kanata()
@@ -0,0 +1,134 @@
+"""Tests for the in-process Kanata configuration validator."""
+
+import os
+
+import pytest
+
+from converter.error_handling.error_manager import ErrorSeverity
+from converter.main import convert_zmk_to_kanata
+from converter.models import Behavior, Binding, KeymapConfig, Layer
+from converter.output.validator import read_sexprs, validate_file, validate_kanata
+from converter.transformer.kanata_transformer import KanataTransformer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+VALID = """
+(defcfg process-unmapped-keys yes)
+(defvar tap-time 200)
+(defsrc a b c)
+(defalias
+  nav (layer-while-held nav)
+  hm (tap-hold $tap-time 200 a lsft)
+  esc (tap-dance 200 (esc caps))
+)
+#| block comment (with parens |#
+(defmacro hello h e)
+(deflayer base @hm @nav (macro hello)) ; trailing comment
+(deflayer nav _ XX (one-shot 500 lctl))
+"""
+
+
+def _codes(text):
+    return [d.code for d in validate_kanata(text)]
+
+
+def test_valid_config_has_no_diagnostics():
+    """A configuration using the supported subset validates cleanly."""
+    assert validate_kanata(VALID) == []
+
+
+def test_read_sexprs_nesting_and_paren_errors():
+    """Lists nest, and stray or unclosed parentheses are reported."""
+    forms, problems = read_sexprs('(a (b "c d") e)')
+    assert problems == []
+    assert [item.value for item in forms[0].items if hasattr(item, "value")] == [
+        "a",
+        "e",
+    ]
+    assert forms[0].items[1].items[1].value == '"c d"'
+
+    _, problems = read_sexprs("(a (b)\n) )")
+    assert [(code, offset) for code, _, offset in problems] == [("kbd-paren", 9)]
+    _, problems = read_sexprs("(deflayer base a")
+    assert [code for code, _, _ in problems] == ["kbd-paren"]
+
+
+def test_undefined_references():
+    """Aliases, layers and macros must be defined somewhere in the file."""
+    text = """
+(defsrc a b c)
+(deflayer base @missing (layer-switch nowhere) (macro nomacro))
+(defmacro other a)
+"""
+    diagnostics = validate_kanata(text, path="out.kbd")
+
+    assert [d.code for d in diagnostics] == [
+        "kbd-undefined-alias",
+        "kbd-undefined-layer",
+        "kbd-undefined-macro",
+    ]
+    assert all(d.severity == ErrorSeverity.ERROR for d in diagnostics)
+    assert diagnostics[0].location == "out.kbd:3:16"
+
+
+def test_layer_size_and_unknown_names():
+    """Layer sizes are checked against defsrc and key names against the map."""
+    text = "(defsrc a b)\n(deflayer base a)\n(deflayer x a LSHFT)\n(foo)\n"
+    diagnostics = validate_kanata(text)
+
+    assert [(d.code, d.severity) for d in diagnostics] == [
+        ("kbd-layer-size", ErrorSeverity.ERROR),
+        ("kbd-unknown-key", ErrorSeverity.WARNING),
+        ("kbd-unknown-form", ErrorSeverity.WARNING),
+    ]
+    # Without defsrc, layers are compared against the first one
+    text = "(deflayer a x y)\n(deflayer b x)"
+    assert _codes(text) == ["kbd-layer-size"]
+    assert [d.code for d in validate_kanata(text, require_defsrc=True)] == [
+        "kbd-missing-defsrc",
+        "kbd-layer-size",
+    ]
+    # Kanata expects tap-dance actions as one list
+    assert _codes("(defalias td (tap-dance 200 a b))") == ["kbd-syntax"]
+
+
+def test_generated_output_validates(tmp_path):
+    """Transformer output for named layer references passes validation."""
+    kp = Behavior(name="kp", type="zmk,behavior-key-press")
+    mo = Behavior(name="mo", type="zmk,behavior-momentary-layer")
+    keymap = KeymapConfig(
+        layers=[
+            Layer(
+                name="base", index=0, bindings=[Binding(kp, ["A"]), Binding(mo, ["1"])]
+            ),
+            Layer(
+                name="nav", index=1, bindings=[Binding(kp, ["LEFT"]), Binding(kp, [])]
+            ),
+        ],
+        behaviors={"kp": kp, "mo": mo},
+    )
+    path = tmp_path / "out.kbd"
+    path.write_text(KanataTransformer().transform(keymap))
+
+    assert validate_file(str(path)) == []
+    diagnostics = validate_file(str(path), require_defsrc=True)
+    assert [d.code for d in diagnostics] == ["kbd-missing-defsrc"]
+    assert diagnostics[0].path == str(path)
+
+
+@pytest.mark.parametrize(
+    "keymap",
+    [
+        "tests/fixtures/dts/simple_keymap.zmk",
+        "tests/fixtures/dts/large_keymap.zmk",
+        "examples/mac_home_row_mods.keymap",
+    ],
+)
+def test_bundled_keymaps_validate(keymap):
+    """The converter's output for the bundled keymaps has no errors."""
+    config = convert_zmk_to_kanata(os.path.join(ROOT, keymap))
+
+    diagnostics = validate_kanata(config)
+    errors = [d for d in diagnostics if d.severity == ErrorSeverity.ERROR]
+    assert errors == []
+    assert "kbd-missing-defsrc" not in [d.code for d in diagnostics]
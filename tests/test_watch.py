@@ -0,0 +1,115 @@
+"""Tests for watch mode and incremental reconversion."""
+
+import os
+
+from converter.dts.preprocessor import DtsPreprocessor
+from converter.watch import KeymapWatcher
+
+KEYMAP = """#include "layers.h"
+
+/ {
+    keymap {
+        compatible = "zmk,keymap";
+        default_layer {
+            bindings = <&kp A &kp BASE_KEY>;
+        };
+    };
+};
+"""
+
+
+def _write(path, text):
+    path.write_text(text)
+    # Make the change visible to mtime polling on coarse clocks
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+
+
+def _setup(tmp_path):
+    (tmp_path / "inc").mkdir()
+    (tmp_path / "inc" / "keys.h").write_text("#define BASE_KEY B\n")
+    (tmp_path / "layers.h").write_text("#include <keys.h>\n")
+    keymap = tmp_path / "main.keymap"
+    keymap.write_text(KEYMAP)
+    return keymap
+
+
+def test_resolve_includes(tmp_path):
+    """Quoted and angle-bracket includes are followed recursively."""
+    keymap = _setup(tmp_path)
+    preprocessor = DtsPreprocessor(include_paths=[str(tmp_path / "inc")])
+
+    assert preprocessor.resolve_includes(str(keymap)) == [
+        tmp_path / "layers.h",
+        tmp_path / "inc" / "keys.h",
+    ]
+
+
+def test_rebuild_runs_only_changed_stages(tmp_path):
+    """Unchanged sources, cpp output and config skip the later stages."""
+    keymap = _setup(tmp_path)
+    output = tmp_path / "out" / "main.kbd"
+    watcher = KeymapWatcher(str(keymap), str(output), [str(tmp_path / "inc")])
+
+    first = watcher.rebuild()
+    assert first.error is None
+    assert first.stages == ["preprocess", "parse", "extract", "transform"]
+    assert first.written
+    assert "\n  b\n" in output.read_text()
+    assert tmp_path / "inc" / "keys.h" in watcher.sources
+    assert not watcher.changed()
+
+    # Touching without changing contents runs nothing
+    _write(keymap, KEYMAP)
+    assert watcher.changed()
+    assert watcher.rebuild().stages == []
+
+    # A comment is removed by cpp, so only preprocessing runs
+    _write(keymap, KEYMAP + "// comment\n")
+    assert watcher.rebuild().stages == ["preprocess"]
+
+    # Editing an include reconverts and rewrites the output
+    _write(tmp_path / "inc" / "keys.h", "#define BASE_KEY C\n")
+    assert watcher.changed()
+    result = watcher.rebuild()
+    assert result.written
+    assert "\n  c\n" in output.read_text()
+
+
+def test_failed_rebuild_keeps_output(tmp_path):
+    """A broken edit reports an error and leaves the last output in place."""
+    keymap = _setup(tmp_path)
+    output = tmp_path / "main.kbd"
+    watcher = KeymapWatcher(str(keymap), str(output), [str(tmp_path / "inc")])
+    watcher.rebuild()
+    before = output.read_text()
+
+    _write(keymap, "not dts {")
+    result = watcher.rebuild()
+
+    assert result.error is not None
+    assert not result.written
+    assert output.read_text() == before
+    assert [p.name for p in tmp_path.iterdir() if p.suffix == ".tmp"] == []
+
+
+def test_deleted_output_is_restored(tmp_path):
+    """Deleting or editing the output rewrites it without reconverting."""
+    keymap = _setup(tmp_path)
+    output = tmp_path / "main.kbd"
+    watcher = KeymapWatcher(str(keymap), str(output), [str(tmp_path / "inc")])
+    watcher.rebuild()
+    before = output.read_text()
+
+    output.unlink()
+    assert watcher.changed()
+    result = watcher.rebuild()
+    assert result.written
+    assert result.stages == []
+    assert output.read_text() == before
+    assert not watcher.changed()
+
+    _write(output, "; edited by hand\n")
+    assert watcher.changed()
+    assert watcher.rebuild().written
+    assert output.read_text() == before